@@ -0,0 +1,239 @@
+# Amcache_Benchmark.py = Python script to time the Amcache load on a synthetic hive
+#
+# Copyright (C) 2016 Mark McKinnon (Mark.McKinnon@Davenport.edu)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You can view the GNU General Public License at <http://www.gnu.org/licenses/>
+#
+# Version History:
+#  Initial Version
+#  Version 1.1 - Time the insert statements built by string concatenation, report rows per second and
+#                take an Amcache.hve to load in place of the synthetic hive
+#
+# Loads an amcache with Load_Amcache four ways, with the values pasted into the insert statement (how the
+# rows were written before they were inserted with bind variables), committing every row, committing every
+# batch and in one transaction.  The amcache is an in memory hive with the Programs, File and Orphan keys
+# of an amcache or an Amcache.hve opened through the hive cache.  The tables of the databases are compared
+# so the rows per second are for the same rows.
+#
+# Usage Examples:
+# python3 Amcache_Benchmark.py
+# python3 Amcache_Benchmark.py 200000 5000 20000 benchmark_dir
+# python3 Amcache_Benchmark.py Amcache.hve benchmark_dir
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import datetime
+import amcache_parser
+from Database import SQLiteDb
+from Hive_Cache import Open_Hive
+
+filetime_base = 131000000000000000
+
+class SyntheticValue(object):
+  #Class that defines a registry value of the synthetic hive.
+
+  def __init__(self, name, data):
+    """Initializes the synthetic value object."""
+    super(SyntheticValue, self).__init__()
+    self._name = name
+    self._data = data
+
+  def name(self):
+    return self._name
+
+  def data(self):
+    return self._data
+
+class SyntheticKey(object):
+  #Class that defines a registry key of the synthetic hive.
+
+  def __init__(self, name, last_written, values=None):
+    """Initializes the synthetic key object."""
+    super(SyntheticKey, self).__init__()
+    self._name = name
+    self._last_written = last_written
+    self._values = values or []
+    self._subkeys = []
+
+  def name(self):
+    return self._name
+
+  def last_written_timestamp(self):
+    return self._last_written
+
+  def subkeys(self):
+    return self._subkeys
+
+  def subkeys_count(self):
+    return len(self._subkeys)
+
+  def values(self):
+    return self._values
+
+class SyntheticHive(object):
+  #Class that holds the synthetic keys by path, find_key works the same as the hive cache.
+
+  def __init__(self):
+    """Initializes the synthetic hive object."""
+    super(SyntheticHive, self).__init__()
+    self._keys = {}
+
+  def add_key(self, parent_path, synthetic_key):
+    if parent_path is not None:
+      self._keys[parent_path.upper()]._subkeys.append(synthetic_key)
+      key_path = parent_path + '\\' + synthetic_key.name()
+    else:
+      key_path = synthetic_key.name()
+    self._keys[key_path.upper()] = synthetic_key
+    return key_path
+
+  def find_key(self, path):
+    return self._keys.get(path.strip('\\').upper())
+
+def Build_Synthetic_Hive(Number_Of_Files, Number_Of_Programs, Number_Of_Orphans):
+  # The same counts always give the same hive
+  generator = random.Random(Number_Of_Files + Number_Of_Programs + Number_Of_Orphans)
+  last_written = datetime.datetime(2017, 1, 1)
+  hive = SyntheticHive()
+  hive.add_key(None, SyntheticKey('root', last_written))
+  for key_name in ('Programs', 'File', 'Orphan'):
+    hive.add_key('root', SyntheticKey(key_name, last_written))
+
+  volume_ids = ['{%08x-0000-11e7-0000-000000000000}' % volume_number for volume_number in range(0, 8)]
+  file_entries = []
+  for volume_id in volume_ids:
+    hive.add_key('root\\File', SyntheticKey(volume_id, last_written))
+  for file_number in range(0, Number_Of_Files):
+    volume_id = volume_ids[file_number % len(volume_ids)]
+    file_entry = '%x' % (0x10000 + file_number)
+    file_path = 'C:\\Program Files\\Vendor %d\\Product\'s %d\\file%d.exe' % (file_number % 97, file_number % 13, file_number)
+    file_values = [SyntheticValue('0', 'Product %d' % (file_number % 101)), \
+                   SyntheticValue('1', 'Company %d' % (file_number % 53)), \
+                   SyntheticValue('3', 1033), \
+                   SyntheticValue('5', '10.0.%d.%d' % (file_number % 17, file_number % 1000)), \
+                   SyntheticValue('6', generator.randint(1024, 50000000)), \
+                   SyntheticValue('c', 'Description of file %d' % file_number), \
+                   SyntheticValue('f', filetime_base + generator.randint(0, 10 ** 15)), \
+                   SyntheticValue('11', filetime_base + generator.randint(0, 10 ** 15)), \
+                   SyntheticValue('12', filetime_base + generator.randint(0, 10 ** 15)), \
+                   SyntheticValue('15', file_path), \
+                   SyntheticValue('17', filetime_base + generator.randint(0, 10 ** 15)), \
+                   SyntheticValue('100', '%040x' % generator.getrandbits(160)), \
+                   SyntheticValue('101', '0000%040x' % generator.getrandbits(160))]
+    hive.add_key('root\\File\\' + volume_id, \
+                 SyntheticKey(file_entry, last_written + datetime.timedelta(seconds=file_number), file_values))
+    file_entries.append(volume_id + '@' + file_entry)
+
+  for program_number in range(0, Number_Of_Programs):
+    program_files = generator.sample(file_entries, min(len(file_entries), 10))
+    program_values = [SyntheticValue('0', 'Program %d' % program_number), \
+                      SyntheticValue('1', '%d.%d' % (program_number % 9, program_number % 31)), \
+                      SyntheticValue('2', 'Publisher %d' % (program_number % 41)), \
+                      SyntheticValue('3', '1033'), \
+                      SyntheticValue('6', 'AddRemoveProgram'), \
+                      SyntheticValue('7', ['HKLM\\Software\\Uninstall\\Program %d' % program_number]), \
+                      SyntheticValue('a', filetime_base + generator.randint(0, 10 ** 15)), \
+                      SyntheticValue('d', ['C:\\Program Files\\Program %d' % program_number, '']), \
+                      SyntheticValue('f', '{%032x}' % generator.getrandbits(128)), \
+                      SyntheticValue('11', ['{%032x}' % generator.getrandbits(128)]), \
+                      SyntheticValue('Files', program_files)]
+    hive.add_key('root\\Programs', SyntheticKey('%08x' % program_number, last_written, program_values))
+
+  for file_entry in generator.sample(file_entries, min(len(file_entries), Number_Of_Orphans)):
+    hive.add_key('root\\Orphan', SyntheticKey(file_entry, last_written))
+  return hive
+
+class BatchCommitDb(SQLiteDb):
+  #Database that commits every bulk load batch, the load before it was done in one transaction.
+
+  def BeginTransaction(self):
+    self.FlushBindValues()
+
+def Sql_Literal(value):
+  # Returns the value as it was pasted into the insert statement, quotes are doubled so the paths with a
+  # quote in them can be inserted at all
+  if value is None:
+    return 'null'
+  if isinstance(value, (int, float)):
+    return str(value)
+  if isinstance(value, bytes):
+    return "X'" + value.hex() + "'"
+  return "'" + str(value).replace("'", "''") + "'"
+
+class ConcatenatedSqlDb(BatchCommitDb):
+  #Database that builds an insert statement with the values in it for every row and runs it on its own, how
+  #the rows were inserted before they were inserted with bind variables.
+
+  def InsertBindValues(self, table_name, column_definitions, column_bind_values, column_values):
+    self.InsertValues(table_name, column_definitions, ', '.join([Sql_Literal(value) for value in column_values]))
+
+def Read_Tables(database_name):
+  # Returns the sorted rows of every table so the databases of the load methods can be compared
+  connection = sqlite3.connect(database_name)
+  table_names = [table_row[0] for table_row in \
+                 connection.execute("select name from sqlite_master where type = 'table' order by name")]
+  table_rows = {}
+  for table_name in table_names:
+    table_rows[table_name] = sorted([repr(table_row) for table_row in connection.execute('select * from ' + table_name)])
+  connection.close()
+  return table_rows
+
+def Count_Loaded_Rows(table_rows):
+  # The rows the parse inserted, the tables Consolidate_Data builds from them are not counted
+  return sum([len(table_rows[loaded_table]) for loaded_table in table_rows \
+              if loaded_table.upper() in [table_name.upper() for table_name in (amcache_parser.table_name_1, \
+                 amcache_parser.table_name_2, amcache_parser.table_name_3, amcache_parser.table_name_4, amcache_parser.table_name_5)]])
+
+def Benchmark_Amcache_Load(hive, Benchmark_Dir):
+  # Returns a list of (load method, seconds, rows per second) and if the tables of all the load methods are the same
+  load_methods = [('Concatenated SQL', ConcatenatedSqlDb(), 1), ('Commit per row', BatchCommitDb(), 1), \
+                  ('Commit per batch', BatchCommitDb(), 10000), ('One transaction', SQLiteDb(), 10000)]
+  os.makedirs(Benchmark_Dir, exist_ok=True)
+  load_times = []
+  load_tables = []
+  for (load_method, SQLitedb, batch_size) in load_methods:
+    database_name = os.path.join(Benchmark_Dir, 'Amcache_Benchmark_' + str(len(load_times)) + '.db3')
+    SQLitedb.RemoveDB_File(database_name)
+    SQLitedb.Open(database_name, bulk_load=True, batch_size=batch_size, reject_rows=True)
+    amcache_parser.SQLitedb = SQLitedb
+    start_time = time.time()
+    amcache_parser.Load_Amcache(hive)
+    SQLitedb.Close()
+    seconds = time.time() - start_time
+    load_tables.append(Read_Tables(database_name))
+    load_times.append((load_method, seconds, Count_Loaded_Rows(load_tables[-1]) / max(seconds, 0.000001)))
+    SQLitedb.RemoveDB_File(database_name)
+  return (load_times, all([tables == load_tables[0] for tables in load_tables]))
+
+if __name__ == '__main__':
+  # python3 Amcache_Benchmark.py 200000 5000 20000 benchmark_dir
+  # python3 Amcache_Benchmark.py Amcache.hve benchmark_dir
+  args = sys.argv[1:]
+  if len(args) > 0 and os.path.isfile(args[0]):
+    Benchmark_Dir = args[1] if len(args) > 1 else '.'
+    hive = Open_Hive(args[0], os.path.join(Benchmark_Dir, 'Hive_Cache'))
+    print ("Amcache ==> " + args[0])
+  else:
+    Number_Of_Files = int(args[0]) if len(args) > 0 else 20000
+    Number_Of_Programs = int(args[1]) if len(args) > 1 else 500
+    Number_Of_Orphans = int(args[2]) if len(args) > 2 else 2000
+    Benchmark_Dir = args[3] if len(args) > 3 else '.'
+    hive = Build_Synthetic_Hive(Number_Of_Files, Number_Of_Programs, Number_Of_Orphans)
+    print ("Files ==> %d  Programs ==> %d  Orphans ==> %d" % (Number_Of_Files, Number_Of_Programs, Number_Of_Orphans))
+  (Load_Times, Same_Tables) = Benchmark_Amcache_Load(hive, Benchmark_Dir)
+  for (Load_Method, Seconds, Rows_Per_Second) in Load_Times:
+    print ("%-18s ==> %9.2fs  Rows per second ==> %9.0f" % (Load_Method, Seconds, Rows_Per_Second))
+  print ("Tables are the same ==> " + str(Same_Tables))
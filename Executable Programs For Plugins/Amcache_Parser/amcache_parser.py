@@ -16,13 +16,20 @@
 #
 # Version History:
 #  Initial Version - Requires Registry python scripts to be installed
+#  Version 1.1 - Consolidate with set based statements and SQL functions instead of an update per row
+#  Version 1.2 - Insert all rows with bind variables in batches and print the rows per second of each parse
+#  Version 1.3 - Read the hive through the hive cache shared by the registry exporters, needs yarp instead of Registry
+#  Version 1.4 - Load all of the tables in one transaction, Amcache_Benchmark.py times the load on a synthetic hive
 # 
 # Usage Examples:
 # python3 export_EVTX.py amcache.hve amacache.db3
+# python3 amcache_parser.py amcache.hve amacache.db3 --cache-dir Hive_Cache
 
 import sys
 import os
-from Registry import Registry
+import time
+import argparse
+from Hive_Cache import Open_Hive, Get_Cache_Directory
 from Database import SQLiteDb
 
 cache_val_desc = {"0":"Product Name", "1":"Company Name", "2":"File version number only", "3":"Language code (1033 for en-US)", \
@@ -78,169 +85,209 @@ table_col_4 = 'Program_Id text, file_path text'
 table_name_5 = 'Orphan'
 table_col_5 = 'Volume_id text, File_Entry text, Reg_Key_WriteTime text'
 
+# Every row of a table is inserted with all of its columns, values that are not in the key are null.  The
+# insert statement is then the same for every row so the rows are written in batches.
+file_ins_columns = ['Volume_Id', 'file_entry', 'Reg_Key_WriteTime', 'Volume_Id_WriteTime'] + list(cache_sql_col.values())
+program_ins_columns = ['Program_id', 'Reg_Key_WriteTime'] + \
+                      [cache_psql_col[value_name] for value_name in cache_psql_col if value_name not in ('d', 'Files')]
+program_file_ins_columns = ['Volume_id', 'File_entry', 'program_id']
+program_filepaths_ins_columns = ['file_path', 'program_id']
+orphan_ins_columns = ['Volume_id', 'File_entry', 'reg_key_writetime']
+
 Unassoc_Progs = 'create table unassociated_programs as ' + \
                 "select 'Unassociated' 'Program_Name',program_id, a.volume_id, volume_id_writetime, a.file_entry, a.reg_key_writetime, " + \
                 'sha1_hash_of_file, full_path_to_file, File_size, file_version, file_version_number, file_description, ' + \
                 'Pe_Header_Field_SizeOfImage, hash_PE_Header, PE_Header_Checksum, ' + \
-                "created_timestamp, last_modified_timestamp, last_modified_timestamp_2, linker_compile_timestamp, " + \
+                "datetime(filetime_to_unix_time(created_timestamp), 'unixepoch') 'created_timestamp', " + \
+                "datetime(filetime_to_unix_time(last_modified_timestamp), 'unixepoch') 'last_modified_timestamp', " + \
+                "datetime(filetime_to_unix_time(last_modified_timestamp_2), 'unixepoch') 'last_modified_timestamp_2', " + \
+                "datetime(filetime_to_unix_time(linker_compile_timestamp), 'unixepoch') 'linker_compile_timestamp', " + \
                 'language_code from file a, orphan d where a.volume_id = d.volume_id and a.file_entry = d.file_entry;'
                 
 Program_Entries = "create table program_entries as Select program_id, Reg_key_writetime, program_name, program_version, " + \
-                  "publisher, install_date, unknown_b 'Install_Date_2', language_code, " + \
-                  "entry_type 'Install Source', registry_uninstall_key, '' 'file_paths' from program"
+                  "publisher, datetime(filetime_to_unix_time(install_date), 'unixepoch') 'install_date', " + \
+                  "datetime(filetime_to_unix_time(unknown_b), 'unixepoch') 'Install_Date_2', language_code, " + \
+                  "entry_type 'Install Source', registry_uninstall_key, " + \
+                  "coalesce((select group_concat(file_path, ' ') from program_filepaths b where b.program_id = a.program_id), '') 'file_paths' " + \
+                  "from program a"
                   
 Associated_progs = "Create table associated_file_entries as " + \
                    "select Program_name, c.program_id, a.volume_id, volume_id_writetime 'Volumeid_writetime', " + \
-                   "a.file_entry, a.reg_key_writetime 'file_id_last_writetime', full_path_to_file, '' 'File_Extension', File_size, " + \
+                   "a.file_entry, a.reg_key_writetime 'file_id_last_writetime', full_path_to_file, " + \
+                   "file_extension(full_path_to_file) 'File_Extension', File_size, " + \
                    "file_version, file_description, pe_header_field_sizeofImage 'PEHeaderSize', hash_pe_header, pe_header_checksum, " + \
-                   "created_timestamp, last_modified_timestamp, last_modified_timestamp_2, linker_compile_timestamp, " + \
+                   "datetime(filetime_to_unix_time(created_timestamp), 'unixepoch') 'created_timestamp', " + \
+                   "datetime(filetime_to_unix_time(last_modified_timestamp), 'unixepoch') 'last_modified_timestamp', " + \
+                   "datetime(filetime_to_unix_time(last_modified_timestamp_2), 'unixepoch') 'last_modified_timestamp_2', " + \
+                   "datetime(filetime_to_unix_time(linker_compile_timestamp), 'unixepoch') 'linker_compile_timestamp', " + \
                    "a.language_code from file a, program b, program_file c where a.volume_id = c.volume_id " + \
                    "and a.file_entry = c.file_entry and b.program_id = c.program_id;"
+
+# Indexes on the join keys of the consolidation statements
+Join_Indexes = [('File_Volume_Id_Idx', table_name_1, 'Volume_Id, File_Entry'), \
+                ('Program_Program_Id_Idx', table_name_2, 'Program_Id'), \
+                ('Program_File_Volume_Id_Idx', table_name_3, 'Volume_Id, File_Entry'), \
+                ('Program_Filepaths_Program_Id_Idx', table_name_4, 'Program_Id'), \
+                ('Orphan_Volume_Id_Idx', table_name_5, 'Volume_Id, File_Entry')]
                    
+def Insert_Rows(table_name, ins_columns, rows):
+    sql_ins_columns = ', '.join(ins_columns)
+    sql_bind_values = SQLitedb.create_question_bind_variables(len(ins_columns))
+    for row in rows:
+        SQLitedb.InsertBindValues(table_name, sql_ins_columns, sql_bind_values, row)
+    SQLitedb.FlushBindValues()
+
 def parse_orphan(registry):
-    programs = registry.open("root\\Orphan")
+    programs = registry.find_key("root\\Orphan")
+    orphan_rows = []
     for progs in programs.subkeys():
         orphan_sub = progs.name()
-        reg_key_write_time = progs.timestamp()
+        reg_key_write_time = progs.last_written_timestamp()
         file_val = orphan_sub.split('@')
-        #file_val.append(service.name())
-        file_val2 = "'" + file_val[0] + "','" + file_val[1] + "', '" + str(reg_key_write_time) + "'"
-        SQLitedb.InsertValues(table_name_5 + "_Temp", "Volume_id, File_entry, reg_key_writetime", file_val2)
+        orphan_rows.append([file_val[0], file_val[1], str(reg_key_write_time)])
+    Insert_Rows(table_name_5 + "_Temp", orphan_ins_columns, orphan_rows)
+    return len(orphan_rows)
 
 def parse_programs(registry):
-    programs = registry.open("root\\Programs")
+    programs = registry.find_key("root\\Programs")
+    program_rows = []
+    program_file_rows = []
+    program_filepaths_rows = []
     for progs in programs.subkeys():
-        prog_sub = registry.open("root\\Programs\\" + progs.name())
-        sql_ins_columns = []
-        sql_val_columns = []
-        sql_ins_columns.append("Program_id")
-        sql_val_columns.append(progs.name())
-        sql_ins_columns.append("Reg_Key_WriteTime")
-        sql_val_columns.append(progs.timestamp())
+        prog_sub = registry.find_key("root\\Programs\\" + progs.name())
+        sql_values = {}
+        sql_values["Program_id"] = progs.name()
+        sql_values["Reg_Key_WriteTime"] = progs.last_written_timestamp()
 
         for prog in prog_sub.values():
            if prog.name() == "16":
-              sql_ins_columns.append(cache_psql_col[prog.name()]) 
-              sql_val_columns.append("Need to Parse")
+              sql_values[cache_psql_col[prog.name()]] = "Need to Parse"
            elif prog.name() == "Files":
-              for file in  prog.value():
+              for file in  prog.data():
                  if ('@' in file):
                     file_val = file.split('@')
-                    file_val2 = "'" + file_val[0] + "','" + file_val[1] + "','" + progs.name() + "'"
-                    SQLitedb.InsertValues(table_name_3 + "_Temp", "Volume_id, File_entry, program_id", file_val2)
+                    program_file_rows.append([file_val[0], file_val[1], progs.name()])
            elif prog.name() == "a":
-              sql_ins_columns.append(cache_psql_col[prog.name()]) 
-              sql_val_columns.append(str(prog.value()))
+              sql_values[cache_psql_col[prog.name()]] = str(prog.data())
            elif prog.name() == "d":
-              for file_path in prog.value():
+              for file_path in prog.data():
                  if len(file_path) > 0:
-                    f_path = "'" + file_path + "','" + progs.name() + "'"
-                    SQLitedb.InsertValues(table_name_4 + "_Temp", "file_path, program_id", f_path)
+                    program_filepaths_rows.append([file_path, progs.name()])
            elif prog.name() == "7":
-              p_val = prog.value()
-              sql_ins_columns.append(cache_psql_col[prog.name()]) 
-              sql_val_columns.append(p_val[0])
+              p_val = prog.data()
+              sql_values[cache_psql_col[prog.name()]] = p_val[0]
            elif prog.name() == "11":
-              p_val = prog.value()
-              sql_ins_columns.append(cache_psql_col[prog.name()]) 
-              sql_val_columns.append(p_val[0])
+              p_val = prog.data()
+              sql_values[cache_psql_col[prog.name()]] = p_val[0]
            elif prog.name() == "12":
-              p_val = prog.value()
-              sql_ins_columns.append(cache_psql_col[prog.name()]) 
-              sql_val_columns.append(p_val[0])
+              p_val = prog.data()
+              sql_values[cache_psql_col[prog.name()]] = p_val[0]
            else:
-              sql_ins_columns.append(cache_psql_col[prog.name()]) 
-              sql_val_columns.append(prog.value())
-        sql_bind_values = SQLitedb.create_question_bind_variables(len(sql_ins_columns))
-        SQLitedb.InsertBindValues(table_name_2 + "_Temp", ', '.join(sql_ins_columns), sql_bind_values, sql_val_columns)
+              sql_values[cache_psql_col[prog.name()]] = prog.data()
+        program_rows.append([sql_values.get(ins_column) for ins_column in program_ins_columns])
+    Insert_Rows(table_name_2 + "_Temp", program_ins_columns, program_rows)
+    Insert_Rows(table_name_3 + "_Temp", program_file_ins_columns, program_file_rows)
+    Insert_Rows(table_name_4 + "_Temp", program_filepaths_ins_columns, program_filepaths_rows)
+    return len(program_rows) + len(program_file_rows) + len(program_filepaths_rows)
 
         
 def parse_files(registry):
-    services = registry.open("root\\File")
+    services = registry.find_key("root\\File")
+    sql_ins_columns = ', '.join(file_ins_columns)
+    sql_bind_values = SQLitedb.create_question_bind_variables(len(file_ins_columns))
+    number_of_rows = 0
     for vol_id in services.subkeys():
         vol_id_name = "root\\File\\" + vol_id.name()
-        prog_sub = registry.open(vol_id_name)
-        num_subkeys = prog_sub.subkeys_number()
-        if (prog_sub.subkeys_number() > 0):
+        prog_sub = registry.find_key(vol_id_name)
+        num_subkeys = prog_sub.subkeys_count()
+        if (prog_sub.subkeys_count() > 0):
            for prog_subkeys in prog_sub.subkeys():
-              sql_ins_columns = []
-              sql_val_columns = []
-              sql_ins_columns.append("Volume_Id")
-              sql_val_columns.append(vol_id.name())
-              sql_ins_columns.append("file_entry")
-              sql_val_columns.append(prog_subkeys.name())
-              sql_ins_columns.append("Reg_Key_WriteTime")
-              sql_val_columns.append(prog_subkeys.timestamp())
-              sql_ins_columns.append("Volume_Id_WriteTime")
-              sql_val_columns.append(prog_sub.timestamp())
+              sql_values = {}
+              sql_values["Volume_Id"] = vol_id.name()
+              sql_values["file_entry"] = prog_subkeys.name()
+              sql_values["Reg_Key_WriteTime"] = prog_subkeys.last_written_timestamp()
+              sql_values["Volume_Id_WriteTime"] = prog_sub.last_written_timestamp()
               for prog in prog_subkeys.values():
-                  #print ("Value Name ==> ", prog.name(), "Value Value ==> ", prog.value()) 
-                  sql_ins_columns.append(cache_sql_col[prog.name()]) 
-                  sql_val_columns.append(prog.value())                      
-              sql_bind_values = SQLitedb.create_question_bind_variables(len(sql_ins_columns))
-              SQLitedb.InsertBindValues(table_name_1 + "_Temp", ', '.join(sql_ins_columns), sql_bind_values, sql_val_columns)
+                  #print ("Value Name ==> ", prog.name(), "Value Value ==> ", prog.data()) 
+                  sql_values[cache_sql_col[prog.name()]] = prog.data()
+              SQLitedb.InsertBindValues(table_name_1 + "_Temp", sql_ins_columns, sql_bind_values, \
+                                        [sql_values.get(ins_column) for ins_column in file_ins_columns])
+              number_of_rows = number_of_rows + 1
+    SQLitedb.FlushBindValues()
+    return number_of_rows
+
+def Print_Parse_Timing(parse_name, number_of_rows, seconds):
+    print ("Parsed ==> %-10s Rows ==> %10d  Seconds ==> %9.2f  Rows per second ==> %10.0f" % \
+           (parse_name, number_of_rows, seconds, number_of_rows / max(seconds, 0.000001)))
+
+def Filetime_To_Unix_Time(Filetime):
+    # SQL function, converts a FILETIME (100 nanoseconds since 1601) to seconds since 1970
+    try:
+        return (int(Filetime) // 10000000) - 11644473600
+    except (TypeError, ValueError):
+        return None
+
+def File_Extension(File_Path):
+    # SQL function, returns the extension of a file path
+    if File_Path == None:
+        return ''
+    filename, file_extension = os.path.splitext(File_Path)
+    return file_extension
 
 def Consolidate_Data():
+    for (Index_Name, Table_Name, Index_Columns) in Join_Indexes:
+        SQLitedb.CreateIndex(Index_Name, Table_Name, Index_Columns)
+    SQLitedb.CreateFunction('filetime_to_unix_time', 1, Filetime_To_Unix_Time)
+    SQLitedb.CreateFunction('file_extension', 1, File_Extension)
     SQLitedb.UpdateTable(Unassoc_Progs)
     SQLitedb.UpdateTable(Program_Entries)
-    p_id = SQLitedb.SelectAllRows("Select distinct a.program_id from program a, program_filepaths b where a.program_id = b.program_id")      
-    for prog_id in p_id:
-        program_id = str(prog_id[0])
-        #print ("Updating From " + str(program_id))
-        path_id = SQLitedb.SelectAllRows("select file_path from program_filepaths where  program_id = '" + program_id + "';")
-        path_values = []
-        for path in path_id:        
-            path_values.append(path[0])     
-        Upd_stmt = "Update program_entries set file_paths = '" + ' '.join(path_values) + "' where program_id = '" + program_id + "';"
-        #print (Upd_stmt)
-        SQLitedb.UpdateTable(Upd_stmt)
     SQLitedb.UpdateTable(Associated_progs)
-    File_id = SQLitedb.SelectAllRows("SELECT ROWID, FULL_PATH_TO_FILE FROM associated_file_entries")
-    datetime_upd = " set created_timestamp = DATETIME((SUBSTR(created_timestamp,1,11)-11644473600),'UNIXEPOCH'), " + \
-                   "last_modified_timestamp = DATETIME((SUBSTR(last_modified_timestamp,1,11)-11644473600),'UNIXEPOCH'), " + \
-                   "last_modified_timestamp_2 = DATETIME((SUBSTR(last_modified_timestamp_2,1,11)-11644473600),'UNIXEPOCH'), " + \
-                   "linker_compile_timestamp = DATETIME((SUBSTR(linker_compile_timestamp,1,11)-11644473600),'UNIXEPOCH'); "
-    SQLitedb.UpdateTable("Update associated_File_entries " + datetime_upd)                   
-    SQLitedb.UpdateTable("Update unassociated_programs " + datetime_upd)                   
-    datetime_upd = " set install_date = DATETIME((SUBSTR(install_date,1,11)-11644473600),'UNIXEPOCH'), " + \
-                   " install_date_2 = DATETIME((SUBSTR(install_date_2,1,11)-11644473600),'UNIXEPOCH');"
-    SQLitedb.UpdateTable("Update program_entries " + datetime_upd)                   
-    for f_id in File_id:
-        rowid = str(f_id[0])
-        filename, file_extension = os.path.splitext(f_id[1])
-        Upd_stmt = "Update associated_file_entries set file_extension = '" + file_extension + "' where rowid = " + rowid + ";"
-        #print (Upd_stmt)
-        SQLitedb.UpdateTable(Upd_stmt)
-
-              
-
-args = sys.argv[1:]
-Registry_To_Parse = args[0]
-SQLite_DB_Name = args[1]
-print ('Amcache is ', str(Registry_To_Parse))
-print ('DB file is ', SQLite_DB_Name)
+
+def Load_Amcache(registry):
+    # Parses the hive into the temp tables then builds the permanent and consolidated tables, all in one
+    # transaction.  The batches written by FlushBindValues are savepoints inside it, so a batch with a row
+    # that cannot be inserted is still rolled back and retried one row at a time.
+    SQLitedb.BeginTransaction()
+    SQLitedb.CreateTempTable(table_name_1 + "_Temp", table_col_1)
+    SQLitedb.CreateTempTable(table_name_2 + "_Temp", table_col_2)
+    SQLitedb.CreateTempTable(table_name_3 + "_Temp", table_col_3)
+    SQLitedb.CreateTempTable(table_name_4 + "_Temp", table_col_4)
+    SQLitedb.CreateTempTable(table_name_5 + "_Temp", table_col_5)
+
+    for (parse_name, parse_function) in [('Programs', parse_programs), ('File', parse_files), ('Orphan', parse_orphan)]:
+        start_time = time.time()
+        number_of_rows = parse_function(registry)
+        Print_Parse_Timing(parse_name, number_of_rows, time.time() - start_time)
+    SQLitedb.FlushBindValues()
+    for (row, insert_error) in SQLitedb.rejected_rows:
+        print ("Error inserting row ==> " + str(row) + " <==> " + insert_error)
+
+    SQLitedb.CreatePermanentTable(table_name_1, table_name_1 + "_Temp")
+    SQLitedb.CreatePermanentTable(table_name_2, table_name_2 + "_Temp")
+    SQLitedb.CreatePermanentTable(table_name_3, table_name_3 + "_Temp")
+    SQLitedb.CreatePermanentTable(table_name_4, table_name_4 + "_Temp")
+    SQLitedb.CreatePermanentTable(table_name_5, table_name_5 + "_Temp")
+
+    Consolidate_Data()
+    SQLitedb.Commit()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parse the amcache and save it to a SQLite Database.')
+    parser.add_argument('Registry', help='amcache hive to parse')
+    parser.add_argument('DB', help='SQLite database to create')
+    parser.add_argument('--cache-dir', dest='Cache_Directory', default=None, \
+                        help='directory of the hive cache shared by the registry exporters, Hive_Cache next to the output file when not given')
+    args = parser.parse_args()
+    Registry_To_Parse = args.Registry
+    SQLite_DB_Name = args.DB
+    print ('Amcache is ', str(Registry_To_Parse))
+    print ('DB file is ', SQLite_DB_Name)
         
-SQLitedb = SQLiteDb()
-SQLitedb.RemoveDB_File(SQLite_DB_Name)
-SQLitedb.Open(SQLite_DB_Name)
-
-SQLitedb.CreateTempTable(table_name_1 + "_Temp", table_col_1)
-SQLitedb.CreateTempTable(table_name_2 + "_Temp", table_col_2)
-SQLitedb.CreateTempTable(table_name_3 + "_Temp", table_col_3)
-SQLitedb.CreateTempTable(table_name_4 + "_Temp", table_col_4)
-SQLitedb.CreateTempTable(table_name_5 + "_Temp", table_col_5)
-
-reg = Registry.Registry(Registry_To_Parse)
-
-parse_programs(reg)
-parse_files(reg)
-parse_orphan(reg)
-
-SQLitedb.CreatePermanentTable(table_name_1, table_name_1 + "_Temp")
-SQLitedb.CreatePermanentTable(table_name_2, table_name_2 + "_Temp")
-SQLitedb.CreatePermanentTable(table_name_3, table_name_3 + "_Temp")
-SQLitedb.CreatePermanentTable(table_name_4, table_name_4 + "_Temp")
-SQLitedb.CreatePermanentTable(table_name_5, table_name_5 + "_Temp")
-
-Consolidate_Data()
-SQLitedb.Close()
\ No newline at end of file
+    SQLitedb = SQLiteDb()
+    SQLitedb.RemoveDB_File(SQLite_DB_Name)
+    SQLitedb.Open(SQLite_DB_Name, bulk_load=True, reject_rows=True)
+
+    reg = Open_Hive(Registry_To_Parse, Get_Cache_Directory(args.Cache_Directory, SQLite_DB_Name))
+
+    Load_Amcache(reg)
+    SQLitedb.Close()
@@ -0,0 +1,41 @@
+#Functions to decode the V and F records of the user accounts in a SAM hive.
+#
+# The V record of a user starts with a table of (offset, length, unknown) entries, the offsets are
+# relative to the end of the table at 0xCC.  Entry 1 is the user name, entry 2 the full name and
+# entry 3 the comment; the length of entry 0 is the account type.  The F record holds the times,
+# RID, ACB flags and counts of the user at fixed offsets.  Both layouts are compiled once so a
+# batch of hives does not parse the format strings again for every user.
+
+import struct
+
+v_record_data_offset = 204
+v_record_header = struct.Struct('<11l')
+f_record = struct.Struct('<8xq8xqqqi4xi4xhh')
+
+def Filetime_To_Unix_Time(filetime):
+    # Returns the seconds since 1970 of a FILETIME from its first 11 digits, the way the SAM
+    # exporters always have, times before 1970 are returned as 0
+    unix_time = int(str(filetime)[0:11]) - 11644473600
+    if unix_time < 0:
+       return 0
+    return unix_time
+
+def Decode_V_Record(v_data):
+    # Returns (account type number, user name, full name, comment), the names are the raw UTF-16 data
+    (unknown_0, account_type_number, unknown_8, name_offset, name_length, unknown_20, full_name_offset, \
+     full_name_length, unknown_32, comment_offset, comment_length) = v_record_header.unpack_from(v_data)
+    name_offset = name_offset + v_record_data_offset
+    full_name_offset = full_name_offset + v_record_data_offset
+    comment_offset = comment_offset + v_record_data_offset
+    return (account_type_number, v_data[name_offset:name_offset + name_length], \
+            v_data[full_name_offset:full_name_offset + full_name_length], \
+            v_data[comment_offset:comment_offset + comment_length])
+
+def Decode_F_Record(f_data):
+    # Returns (last login, password reset, account expires, password fail, rid, acb flags, failed count,
+    # login count), the times are seconds since 1970
+    (last_login_date, pwd_reset_date, acct_exp_date, pwd_fail_date, user_rid, user_acb_flags, user_failed_count, \
+     user_login_count) = f_record.unpack_from(f_data)
+    return (Filetime_To_Unix_Time(last_login_date), Filetime_To_Unix_Time(pwd_reset_date), \
+            Filetime_To_Unix_Time(acct_exp_date), Filetime_To_Unix_Time(pwd_fail_date), user_rid, user_acb_flags, \
+            user_failed_count, user_login_count)
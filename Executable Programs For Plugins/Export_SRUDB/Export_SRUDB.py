@@ -16,18 +16,26 @@
 #
 # Version History:
 #  Initial Version - Requires pyesedb python binding from the project libyal/libesedb
+#  Version 1.1 - Decode records with a per table column decoder plan from Esedb_Columns
+#  Version 1.2 - Fill the SRUM_Write columns while the records are inserted
+#  Version 1.3 - Export the tables in parallel worker processes, each into its own staging database
+#  Version 1.4 - Resolve the AppId and UserId of the usage tables from SruDbIdMapTable
 # 
 # Usage Examples:
 # python3 export_srudb.py srudb.dat srudb.db3
+# python3 export_srudb.py srudb.dat srudb.db3 --workers 4
 
 from Database import SQLiteDb
 import os
 import sys
 import re
-import datetime
-import math
-from struct import unpack
+import calendar
+import struct
+import time
+import argparse
+import multiprocessing
 import pyesedb
+import Esedb_Columns
 
 
 # Setup dictionary for column types
@@ -46,119 +54,81 @@ Table_Rev_Dict = {'SruDbIdMapTable':'SruDbIdMapTable','Application_Resource_Usag
 			  'MSysObjectsShadow':'MSysObjectsShadow', 'MSysObjids':'MSysObjids', 'MSysLocales':'MSysLocales', \
 			  'SruDbCheckpointTable':'SruDbCheckpointTable','Energy_Usage_Provider':'{FEE4E14F-02A9-4550-B5CE-5FA2DA202E37}LT'} 
 			  
-def ole_date_bin_to_datetime(ole_date_bin):
-    """
-        Converts a OLE date from a binary 8 bytes little endian hex form to a datetime
-    """
-    #Conversion to OLE date float, where:
-    # - integer part: days from epoch (1899/12/30 00:00) 
-    # - decimal part: percentage of the day, where 0,5 is midday
-    date_float = unpack('<d', ole_date_bin)[0]
-    date_decimal, date_integer = math.modf(date_float)
-    date_decimal = abs(date_decimal)
-    date_integer = int(date_integer)
+# Columns derived from the TimeStamp of the records of the SRUM usage tables
+SRUM_Write_Columns = ['SRUM_Write_Date text', 'SRUM_Write_time text', 'SRUM_Write_Time_Hour integer', 'SRUM_Write_time_Minute integer', \
+                      'SRUM_Write_time_Day_Of_Week integer', 'SRUM_Write_epochtime integer', 'SRUM_Write_Date_Month text', \
+                      'SRUM_Write_Date_Day Integer']
+SRUM_Write_Ins_Columns = 'SRUM_Write_Date, SRUM_Write_time, SRUM_Write_Time_Hour, SRUM_Write_time_Minute, SRUM_Write_time_Day_Of_Week, ' + \
+                         'SRUM_Write_epochtime, SRUM_Write_Date_Month, SRUM_Write_Date_Day'
+SRUM_Write_Null_Values = (None, None, None, None, None, None, None, None)
+Day_Of_Week_Names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+Month_Names = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', \
+               'November', 'December']
 
-    #Calculate the result
-    res = datetime.datetime(1899, 12, 30) + datetime.timedelta(days=date_integer) #adding days to epoch
-    res = res + datetime.timedelta(seconds = 86400*date_decimal) #adding percentage of the day
-    return res
+# Columns of the usage tables that point into SruDbIdMapTable and the column their resolved value is written to
+SRUM_Id_Columns = {'APPID':'App_Name', 'USERID':'User_Sid'}
+# IdType of the SruDbIdMapTable entries that hold a binary SID, the others hold UTF-16 text
+SRUM_Id_Type_Sid = 3
+
+def Is_SRUM_Usage_Table(Table_name):
+    # The MSys and Sru tables have no TimeStamp to derive the SRUM_Write columns from
+    return not Table_name.upper().startswith(('MSYS', 'SRU'))
+
+def Get_SRUM_Write_Values(Time_Stamp, SRUM_Write_Cache):
+    # Returns the SRUM_Write column values for a TimeStamp, each distinct TimeStamp is only converted once
+    if (Time_Stamp == None or Time_Stamp == ''):
+       return SRUM_Write_Null_Values
+    SRUM_Write_Values = SRUM_Write_Cache.get(Time_Stamp)
+    if (SRUM_Write_Values == None):
+       SRUM_Write_Values = (Time_Stamp.strftime('%Y-%m-%d'), Time_Stamp.strftime('%H:%M:%S'), Time_Stamp.hour, \
+                            Time_Stamp.minute, Day_Of_Week_Names[Time_Stamp.weekday()], calendar.timegm(Time_Stamp.timetuple()), \
+                            Month_Names[Time_Stamp.month - 1], Time_Stamp.day)
+       SRUM_Write_Cache[Time_Stamp] = SRUM_Write_Values
+    return SRUM_Write_Values
+
+def Get_Sid_Text(Sid_Data):
+   # Converts a binary SID to its S-1-5-21-... text form
+   (Revision, Number_Of_Sub_Authorities) = struct.unpack_from('<BB', Sid_Data, 0)
+   Authority = int.from_bytes(Sid_Data[2:8], 'big')
+   Sub_Authorities = struct.unpack_from('<' + str(Number_Of_Sub_Authorities) + 'L', Sid_Data, 8)
+   return 'S-' + str(Revision) + '-' + str(Authority) + ''.join(['-' + str(Sub_Authority) for Sub_Authority in Sub_Authorities])
+
+def Load_SRUM_Id_Map(esedb_file):
+   # Reads SruDbIdMapTable into a dictionary of IdIndex to application name or user SID
+   SRUM_Id_Map = {}
+   EsedbTable = esedb_file.get_table_by_name('SruDbIdMapTable')
+   if EsedbTable == None:
+      return SRUM_Id_Map
+   Column_Numbers = {}
+   for x in range(0, EsedbTable.get_number_of_columns()):
+      Column_Numbers[EsedbTable.get_column(x).get_name().upper()] = x
+   for i in range(0, EsedbTable.get_number_of_records()):
+      EsedbTable_Record = EsedbTable.get_record(i)
+      Id_Blob = EsedbTable_Record.get_value_data(Column_Numbers['IDBLOB'])
+      if Id_Blob == None:
+         continue
+      try:
+         if EsedbTable_Record.get_value_data_as_integer(Column_Numbers['IDTYPE']) == SRUM_Id_Type_Sid:
+            Id_Text = Get_Sid_Text(Id_Blob)
+         else:
+            Id_Text = Id_Blob.decode('utf-16', 'ignore').rstrip('\x00')
+      except struct.error:
+         continue
+      SRUM_Id_Map[EsedbTable_Record.get_value_data_as_integer(Column_Numbers['IDINDEX'])] = Id_Text
+   return SRUM_Id_Map
+
+def Get_Column_Definitions(SQLite_db, EsedbTable, Table_name):
+   # Returns the column definitions of the export table of an ESE table
+   Column_Definitions = []
+   for x in range(0, EsedbTable.get_number_of_columns()):
+       Esedb_Column = EsedbTable.get_column(x)
+       Column_Definitions.append(SQLite_db.Check_SQL_Reserved_Word(Esedb_Column.get_name()) + ' ' + Column_Dict[Esedb_Column.get_type()])
+       if Is_SRUM_Usage_Table(Table_name) and Esedb_Column.get_name().upper() in SRUM_Id_Columns:
+          Column_Definitions.append(SRUM_Id_Columns[Esedb_Column.get_name().upper()] + ' text')
+   if Is_SRUM_Usage_Table(Table_name):
+       Column_Definitions.extend(SRUM_Write_Columns)
+   return ', '.join(Column_Definitions)
 
-def Check_Column_Type(EsedbTable_Record, Column_Type, Column_Number, Record_List):
-    if (Column_Type == 0):   # Null
-       return "NULL"
-    elif (Column_Type == 1): #Boolean
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('NULL')
-       else:
-          return Record_List.append(str(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore')))	
-    elif (Column_Type == 2): #INTEGER_8BIT_UNSIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))
-    elif (Column_Type == 3): #INTEGER_16BIT_SIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 4): #INTEGER_32BIT_SIGNED	
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))
-    elif (Column_Type == 5): #CURRENCY
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 6): #INTEGER_8BIT_UNSIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_floating_point(Column_Number))
-    elif (Column_Type == 7): #DOUBLE_64BIT
-       return Record_List.append(EsedbTable_Record.get_value_data_as_floating_point(Column_Number))	
-    elif (Column_Type == 8): #DATETIME	
-       #return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          #print (EsedbTable_Record.get_value_data(Column_Number))
-          return Record_List.append(ole_date_bin_to_datetime(EsedbTable_Record.get_value_data(Column_Number)))
-    elif (Column_Type == 9): #BINARY_DATA
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          return Record_List.append(EsedbTable_Record.get_value_data(Column_Number))
-    elif (Column_Type == 10): #TEXT	
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          return Record_List.append(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore'))
-    elif (Column_Type == 11): #LARGE_BINARY_DATA
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          return Record_List.append(EsedbTable_Record.get_value_data(Column_Number))
-    elif (Column_Type == 12): #LARGE_TEXT	
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          compressed_text = EsedbTable_Record.get_value_data(Column_Number)
-          comp_text = compressed_text[1]
-          if comp_text == 24:
-             #print ("This text is EXPRESS Compressed")
-             return Record_List.append(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore'))
-          elif comp_text >= 23:
-             #print ("This text is compressed using 7-bit")
-             compressed_data_index = 0
-             compressed_data = compressed_text
-             uncompressed_data_index = 0
-             compressed_data_size = len(compressed_data)
-             value_16bit = 0
-             bit_index = 0
-             compressed_data_index = 1
-             comp_data = 0
-             uncompressed_data = []
-             while compressed_data_index < compressed_data_size:
-                comp_data = (compressed_data[compressed_data_index])
-                value_16bit |= comp_data << bit_index
-                uncompressed_data_index = uncompressed_data_index + 1
-                uncompressed_data.append(chr(value_16bit & 0x7f))
-                value_16bit >>= 7
-                bit_index += 1
-                if bit_index == 7:
-                   uncompressed_data_index = uncompressed_data_index + 1
-                   uncompressed_data.append(chr(value_16bit & 0x7f))
-                   value_16bit >>= 7
-                   bit_index = 0
-                compressed_data_index += 1
-             last_char = uncompressed_data.pop()
-             out = "".join(uncompressed_data)
-             return Record_List.append(out) 
-          else:	
-             # print ("This text is not compressed")
-             return Record_List.append(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore'))
-    elif (Column_Type == 13): #SUPER_LARGE_VALUE
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 14): #INTEGER_32BIT_UNSIGNED	
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 15): #INTEGER_64BIT_SIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 16): #GUID	
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          return Record_List.append(str(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore')))
-    elif (Column_Type == 17): #INTEGER_16BIT_UNSIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
- 
-			  
 def Parse_ESEDB_File(File_To_Parse):
    file_object = open(File_To_Parse, "rb")
    esedb_file = pyesedb.file()
@@ -168,7 +138,6 @@ def Parse_ESEDB_File(File_To_Parse):
    SQLitedb.CreateTable('ESEDB_Master_Table','Tab_Name text')
    SQLitedb.CreateTable('ESEDB_Empty_Tables', 'Tab_Name Text')
    for i in range (0, Num_Of_tables):
-       SQL_Statement = ''
        Table = esedb_file.get_table(i)
        Table_name = Table_Dict[Table.get_name()]
        Template_Name = Table. get_template_name()
@@ -177,17 +146,7 @@ def Parse_ESEDB_File(File_To_Parse):
        print ("Table Name is ==> ", Table_name)
        if (Table_Num_Records > 0):
           SQLitedb.InsertValues('ESEDB_Master_Table','Tab_Name', "'" + Table_name + "'")
-          SQL_Statement = 'Create Temp Table '+ Table_name + '_Temp ('
-          Table_Record = Table.get_record(0)
-          Column_Name = Table_Record.get_column_name(0)
-          Column_Type = Table_Record.get_column_type(0)
-          SQLitedb.CreateTempTable(Table_name + '_Temp', SQLitedb.Check_SQL_Reserved_Word(Column_Name) + ' ' + Column_Dict[Column_Type])
-          for x in range(1, Table_Num_Columns):
-            Column_Name = Table_Record.get_column_name(x)
-            Column_Type = Table_Record.get_column_type(x)
-            SQL_Statement = SQL_Statement + ', ' + SQLitedb.Check_SQL_Reserved_Word(Column_Name) + '    ' + Column_Dict[Column_Type]
-            SQLitedb.AddColumn(Table_name + '_Temp', SQLitedb.Check_SQL_Reserved_Word(Column_Name) + ' ' + Column_Dict[Column_Type])
-          SQL_Statement = SQL_Statement + ');'
+          SQLitedb.CreateTempTable(Table_name + '_Temp', Get_Column_Definitions(SQLitedb, Table, Table_name))
        else:
           SQLitedb.InsertValues('ESEDB_Empty_Tables','Tab_Name', "'" + Table_name + "'")
    esedb_file.close()
@@ -206,89 +165,140 @@ def Create_Permanent_Tables():
    SQLitedb.DropTable('ESEDB_Master_Table')
    SQLitedb.DropTable('ESEDB_Empty_Tables')
 
+def Populate_ESEDB_Table(esedb_file, SQLite_db, Table_name, Insert_Table_Name, SRUM_Id_Map):
+   # Inserts the records of an ESE table into Insert_Table_Name, returns the number of records
+   EsedbTable = esedb_file.get_table_by_name(Table_Rev_Dict[Table_name])
+   Decoder_Plan = Esedb_Columns.Get_Decoder_Plan(EsedbTable, {'IdBlob':10})
+   Insert_Columns = []
+   Time_Stamp_Column = None
+   Id_Column_Numbers = []
+   for Column_Plan in Decoder_Plan:
+      Insert_Columns.append(SQLite_db.Check_SQL_Reserved_Word(Column_Plan[1]))
+      if Is_SRUM_Usage_Table(Table_name):
+         if Column_Plan[1].upper() == 'TIMESTAMP':
+            Time_Stamp_Column = Column_Plan[0]
+         if Column_Plan[1].upper() in SRUM_Id_Columns:
+            Insert_Columns.append(SRUM_Id_Columns[Column_Plan[1].upper()])
+            Id_Column_Numbers.insert(0, Column_Plan[0])
+   SQL_Statement_Columns = ','.join(Insert_Columns)
+   Number_Of_Columns = len(Insert_Columns)
+   if Is_SRUM_Usage_Table(Table_name):
+      SQL_Statement_Columns = SQL_Statement_Columns + ', ' + SRUM_Write_Ins_Columns
+      Number_Of_Columns = Number_Of_Columns + len(SRUM_Write_Columns)
+   SQL_Bind_Variables = SQLite_db.create_question_bind_variables(Number_Of_Columns)
+   SRUM_Write_Cache = {}
+   Number_Of_Records = EsedbTable.get_number_of_records()
+   for i in range(0, Number_Of_Records):
+      EsedbTable_Record = EsedbTable.get_record(i)
+      SQL_Bind_Values = Esedb_Columns.Decode_Record(EsedbTable_Record, Decoder_Plan)
+      if Is_SRUM_Usage_Table(Table_name):
+         if Time_Stamp_Column == None:
+            SQL_Bind_Values.extend(SRUM_Write_Null_Values)
+         else:
+            SQL_Bind_Values.extend(Get_SRUM_Write_Values(SQL_Bind_Values[Time_Stamp_Column], SRUM_Write_Cache))
+         # Last id column first so the column numbers of the ones before it still line up
+         for Column_Number in Id_Column_Numbers:
+            SQL_Bind_Values.insert(Column_Number + 1, SRUM_Id_Map.get(SQL_Bind_Values[Column_Number]))
+      SQLite_db.InsertBindValues(Insert_Table_Name, SQL_Statement_Columns, SQL_Bind_Variables, SQL_Bind_Values)
+   SQLite_db.FlushBindValues()
+   return Number_Of_Records
+
+def Get_Table_Names():
+   return [str(Table_Name[0]) for Table_Name in SQLitedb.SelectAllRows("Select tab_name from ESEDB_Master_Table where Tab_name not in (Select tab_name from ESEDB_Empty_tables);")]
+
+def Print_Table_Timings(Table_Timings):
+   # Lists the tables slowest first so the table that holds up the export stands out
+   for (Table_name, Number_Of_Records, Seconds) in sorted(Table_Timings, key=lambda Table_Timing: Table_Timing[2], reverse=True):
+      print ("Table ==> %-30s Records ==> %10d  Seconds ==> %9.2f" % (Table_name, Number_Of_Records, Seconds))
+
 def Populate_ESEDB_DB(File_To_Parse):
    file_object = open(File_To_Parse, "rb")
    esedb_file = pyesedb.file()
    esedb_file.open_file_object(file_object)
-   Table_Names = SQLitedb.SelectAllRows("Select tab_name from ESEDB_Master_Table where Tab_name not in (Select tab_name from ESEDB_Empty_tables);")
-   for Table_Name in Table_Names:
-        Table_name = str(Table_Name[0])
+   SRUM_Id_Map = Load_SRUM_Id_Map(esedb_file)
+   Table_Timings = []
+   for Table_name in Get_Table_Names():
         print ("Inserting into table " + str(Table_name))
-        EsedbTable = esedb_file.get_table_by_name(Table_Rev_Dict[Table_Name[0]])
-        for i in range(0,EsedbTable.get_number_of_records()):
-           SQL_Bind_Values = []
-           SQL_Statement_Table = 'Insert into ' + Table_Name[0] + '_temp'
-           EsedbTable_Record = EsedbTable.get_record(i)
-           EsedbTable_Num_Columns = EsedbTable.get_number_of_columns()
-           Column_Name = EsedbTable_Record.get_column_name(0)
-           SQL_Statement_Columns = SQLitedb.Check_SQL_Reserved_Word(Column_Name)
-           SQL_Bind_Variables = SQLitedb.create_question_bind_variables(EsedbTable.get_number_of_columns())
-           Column_Type = EsedbTable_Record.get_column_type(0)
-           Check_Column_Type(EsedbTable_Record, Column_Type, 0, SQL_Bind_Values)
-           for x in range(1,EsedbTable.get_number_of_columns()):
-               Column_Name = EsedbTable_Record.get_column_name(x)
-               SQL_Statement_Columns = SQL_Statement_Columns + ',' + SQLitedb.Check_SQL_Reserved_Word(Column_Name)
-               Column_Type = EsedbTable_Record.get_column_type(x)
-               if Column_Name == 'IdBlob':
-                  Check_Column_Type(EsedbTable_Record, 10, x, SQL_Bind_Values)
-               else:
-                  Check_Column_Type(EsedbTable_Record, Column_Type, x, SQL_Bind_Values)
-           SQLitedb.InsertBindValues(Table_Name[0] + '_temp', SQL_Statement_Columns, SQL_Bind_Variables, SQL_Bind_Values)
+        Start_Time = time.time()
+        Number_Of_Records = Populate_ESEDB_Table(esedb_file, SQLitedb, Table_name, Table_name + '_temp', SRUM_Id_Map)
+        Table_Timings.append((Table_name, Number_Of_Records, time.time() - Start_Time))
+   esedb_file.close()
+   Print_Table_Timings(Table_Timings)
+
+def Export_ESEDB_Table(Table_Info):
+   # Worker process entry point, exports one table with its own pyesedb handle into its own staging database
+   (File_To_Parse, Table_name, Staging_DB_Name, SRUM_Id_Map) = Table_Info
+   Start_Time = time.time()
+   file_object = open(File_To_Parse, "rb")
+   esedb_file = pyesedb.file()
+   esedb_file.open_file_object(file_object)
+   Staging_db = SQLiteDb()
+   Staging_db.RemoveDB_File(Staging_DB_Name)
+   Staging_db.Open(Staging_DB_Name, bulk_load=True)
+   try:
+      Staging_db.CreateTable(Table_name, Get_Column_Definitions(Staging_db, esedb_file.get_table_by_name(Table_Rev_Dict[Table_name]), Table_name))
+      Number_Of_Records = Populate_ESEDB_Table(esedb_file, Staging_db, Table_name, Table_name, SRUM_Id_Map)
+   except Exception as err:
+      print (' Error exporting table ==> ', Table_name, ' ', str(err))
+      Staging_db.Close()
+      Staging_db.RemoveDB_File(Staging_DB_Name)
+      esedb_file.close()
+      return (Table_name, None, 0, time.time() - Start_Time)
+   Staging_db.Close()
    esedb_file.close()
+   return (Table_name, Staging_DB_Name, Number_Of_Records, time.time() - Start_Time)
 
-def Post_Database_Processing():
+def Populate_ESEDB_DB_Parallel(File_To_Parse, SQLite_DB_Name, Number_Of_Workers):
+   # Every table is exported by a worker process into its own staging database, the largest tables are
+   # handed out first.  Each staging database is copied into the temp table of the output database as
+   # soon as its worker is done.
+   esedb_file = pyesedb.file()
+   esedb_file.open_file_object(open(File_To_Parse, "rb"))
+   Table_Names = sorted(Get_Table_Names(), key=lambda Table_name: esedb_file.get_table_by_name(Table_Rev_Dict[Table_name]).get_number_of_records(), reverse=True)
+   # The id map is read once here and handed to every worker
+   SRUM_Id_Map = Load_SRUM_Id_Map(esedb_file)
+   esedb_file.close()
+   Work_List = [(File_To_Parse, Table_name, SQLite_DB_Name + '.staging' + str(i), SRUM_Id_Map) for (i, Table_name) in enumerate(Table_Names)]
+   Table_Timings = []
+
+   pool = multiprocessing.Pool(processes=min(Number_Of_Workers, len(Work_List)))
+   try:
+      for (Table_name, Staging_DB_Name, Number_Of_Records, Seconds) in pool.imap_unordered(Export_ESEDB_Table, Work_List):
+         print ("Exported table ==> " + Table_name + " in " + str(round(Seconds, 2)) + " seconds")
+         Table_Timings.append((Table_name, Number_Of_Records, Seconds))
+         if Staging_DB_Name == None:
+            continue
+         SQLitedb.AttachDatabase(Staging_DB_Name, 'staging')
+         SQLitedb.InsertSelect('insert into ' + Table_name + '_temp select * from staging.' + Table_name + ';')
+         SQLitedb.DetachDatabase('staging')
+         SQLitedb.RemoveDB_File(Staging_DB_Name)
+   finally:
+      pool.close()
+      pool.join()
+   Print_Table_Timings(Table_Timings)
 
-   Table_Names = SQLitedb.SelectAllRows("Select tab_name from ESEDB_Master_Table where Tab_name not in (Select tab_name from ESEDB_Empty_tables) and tab_name not like 'MSys%' and Tab_name not like 'Sru%';")
-   for Table_Name in Table_Names:
-        Table_name = str(Table_Name[0])
-        SQLitedb.AddColumn(Table_name + '_temp', 'SRUM_Write_Date text')
-        SQLitedb.AddColumn(Table_name + '_temp', 'SRUM_Write_time text')
-        SQLitedb.AddColumn(Table_name + '_temp', 'SRUM_Write_Time_Hour integer')
-        SQLitedb.AddColumn(Table_name + '_temp', 'SRUM_Write_time_Minute integer')
-        SQLitedb.AddColumn(Table_name + '_temp', 'SRUM_Write_time_Day_Of_Week integer')
-        SQLitedb.AddColumn(Table_name + '_temp', 'SRUM_Write_epochtime integer')
-        SQLitedb.AddColumn(Table_name + '_temp', 'SRUM_Write_Date_Month text')
-        SQLitedb.AddColumn(Table_name + '_temp', 'SRUM_Write_Date_Day Integer')
-        SQL_Statement = "update " + Table_name + "_temp set SRUM_Write_Date = date(timestamp), " \
-                             "SRUM_Write_Time = time(timestamp), SRUM_Write_Time_Hour = strftime('%H', timestamp), " \
-                             "srum_Write_Time_Minute = strftime('%M', timestamp), srum_Write_Time_Day_Of_Week = " \
-					         "(case when strftime('%w', timestamp) = '0' then 'Sunday' " \
-                             "when strftime('%w', timestamp) = '1' then 'Monday' when strftime('%w', timestamp) = '2' then 'Tuesday' " \
-                             "when strftime('%w', timestamp) = '3' then 'Wednesday' when strftime('%w', timestamp) = '4' then 'Thursday' " \
-                             "when strftime('%w', timestamp) = '5' then 'Friday' when strftime('%w', timestamp) = '6' then 'Saturday' " \
-                             "end), srum_Write_epochtime = strftime('%s', timestamp), srum_write_Date_Day = strftime('%d', timestamp);"
-        #print (SQL_Statement)
-        SQLitedb.UpdateTable(SQL_Statement)
-        SQL_Statement = "update " + Table_name + "_Temp set SRUM_Write_Date_Month  = " \
-	                         "(case when strftime('%m', timestamp) = '01' then 'January' " \
-                             "when strftime('%m', timestamp) = '02' then 'February' " \
-                             "when strftime('%m', timestamp) = '03' then 'March' " \
-                             "when strftime('%m', timestamp) = '04' then 'April' " \
-                             "when strftime('%m', timestamp) = '05' then 'May' " \
-                             "when strftime('%m', timestamp) = '06' then 'June' " \
-                             "when strftime('%m', timestamp) = '07' then 'July' " \
-                             "when strftime('%m', timestamp) = '08' then 'August' " \
-                             "when strftime('%m', timestamp) = '09' then 'September' " \
-                             "when strftime('%m', timestamp) = '10' then 'October' " \
-                             "when strftime('%m', timestamp) = '11' then 'November' " \
-                             "when strftime('%m', timestamp) = '07' then 'December' end);"
-        #print (SQL_Statement)
-        SQLitedb.UpdateTable(SQL_Statement)
-   
 
-args = sys.argv[1:]
-File_To_Parse = args[0]
-SQLite_DB_Name = args[1]
+if __name__ == '__main__':
+   multiprocessing.freeze_support()
 
-SQLitedb = SQLiteDb()
-SQLitedb.RemoveDB_File(SQLite_DB_Name)
-SQLitedb.Open(SQLite_DB_Name)
+   parser = argparse.ArgumentParser(description='Export a SRUM database to a SQLite database')
+   parser.add_argument('File_To_Parse', help='SRUM database (srudb.dat) to export')
+   parser.add_argument('SQLite_DB_Name', help='SQLite database to write')
+   parser.add_argument('-w', '--workers', type=int, default=(os.cpu_count() or 1), \
+                       help='number of worker processes, 1 exports the tables one after another')
+   args = parser.parse_args()
+   File_To_Parse = args.File_To_Parse
+   SQLite_DB_Name = args.SQLite_DB_Name
 
-Parse_ESEDB_File(File_To_Parse)
-Populate_ESEDB_DB(File_To_Parse)
-Post_Database_Processing()
+   SQLitedb = SQLiteDb()
+   SQLitedb.RemoveDB_File(SQLite_DB_Name)
+   SQLitedb.Open(SQLite_DB_Name, bulk_load=True)
 
-Create_Permanent_Tables()
-SQLitedb.Close()
+   Parse_ESEDB_File(File_To_Parse)
+   if args.workers > 1 and len(Get_Table_Names()) > 1:
+      Populate_ESEDB_DB_Parallel(File_To_Parse, SQLite_DB_Name, args.workers)
+   else:
+      Populate_ESEDB_DB(File_To_Parse)
 
-	
\ No newline at end of file
+   Create_Permanent_Tables()
+   SQLitedb.Close()
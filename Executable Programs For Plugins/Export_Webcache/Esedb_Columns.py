@@ -0,0 +1,234 @@
+# Esedb_Columns.py = Python functions to decode the column values of an ESE database table
+#
+# Copyright (C) 2016 Mark McKinnon (Mark.McKinnon@Davenport.edu)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You can view the GNU General Public License at <http://www.gnu.org/licenses/>
+#
+# Version History:
+#  Initial Version - Requires pyesedb python binding from the project libyal/libesedb
+#  Version 1.1 - Block based 7-bit decompression with a differential check and benchmark
+#  Version 1.2 - Cache the decoded date time values of a column
+#
+# Usage Examples:
+# python3 Esedb_Columns.py          (check the 7-bit decompressor and run its benchmark)
+#
+# The type of a column comes from the table catalog and is the same for every record.  Instead of
+# checking the column type for every cell a decoder plan, holding one decode function per column,
+# is built once for a table and applied to every record of that table.
+
+import datetime
+import math
+import random
+import timeit
+from struct import unpack
+
+
+def ole_date_bin_to_datetime(ole_date_bin):
+    """
+        Converts a OLE date from a binary 8 bytes little endian hex form to a datetime
+    """
+    #Conversion to OLE date float, where:
+    # - integer part: days from epoch (1899/12/30 00:00)
+    # - decimal part: percentage of the day, where 0,5 is midday
+    date_float = unpack('<d', ole_date_bin)[0]
+    date_decimal, date_integer = math.modf(date_float)
+    date_decimal = abs(date_decimal)
+    date_integer = int(date_integer)
+
+    #Calculate the result
+    res = datetime.datetime(1899, 12, 30) + datetime.timedelta(days=date_integer) #adding days to epoch
+    res = res + datetime.timedelta(seconds = 86400*date_decimal) #adding percentage of the day
+    return res
+
+# A 7-bit compressed value packs the 7-bit characters of the text one after the other.  Character k
+# has to move k bits to the left to end up in its own byte, so instead of unpacking one character
+# at a time a whole block of compressed data is handled as one integer.  For each bit of k, from the
+# highest one down, the characters with that bit set are selected with a precomputed mask and moved
+# together.  Blocks are a multiple of 7 bytes so every block starts on a character boundary.
+Seven_Bit_Block_Size = 3584
+Seven_Bit_Block_Characters = 4096
+
+def Create_7Bit_Masks(Number_Of_Characters):
+    # Returns the (mask, shift) pairs that move the characters of a block to their own bytes
+    Seven_Bit_Masks = []
+    Shift = Number_Of_Characters // 2
+    while Shift > 0:
+       Mask = 0
+       for Character_Number in range(Shift, Number_Of_Characters):
+          if Character_Number & Shift:
+             # Position after the moves of the higher bits of the character number
+             Mask |= 0x7f << ((7 * Character_Number) + (Character_Number & ~((Shift * 2) - 1)))
+       Seven_Bit_Masks.append((Mask, Shift))
+       Shift = Shift // 2
+    return Seven_Bit_Masks
+
+Seven_Bit_Masks = Create_7Bit_Masks(Seven_Bit_Block_Characters)
+Seven_Bit_Character_Mask = int.from_bytes(b'\x7f' * Seven_Bit_Block_Characters, 'little')
+
+def Decompress_7Bit_Text(compressed_data):
+    # Decompresses a 7-bit compressed LARGE_TEXT value, the first byte is the compression header
+    Uncompressed_Data = []
+    for Block_Offset in range(1, len(compressed_data), Seven_Bit_Block_Size):
+       Block = compressed_data[Block_Offset:Block_Offset + Seven_Bit_Block_Size]
+       Block_Characters = len(Block) + (len(Block) // 7)
+       Block_Value = int.from_bytes(Block, 'little')
+       for (Mask, Shift) in Seven_Bit_Masks:
+          if Shift <= Block_Characters:
+             Selected_Characters = Block_Value & Mask
+             Block_Value = (Block_Value ^ Selected_Characters) | (Selected_Characters << Shift)
+       Uncompressed_Data.append((Block_Value & Seven_Bit_Character_Mask).to_bytes(Block_Characters + 1, 'little')[:Block_Characters])
+    # The last character only holds the left over bits of the last byte
+    return b''.join(Uncompressed_Data)[:-1].decode('ascii')
+
+def Decompress_7Bit_Text_Bitwise(compressed_data):
+    # Reference implementation that unpacks one character at a time, used by Check_7Bit_Decompression
+    compressed_data_size = len(compressed_data)
+    value_16bit = 0
+    bit_index = 0
+    compressed_data_index = 1
+    uncompressed_data = []
+    while compressed_data_index < compressed_data_size:
+       value_16bit |= compressed_data[compressed_data_index] << bit_index
+       uncompressed_data.append(chr(value_16bit & 0x7f))
+       value_16bit >>= 7
+       bit_index += 1
+       if bit_index == 7:
+          uncompressed_data.append(chr(value_16bit & 0x7f))
+          value_16bit >>= 7
+          bit_index = 0
+       compressed_data_index += 1
+    if uncompressed_data:
+       uncompressed_data.pop()
+    return "".join(uncompressed_data)
+
+def Check_7Bit_Decompression(Number_Of_Values=5000, Seed=1):
+    # Compares the block decompressor with the bitwise one on random values, returns the mismatches
+    Random_Values = random.Random(Seed)
+    Mismatches = []
+    for Value_Number in range(0, Number_Of_Values):
+       Value_Size = Random_Values.choice((Random_Values.randint(0, 64), Random_Values.randint(0, 9000)))
+       Compressed_Data = bytes([0x17]) + bytes([Random_Values.getrandbits(8) for Byte_Number in range(0, Value_Size)])
+       if Decompress_7Bit_Text(Compressed_Data) != Decompress_7Bit_Text_Bitwise(Compressed_Data):
+          Mismatches.append(Compressed_Data)
+    return Mismatches
+
+def Benchmark_7Bit_Decompression(Value_Sizes=(32, 256, 2048, 16384), Number_Of_Runs=200):
+    # Returns (value size, bitwise seconds, block seconds) for decompressing random values
+    Random_Values = random.Random(1)
+    Benchmark_Times = []
+    for Value_Size in Value_Sizes:
+       Compressed_Data = bytes([0x17]) + bytes([Random_Values.getrandbits(8) for Byte_Number in range(0, Value_Size)])
+       Bitwise_Time = timeit.timeit(lambda: Decompress_7Bit_Text_Bitwise(Compressed_Data), number=Number_Of_Runs)
+       Block_Time = timeit.timeit(lambda: Decompress_7Bit_Text(Compressed_Data), number=Number_Of_Runs)
+       Benchmark_Times.append((Value_Size, Bitwise_Time, Block_Time))
+    return Benchmark_Times
+
+def Decode_Null(EsedbTable_Record, Column_Number):
+    return None
+
+def Decode_Integer(EsedbTable_Record, Column_Number):
+    return EsedbTable_Record.get_value_data_as_integer(Column_Number)
+
+def Decode_Floating_Point(EsedbTable_Record, Column_Number):
+    return EsedbTable_Record.get_value_data_as_floating_point(Column_Number)
+
+def Decode_Boolean(EsedbTable_Record, Column_Number):
+    Value_Data = EsedbTable_Record.get_value_data(Column_Number)
+    if (Value_Data == None):
+       return 'NULL'
+    return str(Value_Data.decode('utf-16', 'ignore'))
+
+def Decode_Date_Time(EsedbTable_Record, Column_Number):
+    Value_Data = EsedbTable_Record.get_value_data(Column_Number)
+    if (Value_Data == None):
+       return ''
+    return ole_date_bin_to_datetime(Value_Data)
+
+def Create_Cached_Date_Time_Decoder():
+    # Returns a date time decode function that converts each distinct value only once, records
+    # written at the same time share the same date time value
+    Date_Time_Cache = {}
+    def Decode_Cached_Date_Time(EsedbTable_Record, Column_Number):
+       Value_Data = EsedbTable_Record.get_value_data(Column_Number)
+       if (Value_Data == None):
+          return ''
+       Date_Time = Date_Time_Cache.get(Value_Data)
+       if (Date_Time == None):
+          Date_Time = ole_date_bin_to_datetime(Value_Data)
+          Date_Time_Cache[Value_Data] = Date_Time
+       return Date_Time
+    return Decode_Cached_Date_Time
+
+def Decode_Binary(EsedbTable_Record, Column_Number):
+    Value_Data = EsedbTable_Record.get_value_data(Column_Number)
+    if (Value_Data == None):
+       return ''
+    return Value_Data
+
+def Decode_Text(EsedbTable_Record, Column_Number):
+    Value_Data = EsedbTable_Record.get_value_data(Column_Number)
+    if (Value_Data == None):
+       return ''
+    return Value_Data.decode('utf-16', 'ignore')
+
+def Decode_Large_Text(EsedbTable_Record, Column_Number):
+    Value_Data = EsedbTable_Record.get_value_data(Column_Number)
+    if (Value_Data == None):
+       return ''
+    Compression_Type = Value_Data[1]
+    if Compression_Type == 24:
+       # EXPRESS compressed, left as is
+       return Value_Data.decode('utf-16', 'ignore')
+    elif Compression_Type >= 23:
+       return Decompress_7Bit_Text(Value_Data)
+    return Value_Data.decode('utf-16', 'ignore')
+
+def Decode_Guid(EsedbTable_Record, Column_Number):
+    Value_Data = EsedbTable_Record.get_value_data(Column_Number)
+    if (Value_Data == None):
+       return ''
+    return str(Value_Data.decode('utf-16', 'ignore'))
+
+# Decode function for each column type, unknown column types are exported as their raw value data
+Column_Decoders = {0:Decode_Null, 1:Decode_Boolean, 2:Decode_Integer, 3:Decode_Integer, 4:Decode_Integer, \
+                   5:Decode_Integer, 6:Decode_Floating_Point, 7:Decode_Floating_Point, 8:Decode_Date_Time, \
+                   9:Decode_Binary, 10:Decode_Text, 11:Decode_Binary, 12:Decode_Large_Text, 13:Decode_Integer, \
+                   14:Decode_Integer, 15:Decode_Integer, 16:Decode_Guid, 17:Decode_Integer}
+
+def Get_Decoder_Plan(EsedbTable, Column_Type_Overrides=None):
+    # Returns a list of (column number, column name, column type, decode function) for the columns of
+    # the table.  Column_Type_Overrides maps a column name to the column type it is decoded as.
+    Decoder_Plan = []
+    for Column_Number in range(0, EsedbTable.get_number_of_columns()):
+       Esedb_Column = EsedbTable.get_column(Column_Number)
+       Column_Name = Esedb_Column.get_name()
+       Column_Type = Esedb_Column.get_type()
+       if Column_Type_Overrides and Column_Name in Column_Type_Overrides:
+          Column_Type = Column_Type_Overrides[Column_Name]
+       if (Column_Type == 8):
+          Column_Decoder = Create_Cached_Date_Time_Decoder()
+       else:
+          Column_Decoder = Column_Decoders.get(Column_Type, Decode_Binary)
+       Decoder_Plan.append((Column_Number, Column_Name, Column_Type, Column_Decoder))
+    return Decoder_Plan
+
+def Decode_Record(EsedbTable_Record, Decoder_Plan):
+    # Returns the decoded values of a record in column order
+    return [Column_Decoder(EsedbTable_Record, Column_Number) for (Column_Number, Column_Name, Column_Type, Column_Decoder) in Decoder_Plan]
+
+
+if __name__ == '__main__':
+    Mismatches = Check_7Bit_Decompression()
+    print ("7-bit decompression mismatches ==> " + str(len(Mismatches)))
+    for (Value_Size, Bitwise_Time, Block_Time) in Benchmark_7Bit_Decompression():
+        print ("Value size ==> %6d  bitwise ==> %8.4fs  block ==> %8.4fs  speedup ==> %6.1fx" % (Value_Size, Bitwise_Time, Block_Time, Bitwise_Time / Block_Time))
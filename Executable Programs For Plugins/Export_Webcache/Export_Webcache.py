@@ -16,16 +16,25 @@
 #
 # Version History:
 #  Initial Version - Requires pyesedb python binding from the project libyal/libesedb
+#  Version 1.1 - Export the record ranges in a pool of worker processes instead of one
+#                Export_Webcache_Records process per range
+#  Version 1.2 - Consolidate the containers with one insert select instead of update passes
+#  Version 1.3 - Only export the containers selected with --include-containers/--exclude-containers
 # 
 # Usage Examples:
 # python3 export_Webcache.py /home/mark/webcachev01.dat Webcache.db3
+# python3 export_Webcache.py /home/mark/webcachev01.dat Webcache.db3 --workers 4
+# python3 export_Webcache.py /home/mark/webcachev01.dat Webcache.db3 --include-containers History,Content,Cookies,DOMStore
+# python3 export_Webcache.py /home/mark/webcachev01.dat Webcache.db3 --exclude-containers iedownload,AppCache,Container_12
 
 import pyesedb
 from Database import SQLiteDb
 import os
 import sys
 import re
-import subprocess 
+import argparse
+import multiprocessing
+import Esedb_Columns
 
 # Setup dictionary for column types
 Column_Dict = {0:'NULL', 1:'Text', 2:'Integer', 3:'Integer', 4:'Integer', 5:'Integer', 6:'Real', 7:'Real', 8:'Integer', 9:'Blob', \
@@ -38,161 +47,80 @@ create_table_columns = "EntryId Integer , ContainerId Integer, UrlHash Integer,
 create_tab_columns = "EntryId Integer , ContainerId Integer, UrlHash Integer, AccessCount Integer, SyncTime text, " + \
                        " CreationTime text, ExpiryTime text, ModifiedTime text, AccessedTime text, " \
                        " Url Text, Filename Text, FileSize Integer, container_name text"
-              
-              
-def ole_date_bin_to_datetime(ole_date_bin):
-    """
-        Converts a OLE date from a binary 8 bytes little endian hex form to a datetime
-    """
-    #Conversion to OLE date float, where:
-    # - integer part: days from epoch (1899/12/30 00:00) 
-    # - decimal part: percentage of the day, where 0,5 is midday
-    date_float = unpack('<d', ole_date_bin)[0]
-    date_decimal, date_integer = math.modf(date_float)
-    date_decimal = abs(date_decimal)
-    date_integer = int(date_integer)
 
-    #Calculate the result
-    res = datetime.datetime(1899, 12, 30) + datetime.timedelta(days=date_integer) #adding days to epoch
-    res = res + datetime.timedelta(seconds = 86400*date_decimal) #adding percentage of the day
-    return res
+# Number of records exported as one range
+Records_Per_Range = 20000
 
-def Check_Column_Type(EsedbTable_Record, Column_Type, Column_Number, Record_List):
-    if (Column_Type == 0):   # Null
-       return "NULL"
-    elif (Column_Type == 1): #Boolean
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('NULL')
-       else:
-          return Record_List.append(str(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore')))	
-    elif (Column_Type == 2): #INTEGER_8BIT_UNSIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))
-    elif (Column_Type == 3): #INTEGER_16BIT_SIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 4): #INTEGER_32BIT_SIGNED	
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))
-    elif (Column_Type == 5): #CURRENCY
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 6): #INTEGER_8BIT_UNSIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_floating_point(Column_Number))
-    elif (Column_Type == 7): #DOUBLE_64BIT
-       return Record_List.append(EsedbTable_Record.get_value_data_as_floating_point(Column_Number))	
-    elif (Column_Type == 8): #FLOAT_32BIT	
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          return Record_List.append(ole_date_bin_to_datetime(EsedbTable_Record.get_value_data(Column_Number)))
-    elif (Column_Type == 9): #BINARY_DATA
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          return Record_List.append(EsedbTable_Record.get_value_data(Column_Number))
-    elif (Column_Type == 10): #TEXT	
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          return Record_List.append(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore'))
-    elif (Column_Type == 11): #LARGE_BINARY_DATA
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          return Record_List.append(EsedbTable_Record.get_value_data(Column_Number))
-    elif (Column_Type == 12): #LARGE_TEXT	
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          compressed_text = EsedbTable_Record.get_value_data(Column_Number)
-          comp_text = compressed_text[1]
-          if comp_text == 24:
-             #print ("This text is EXPRESS Compressed")
-             return Record_List.append(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore'))
-          elif comp_text >= 23:
-             #print ("This text is compressed using 7-bit")
-             compressed_data_index = 0
-             compressed_data = compressed_text
-             uncompressed_data_index = 0
-             compressed_data_size = len(compressed_data)
-             value_16bit = 0
-             bit_index = 0
-             compressed_data_index = 1
-             comp_data = 0
-             uncompressed_data = []
-             while compressed_data_index < compressed_data_size:
-                comp_data = (compressed_data[compressed_data_index])
-                value_16bit |= comp_data << bit_index
-                uncompressed_data_index = uncompressed_data_index + 1
-                uncompressed_data.append(chr(value_16bit & 0x7f))
-                value_16bit >>= 7
-                bit_index += 1
-                if bit_index == 7:
-                   uncompressed_data_index = uncompressed_data_index + 1
-                   uncompressed_data.append(chr(value_16bit & 0x7f))
-                   value_16bit >>= 7
-                   bit_index = 0
-                compressed_data_index += 1
-             last_char = uncompressed_data.pop()
-             out = "".join(uncompressed_data)
-             return Record_List.append(out) 
-          else:	
-             # print ("This text is not compressed")
-             return Record_List.append(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore'))
-    elif (Column_Type == 13): #SUPER_LARGE_VALUE
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 14): #INTEGER_32BIT_UNSIGNED	
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 15): #INTEGER_64BIT_SIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
-    elif (Column_Type == 16): #GUID	
-       if (EsedbTable_Record.get_value_data(Column_Number) == None):
-          return Record_List.append('')
-       else:
-          return Record_List.append(str(EsedbTable_Record.get_value_data(Column_Number).decode('utf-16', 'ignore')))
-    elif (Column_Type == 17): #INTEGER_16BIT_UNSIGNED
-       return Record_List.append(EsedbTable_Record.get_value_data_as_integer(Column_Number))	
- 
-			  
-def Parse_ESEDB_File(File_To_Parse, SQLite_DB_Name):
+def Get_Column_Definitions(SQLite_db, EsedbTable):
+   # Returns the column definitions of the export table of an ESE table
+   Column_Definitions = []
+   for x in range(0, EsedbTable.get_number_of_columns()):
+       Esedb_Column = EsedbTable.get_column(x)
+       Column_Definitions.append(SQLite_db.Check_SQL_Reserved_Word(Esedb_Column.get_name()) + ' ' + Column_Dict[Esedb_Column.get_type()])
+   return ', '.join(Column_Definitions)
+
+def Get_Comma_List(Comma_Text):
+   # Splits a comma delimited command line option, empty entries are dropped
+   return [Item.strip() for Item in Comma_Text.split(',') if Item.strip() != '']
+
+def Get_Container_Name_Set(Comma_Text):
+   return frozenset([Container_Name.upper() for Container_Name in Get_Comma_List(Comma_Text)])
+
+def Get_Container_Types(esedb_file):
+   # Returns a dictionary of container table name (Container_<ContainerId>) to the container type name
+   # (History, Content, Cookies, ...) from the Containers table
+   Container_Types = {}
+   EsedbTable = esedb_file.get_table_by_name('Containers')
+   if EsedbTable == None:
+      return Container_Types
+   Column_Numbers = {}
+   for x in range(0, EsedbTable.get_number_of_columns()):
+      Column_Numbers[EsedbTable.get_column(x).get_name()] = x
+   if 'ContainerId' not in Column_Numbers or 'Name' not in Column_Numbers:
+      return Container_Types
+   for i in range(0, EsedbTable.get_number_of_records()):
+      EsedbTable_Record = EsedbTable.get_record(i)
+      Container_Id = EsedbTable_Record.get_value_data_as_integer(Column_Numbers['ContainerId'])
+      Container_Name = EsedbTable_Record.get_value_data(Column_Numbers['Name'])
+      if Container_Name != None:
+         Container_Types['Container_' + str(Container_Id)] = Container_Name.decode('utf-16', 'ignore').rstrip('\x00')
+   return Container_Types
+
+def Is_Container_Selected(Table_name, Container_Type, Include_Containers, Exclude_Containers):
+   # A container is selected by its type name or by its table name, excluding wins over including
+   Container_Names = set([Table_name.upper(), Container_Type.upper()])
+   if Exclude_Containers != None and not Container_Names.isdisjoint(Exclude_Containers):
+      return False
+   if Include_Containers != None and Container_Names.isdisjoint(Include_Containers):
+      return False
+   return True
+
+def Parse_ESEDB_File(File_To_Parse, SQLite_DB_Name, Include_Containers=None, Exclude_Containers=None):
    file_object = open(File_To_Parse, "rb")
    esedb_file = pyesedb.file()
    esedb_file.open_file_object(file_object)
+   Container_Types = Get_Container_Types(esedb_file)
    Num_Of_tables = esedb_file.get_number_of_tables()
    print ("The number of tables is ==> ", Num_Of_tables)
    SQLitedb.CreateTable('ESEDB_Master_Table','Tab_Name text')
    SQLitedb.CreateTable('ESEDB_Empty_Tables', 'Tab_Name Text')
    for i in range (0, Num_Of_tables):
-       SQL_Statement = ''
        Table = esedb_file.get_table(i)
        Table_name = Table.get_name()
        Template_Name = Table. get_template_name()
        Table_Num_Columns = Table.get_number_of_columns()
        Table_Num_Records = Table.get_number_of_records()
        print ("Table Name is ==> ", Table_name, " Number of records is ==> ", Table_Num_Records)
+       if Table_name in Container_Types and \
+          not Is_Container_Selected(Table_name, Container_Types[Table_name], Include_Containers, Exclude_Containers):
+          # Containers that are not selected are never decoded or written
+          print ("Skipping container ==> ", Table_name, " ", Container_Types[Table_name])
+          continue
        if (Table_Num_Records > 0):
           SQLitedb.InsertValues('ESEDB_Master_Table','Tab_Name', "'" + Table_name + "'")
-          SQL_Statement = 'Create Temp Table '+ Table_name + '_Temp ('
-          Table_Record = Table.get_record(0)
-          Column_Name = Table_Record.get_column_name(0)
-          Column_Type = Table_Record.get_column_type(0)
-          SQLitedb.CreateTable(Table_name, SQLitedb.Check_SQL_Reserved_Word(Column_Name) + ' ' + Column_Dict[Column_Type])
-          for x in range(1, Table_Num_Columns):
-            Column_Name = Table_Record.get_column_name(x)
-            Column_Type = Table_Record.get_column_type(x)
-            SQL_Statement = SQL_Statement + ', ' + SQLitedb.Check_SQL_Reserved_Word(Column_Name) + '    ' + Column_Dict[Column_Type]
-            SQLitedb.AddColumn(Table_name, SQLitedb.Check_SQL_Reserved_Word(Column_Name) + ' ' + Column_Dict[Column_Type])
-          SQL_Statement = SQL_Statement + ');'
-          Num_Records_Begin = 0
-          Num_Records_End = 20000
-          while True:
-             if Table_Num_Records < 19999:
-                ESEDB_Process_Records.append(["Export_Webcache_Records.exe", File_To_Parse, SQLite_DB_Name, Table_name, str(Num_Records_Begin), str(Table_Num_Records)])
-                break
-             elif Table_Num_Records < Num_Records_End:
-                ESEDB_Process_Records.append(["Export_Webcache_Records.exe", File_To_Parse, SQLite_DB_Name, Table_name, str(Num_Records_Begin), str(Table_Num_Records)])
-                break
-             else:
-                ESEDB_Process_Records.append(["Export_Webcache_Records.exe", File_To_Parse, SQLite_DB_Name, Table_name, str(Num_Records_Begin), str(Num_Records_End)])
-             Num_Records_Begin = Num_Records_Begin + 20000
-             Num_Records_End = Num_Records_End + 20000
+          SQLitedb.CreateTable(Table_name, Get_Column_Definitions(SQLitedb, Table))
+          for Num_Records_Begin in range(0, Table_Num_Records, Records_Per_Range):
+             ESEDB_Process_Records.append((Table_name, Num_Records_Begin, min(Table_Num_Records, Num_Records_Begin + Records_Per_Range)))
        else:
           SQLitedb.InsertValues('ESEDB_Empty_Tables','Tab_Name', "'" + Table_name + "'")
 	  
@@ -206,71 +134,146 @@ def Create_Permanent_Tables():
         print ("creating permanent " + str(Table_name), str(Table_name) + "_temp")
         SQLitedb.CreatePermanentTable(Table_name, str(Table_name) + "_temp")
 
+def Populate_Record_Range(EsedbTable, SQLite_db, Table_name, Begin_Record_Number, End_Record_Number):
+   # Inserts records Begin_Record_Number up to End_Record_Number of an ESE table into Table_name
+   Decoder_Plan = Esedb_Columns.Get_Decoder_Plan(EsedbTable)
+   SQL_Statement_Columns = ','.join([SQLite_db.Check_SQL_Reserved_Word(Column_Plan[1]) for Column_Plan in Decoder_Plan])
+   SQL_Bind_Variables = SQLite_db.create_question_bind_variables(len(Decoder_Plan))
+   for i in range(Begin_Record_Number, End_Record_Number):
+      EsedbTable_Record = EsedbTable.get_record(i)
+      SQL_Bind_Values = Esedb_Columns.Decode_Record(EsedbTable_Record, Decoder_Plan)
+      SQLite_db.InsertBindValues(Table_name, SQL_Statement_Columns, SQL_Bind_Variables, SQL_Bind_Values)
+   SQLite_db.FlushBindValues()
+
+def Open_Worker_ESEDB_File(File_To_Parse):
+   # Worker process initializer, the ESE file is opened once per worker and used for all of its ranges
+   global Worker_Esedb_File
+   Worker_Esedb_File = pyesedb.file()
+   Worker_Esedb_File.open_file_object(open(File_To_Parse, "rb"))
+
+def Export_Record_Range(Range_Info):
+   # Worker process entry point, exports one range of records into its own shard database
+   (Table_name, Begin_Record_Number, End_Record_Number, Shard_DB_Name) = Range_Info
+   Shard_db = SQLiteDb()
+   Shard_db.RemoveDB_File(Shard_DB_Name)
+   Shard_db.Open(Shard_DB_Name, bulk_load=True)
+   try:
+      EsedbTable = Worker_Esedb_File.get_table_by_name(Table_name)
+      Shard_db.CreateTable(Table_name, Get_Column_Definitions(Shard_db, EsedbTable))
+      Populate_Record_Range(EsedbTable, Shard_db, Table_name, Begin_Record_Number, End_Record_Number)
+   except Exception as err:
+      print (' Error exporting records ==> ', Table_name, ' ', Begin_Record_Number, ' - ', End_Record_Number, ' ', str(err))
+      Shard_db.Close()
+      Shard_db.RemoveDB_File(Shard_DB_Name)
+      return None
+   Shard_db.Close()
+   return Shard_DB_Name
+
 def Populate_ESEDB_DB(File_To_Parse, SQLite_DB_Name):
-   for Record_To_Process in ESEDB_Process_Records:
-      #print (Record_To_Process)
-      #print (Record_To_Process[0])
-      subprocess.run(Record_To_Process)
+   file_object = open(File_To_Parse, "rb")
+   esedb_file = pyesedb.file()
+   esedb_file.open_file_object(file_object)
+   for (Table_name, Begin_Record_Number, End_Record_Number) in ESEDB_Process_Records:
+      print ("Inserting records into table ==> " + Table_name + " " + str(Begin_Record_Number) + " - " + str(End_Record_Number))
+      Populate_Record_Range(esedb_file.get_table_by_name(Table_name), SQLitedb, Table_name, Begin_Record_Number, End_Record_Number)
+   esedb_file.close()
+
+def Populate_ESEDB_DB_Parallel(File_To_Parse, SQLite_DB_Name, Number_Of_Workers):
+   # Every range of records is exported by a worker process into its own shard database.  The shards are
+   # merged in range order as they finish, so the records of a table keep their order.
+   Work_List = [(Table_name, Begin_Record_Number, End_Record_Number, SQLite_DB_Name + '.shard' + str(i)) \
+                for (i, (Table_name, Begin_Record_Number, End_Record_Number)) in enumerate(ESEDB_Process_Records)]
+   pool = multiprocessing.Pool(processes=min(Number_Of_Workers, len(Work_List)), initializer=Open_Worker_ESEDB_File, \
+                               initargs=(File_To_Parse,))
+   try:
+      for (Range_Info, Shard_DB_Name) in zip(Work_List, pool.imap(Export_Record_Range, Work_List, chunksize=1)):
+         print ("Merging records into table ==> " + Range_Info[0] + " " + str(Range_Info[1]) + " - " + str(Range_Info[2]))
+         if Shard_DB_Name == None:
+            continue
+         SQLitedb.AttachDatabase(Shard_DB_Name, 'shard')
+         SQLitedb.InsertSelect('insert into ' + Range_Info[0] + ' select * from shard.' + Range_Info[0] + ';')
+         SQLitedb.DetachDatabase('shard')
+         SQLitedb.RemoveDB_File(Shard_DB_Name)
+   finally:
+      pool.close()
+      pool.join()
+
+def Filetime_To_Unix_Time(Filetime):
+   # SQL function, converts a FILETIME to seconds since 1970, 0 means the time is not set and stays 0
+   if not isinstance(Filetime, int) or Filetime == 0:
+      return Filetime
+   return (Filetime // 10000000) - 11644473600
+
+def Get_Container_Name(Name):
+   # SQL function, the container names in the Containers table end in a null character
+   if Name == None:
+      return Name
+   return Name[:-1]
 
 def Consolidate_Data():
+   # Copies the entries of every container into All_Container_Data in one insert select, the container
+   # name comes from a join with the Containers table and the times are converted as they are copied
    Table_Names = SQLitedb.SelectAllRows("select 'container_'||containerid from containers where 'container_'||containerid in " + \
                                          " (select lower(name) from sqlite_master);")      
    SQLitedb.CreateTable(create_table_name, create_table_columns)
+   SQLitedb.CreateFunction('filetime_to_unix_time', 1, Filetime_To_Unix_Time)
+   SQLitedb.CreateFunction('container_name', 1, Get_Container_Name)
+   Select_Stmts = []
    for Table_Name in Table_Names:
         Table_name = str(Table_Name[0])
         print ("Inserting From " + str(Table_name))
-        ins_stmt = "insert into all_container_data (entryid, containerid, urlhash, accessCount, synctime, " + \
-                   " creationtime, expirytime, modifiedtime, accessedtime, url, filename, filesize) " + \
-                   " Select entryid, a.containerid, urlhash, accessCount, synctime, creationtime, expirytime, " + \
-                   " modifiedtime, accessedtime, url, filename, filesize " + \
-                   " from " + Table_name + " a, containers b where a.containerid = b.containerid;"
-        SQLitedb.InsertSelect(ins_stmt)
-   Container_Info = SQLitedb.SelectAllRows("select distinct name, containerid from containers")      
-   for Container_info in Container_Info:
-        container_name = str(Container_info[0])
-        container_name = container_name[:-1]
-        container_id = str(Container_info[1])
-        print ("Updating From " + str(container_name))
-        Upd_stmt = "Update All_Container_data set container_name = '" + container_name + "' where containerid = " + container_id + ";"
-        print (Upd_stmt)
-        SQLitedb.UpdateTable(Upd_stmt)
-   Upd_stmt = "Update all_container_data set synctime = (SUBSTR(synctime,1,11)-11644473600) where synctime <> 0;"
-   SQLitedb.UpdateTable(Upd_stmt)
-   Upd_stmt = "Update all_container_data set creationtime = (SUBSTR(creationtime,1,11)-11644473600) where creationtime <> 0;"
-   SQLitedb.UpdateTable(Upd_stmt)
-   Upd_stmt = "Update all_container_data set expirytime = (SUBSTR(expirytime,1,11)-11644473600) where expirytime <> 0;"
-   SQLitedb.UpdateTable(Upd_stmt)
-   Upd_stmt = "Update all_container_data set modifiedtime = (SUBSTR(modifiedtime,1,11)-11644473600) where modifiedtime <> 0;"
-   SQLitedb.UpdateTable(Upd_stmt)
-   Upd_stmt = "Update all_container_data set accessedtime = (SUBSTR(accessedtime,1,11)-11644473600) where accessedtime <> 0;"
-   SQLitedb.UpdateTable(Upd_stmt)
+        Select_Stmts.append("Select entryid, a.containerid, urlhash, accessCount, filetime_to_unix_time(synctime), " + \
+                            " filetime_to_unix_time(creationtime), filetime_to_unix_time(expirytime), " + \
+                            " filetime_to_unix_time(modifiedtime), filetime_to_unix_time(accessedtime), url, filename, " + \
+                            " filesize, container_name(b.name) from " + Table_name + " a, containers b where a.containerid = b.containerid")
+   if len(Select_Stmts) > 0:
+      ins_stmt = "insert into all_container_data (entryid, containerid, urlhash, accessCount, synctime, " + \
+                 " creationtime, expirytime, modifiedtime, accessedtime, url, filename, filesize, container_name) " + \
+                 " union all ".join(Select_Stmts) + ";"
+      SQLitedb.InsertSelect(ins_stmt)
    SQLitedb.CreateTable("All_Containers", create_tab_columns)
    Insert_stmt = "insert into All_Containers select EntryId, ContainerId, UrlHash, AccessCount, " + \
                  "datetime(SyncTime, 'unixepoch') SyncTime, datetime(CreationTime,'unixepoch') CreationTime, " + \
                  "datetime(ExpiryTime,'unixepoch') ExpiryTime, datetime(ModifiedTime,'unixepoch') ModifiedTime, " + \
                  "datetime(AccessedTime,'unixepoch') AccessTime, Url, Filename, FileSize, container_name from all_container_data;"
    SQLitedb.InsertSelect(Insert_stmt)
+   # The ingest modules read All_Containers one container at a time, the index is built after the load
+   SQLitedb.CreateIndex('All_Containers_Container_Name_Idx', 'All_Containers', 'container_name')
    
    
 
-args = sys.argv[1:]
-File_To_Parse = args[0]
-SQLite_DB_Name = args[1]
-print ('Webcache is ', str(File_To_Parse))
-print ('DB file is ', SQLite_DB_Name)
+if __name__ == '__main__':
+   multiprocessing.freeze_support()
+
+   parser = argparse.ArgumentParser(description='Export a WebcacheV01.dat database to a SQLite database')
+   parser.add_argument('File_To_Parse', help='WebcacheV01.dat file to export')
+   parser.add_argument('SQLite_DB_Name', help='SQLite database to write')
+   parser.add_argument('-w', '--workers', type=int, default=(os.cpu_count() or 1), \
+                       help='number of worker processes, 1 exports the records in this process')
+   parser.add_argument('--include-containers', type=Get_Container_Name_Set, default=None, \
+                       help='comma delimited container types (History, Content, ...) or tables (Container_1, ...), only these containers are exported')
+   parser.add_argument('--exclude-containers', type=Get_Container_Name_Set, default=None, \
+                       help='comma delimited container types or tables that are not exported')
+   args = parser.parse_args()
+   File_To_Parse = args.File_To_Parse
+   SQLite_DB_Name = args.SQLite_DB_Name
+   print ('Webcache is ', str(File_To_Parse))
+   print ('DB file is ', SQLite_DB_Name)
         
-SQLitedb = SQLiteDb()
-SQLitedb.RemoveDB_File(SQLite_DB_Name)
-SQLitedb.Open(SQLite_DB_Name)
-ESEDB_Process_Records = []
+   SQLitedb = SQLiteDb()
+   SQLitedb.RemoveDB_File(SQLite_DB_Name)
+   SQLitedb.Open(SQLite_DB_Name, bulk_load=True)
+   ESEDB_Process_Records = []
 
-Parse_ESEDB_File(File_To_Parse,SQLite_DB_Name)
+   Parse_ESEDB_File(File_To_Parse,SQLite_DB_Name, args.include_containers, args.exclude_containers)
 
-SQLitedb.Close()
+   if args.workers > 1 and len(ESEDB_Process_Records) > 1:
+      Populate_ESEDB_DB_Parallel(File_To_Parse, SQLite_DB_Name, args.workers)
+   else:
+      Populate_ESEDB_DB(File_To_Parse,SQLite_DB_Name)
 
-Populate_ESEDB_DB(File_To_Parse,SQLite_DB_Name)
+   SQLitedb.Close()
 
-SQLitedb.Open(SQLite_DB_Name)
-Consolidate_Data()
-SQLitedb.Close()
-	
\ No newline at end of file
+   SQLitedb.Open(SQLite_DB_Name)
+   Consolidate_Data()
+   SQLitedb.Close()
@@ -0,0 +1,336 @@
+#Functions and classes to load a registry hive once and share it between the registry exporters.
+#
+# Opening a hive with yarp replays its transaction logs and every exporter then walks the keys it
+# needs, so the same SAM or SYSTEM hive used to be recovered and parsed again by each exporter.
+# Open_Hive recovers the hive once, walks all of its keys and writes them to a SQLite cache file
+# with an index on the key path.  The cache file is named after the SHA-256 of the hive and its
+# transaction logs, so any exporter that gets a hive with the same content, even a copy in another
+# temp directory, opens the cache file instead of parsing the hive again.
+#
+# The key and value classes use the same method names as the yarp classes they replace.
+
+import datetime
+import hashlib
+import os
+import sqlite3
+import struct
+from yarp import RegistryHelpers, Registry
+
+hive_cache_version = 1
+hive_cache_batch_size = 10000
+
+hive_info_columns = 'Cache_Version number, Hive_Hash text, Primary_Path text, Recovered number, Last_Written text, ' + \
+                    'Last_Reorganized text'
+hive_keys_columns = 'Key_Id integer primary key, Parent_Id number, Key_Path text, Key_Path_Upper text, Key_Name text, ' + \
+                    'Last_Written number, Subkey_Count number, Value_Count number'
+hive_values_columns = 'Key_Id number, Value_Number number, Value_Name text, Value_Type number, Value_Data blob'
+
+filetime_epoch = datetime.datetime(1601, 1, 1)
+
+REG_NONE = 0
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_DWORD_BIG_ENDIAN = 5
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+dword_value = struct.Struct('<I')
+dword_big_endian_value = struct.Struct('>I')
+qword_value = struct.Struct('<Q')
+
+def Get_Transaction_Logs(primary_path):
+    # Returns the transaction log files (log, log1, log2) of a hive, None for the ones that do not exist
+    transaction_logs = RegistryHelpers.DiscoverLogFiles(primary_path)
+    return (transaction_logs.log_path, transaction_logs.log1_path, transaction_logs.log2_path)
+
+def Read_Hive_Manifest(manifest_file):
+    # Returns the entries of a manifest file, one hive per line, blank lines and lines starting with # are skipped
+    manifest_entries = []
+    with open(manifest_file, 'r', encoding='utf-8') as manifest:
+       for manifest_line in manifest:
+           manifest_line = manifest_line.strip()
+           if manifest_line != '' and not manifest_line.startswith('#'):
+              manifest_entries.append(manifest_line)
+    return manifest_entries
+
+def Hash_Hive_Files(file_names):
+    # Returns the SHA-256 of the cache version and the content of the files, a missing file is hashed as empty
+    hive_hash = hashlib.sha256(str(hive_cache_version).encode('ascii'))
+    for file_name in file_names:
+        hive_hash.update(b'\0')
+        if file_name is None:
+           continue
+        with open(file_name, 'rb') as hive_file:
+           for hive_block in iter(lambda: hive_file.read(1048576), b''):
+               hive_hash.update(hive_block)
+    return hive_hash.hexdigest()
+
+def Datetime_To_Microseconds(key_datetime):
+    if key_datetime is None:
+       return None
+    return (key_datetime - filetime_epoch) // datetime.timedelta(microseconds=1)
+
+def Microseconds_To_Datetime(microseconds):
+    if microseconds is None:
+       return None
+    return filetime_epoch + datetime.timedelta(microseconds=microseconds)
+
+def Decode_Value_Data(value_type, value_data):
+    # Returns the value data as a string, integer or list of strings for the common value types,
+    # other value types are returned as their raw data
+    if value_data is None:
+       return None
+    if value_type == REG_SZ or value_type == REG_EXPAND_SZ:
+       if (len(value_data) % 2) != 0:
+          value_data = value_data + b'\0'
+       return value_data.decode('utf-16-le', 'ignore').partition('\0')[0]
+    elif value_type == REG_MULTI_SZ:
+       return value_data.decode('utf-16-le', 'ignore').split('\0')
+    elif value_type == REG_DWORD and len(value_data) >= dword_value.size:
+       return dword_value.unpack_from(value_data)[0]
+    elif value_type == REG_DWORD_BIG_ENDIAN and len(value_data) >= dword_big_endian_value.size:
+       return dword_big_endian_value.unpack_from(value_data)[0]
+    elif value_type == REG_QWORD and len(value_data) >= qword_value.size:
+       return qword_value.unpack_from(value_data)[0]
+    return value_data
+
+def Build_Hive_Cache(primary_path, transaction_logs, hive_hash, cache_file):
+    # Recovers the hive with its transaction logs, walks all of its keys and writes them to the cache file.
+    # The cache is written to a temporary file first so an exporter never opens a half written cache.  A hive
+    # that cannot be recovered or walked leaves no file behind and no file open, the batch modes go on with
+    # the next hive.
+
+    build_file = cache_file + '.' + str(os.getpid())
+    build_complete = False
+    log_files = []
+    primary_file = None
+    connection = None
+    try:
+        for log_path in transaction_logs:
+            log_files.append(open(log_path, 'rb') if log_path is not None else None)
+        primary_file = open(primary_path, 'rb')
+        hive = Registry.RegistryHive(primary_file)
+        recovery_result = hive.recover_auto(log_files[0], log_files[1], log_files[2])
+        if recovery_result.recovered:
+            print('The hive has been recovered')
+
+        if os.path.isfile(build_file):
+           os.remove(build_file)
+        connection = sqlite3.connect(build_file)
+        cursor = connection.cursor()
+        cursor.execute('PRAGMA journal_mode = OFF')
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('create table Hive_Info (' + hive_info_columns + ')')
+        cursor.execute('create table Hive_Keys (' + hive_keys_columns + ')')
+        cursor.execute('create table Hive_Values (' + hive_values_columns + ')')
+        cursor.execute('insert into Hive_Info values (?, ?, ?, ?, ?, ?)', (hive_cache_version, hive_hash, primary_path, \
+                       int(recovery_result.recovered), str(hive.last_written_timestamp()), str(hive.last_reorganized_timestamp())))
+
+        # Keys are numbered in the order they are walked, so the subkeys of a key come back in hive order
+        key_rows = []
+        value_rows = []
+        key_id = 1
+        key_stack = [(hive.root_key(), None, '')]
+        while key_stack:
+            (hive_key, parent_id, key_path) = key_stack.pop()
+            subkey_count = 0
+            value_count = 0
+            for hive_value in hive_key.values():
+                try:
+                   value_data = hive_value.data_raw()
+                except Exception:
+                   value_data = None
+                value_rows.append((key_id, value_count, hive_value.name(), hive_value.type_raw(), value_data))
+                value_count = value_count + 1
+            subkeys = []
+            for hive_subkey in hive_key.subkeys():
+                if key_path == '':
+                   subkey_path = hive_subkey.name()
+                else:
+                   subkey_path = key_path + '\\' + hive_subkey.name()
+                subkeys.append((hive_subkey, key_id, subkey_path))
+                subkey_count = subkey_count + 1
+            key_stack.extend(reversed(subkeys))
+            key_rows.append((key_id, parent_id, key_path, key_path.upper(), hive_key.name(), \
+                             Datetime_To_Microseconds(hive_key.last_written_timestamp()), subkey_count, value_count))
+            key_id = key_id + 1
+            if len(key_rows) >= hive_cache_batch_size or len(value_rows) >= hive_cache_batch_size:
+               cursor.executemany('insert into Hive_Keys values (?, ?, ?, ?, ?, ?, ?, ?)', key_rows)
+               cursor.executemany('insert into Hive_Values values (?, ?, ?, ?, ?)', value_rows)
+               key_rows = []
+               value_rows = []
+        cursor.executemany('insert into Hive_Keys values (?, ?, ?, ?, ?, ?, ?, ?)', key_rows)
+        cursor.executemany('insert into Hive_Values values (?, ?, ?, ?, ?)', value_rows)
+        cursor.execute('create index Hive_Keys_Path_Idx on Hive_Keys (Key_Path_Upper)')
+        cursor.execute('create index Hive_Keys_Parent_Idx on Hive_Keys (Parent_Id)')
+        cursor.execute('create index Hive_Values_Key_Idx on Hive_Values (Key_Id)')
+        connection.commit()
+        connection.close()
+        connection = None
+        os.replace(build_file, cache_file)
+        build_complete = True
+    finally:
+        if connection is not None:
+           connection.close()
+        if primary_file is not None:
+           primary_file.close()
+        for log_file in log_files:
+            if log_file is not None:
+               log_file.close()
+        if not build_complete and os.path.isfile(build_file):
+           os.remove(build_file)
+
+def Get_Cache_Directory(cache_directory, output_file):
+    # The cache files are copies of the evidence so they are kept with the output of the exporter, the
+    # Hive_Cache directory next to the output file is used when no cache directory is given
+    if cache_directory is None:
+       cache_directory = os.path.join(os.path.dirname(os.path.abspath(output_file)), 'Hive_Cache')
+    return cache_directory
+
+def Open_Hive(primary_path, cache_directory):
+    # Returns a CachedHive for the hive, the cache file is built the first time a hive with this content is opened
+    #
+    #Args:
+    #  primary_path: the primary file of the hive, its transaction logs are found next to it.
+    #  cache_directory: the directory that holds the cache files, see Get_Cache_Directory.
+
+    os.makedirs(cache_directory, exist_ok=True)
+    transaction_logs = Get_Transaction_Logs(primary_path)
+    hive_hash = Hash_Hive_Files((primary_path,) + transaction_logs)
+    cache_file = os.path.join(cache_directory, hive_hash + '.db3')
+    if os.path.isfile(cache_file):
+       print ('Hive cache found ==> ' + cache_file)
+    else:
+       print ('Building hive cache ==> ' + cache_file)
+       Build_Hive_Cache(primary_path, transaction_logs, hive_hash, cache_file)
+    hive = CachedHive(cache_file)
+    print('Last written timestamp: {}'.format(hive.last_written_timestamp()))
+    print('Last reorganized timestamp: {}'.format(hive.last_reorganized_timestamp()))
+    return hive
+
+class CachedHive(object):
+  #Class that reads the keys of a hive from its cache file.
+
+  def __init__(self, cache_file):
+    """Initializes the cached hive object."""
+    super(CachedHive, self).__init__()
+    self.cache_file = cache_file
+    self._connection = sqlite3.connect(cache_file)
+    self._cursor = self._connection.cursor()
+    self._cursor.execute('select Hive_Hash, Recovered, Last_Written, Last_Reorganized from Hive_Info')
+    (self.hive_hash, recovered, self._last_written, self._last_reorganized) = self._cursor.fetchone()
+    self.recovered = bool(recovered)
+
+  def last_written_timestamp(self):
+    return self._last_written
+
+  def last_reorganized_timestamp(self):
+    return self._last_reorganized
+
+  def root_key(self):
+    return self._Select_Key('select * from Hive_Keys where Key_Id = 1', ())
+
+  def find_key(self, path):
+    #Returns the key for a path relative to the root key, the path is not case sensitive.
+    #
+    #Args:
+    #  path: the key path, subkeys are separated by a backslash.
+    #
+    #Returns:
+    #  A CachedKey or None if the key does not exist.
+
+    return self._Select_Key('select * from Hive_Keys where Key_Path_Upper = ?', (path.strip('\\').upper(),))
+
+  def _Select_Key(self, sql_query, sql_values):
+    self._cursor.execute(sql_query, sql_values)
+    key_row = self._cursor.fetchone()
+    if key_row is None:
+      return None
+    return CachedKey(self, key_row)
+
+  def _Select_Subkeys(self, key_id):
+    self._cursor.execute('select * from Hive_Keys where Parent_Id = ? order by Key_Id', (key_id,))
+    return [CachedKey(self, key_row) for key_row in self._cursor.fetchall()]
+
+  def _Select_Values(self, key_id):
+    self._cursor.execute('select Value_Name, Value_Type, Value_Data from Hive_Values where Key_Id = ? ' + \
+                         'order by Value_Number', (key_id,))
+    return [CachedValue(value_row) for value_row in self._cursor.fetchall()]
+
+  def close(self):
+    self._connection.close()
+
+class CachedKey(object):
+  #Class that defines a registry key read from a hive cache file.
+
+  def __init__(self, hive, key_row):
+    """Initializes the cached key object."""
+    super(CachedKey, self).__init__()
+    self._hive = hive
+    (self._key_id, self._parent_id, self._path, key_path_upper, self._name, self._last_written, \
+     self._subkey_count, self._value_count) = key_row
+    self._values = None
+
+  def name(self):
+    return self._name
+
+  def path(self):
+    return self._path
+
+  def last_written_timestamp(self):
+    return Microseconds_To_Datetime(self._last_written)
+
+  def subkeys_count(self):
+    return self._subkey_count
+
+  def values_count(self):
+    return self._value_count
+
+  def subkeys(self):
+    if self._subkey_count == 0:
+      return []
+    return self._hive._Select_Subkeys(self._key_id)
+
+  def find_subkey(self, name):
+    if self._path == '':
+      return self._hive.find_key(name)
+    return self._hive.find_key(self._path + '\\' + name)
+
+  def values(self):
+    if self._values is None:
+      if self._value_count == 0:
+        self._values = []
+      else:
+        self._values = self._hive._Select_Values(self._key_id)
+    return self._values
+
+  def find_value(self, name):
+    #Returns the value with the name, the name is not case sensitive, or None if the key does not have it.
+
+    name = name.upper()
+    for cached_value in self.values():
+      if cached_value.name().upper() == name:
+        return cached_value
+    return None
+
+class CachedValue(object):
+  #Class that defines a registry value read from a hive cache file.
+
+  def __init__(self, value_row):
+    """Initializes the cached value object."""
+    super(CachedValue, self).__init__()
+    (self._name, self._type, self._data) = value_row
+
+  def name(self):
+    return self._name
+
+  def type_raw(self):
+    return self._type
+
+  def data_raw(self):
+    return self._data
+
+  def data(self):
+    return Decode_Value_Data(self._type, self._data)
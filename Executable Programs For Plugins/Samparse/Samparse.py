@@ -1,9 +1,12 @@
 import os
 import sys
-import pyregf
+import argparse
 import codecs
 import struct
 from Database import SQLiteDb
+from Hive_Cache import Open_Hive, Read_Hive_Manifest, Get_Cache_Directory
+from Sam_Records import Decode_V_Record, Decode_F_Record
+import time
 import datetime
 
 
@@ -20,6 +23,11 @@ sql_ins_columns = 'User_Name, Full_Name, Comment, Name, Internet_UserName, Passw
                   'Pwd_Reset_Date, Acct_Exp_Date, Pwd_Fail_Date, User_rid, User_ACB_FLAGS, User_failed_COunt, User_login_count, user_acb_desc' 
 sql_bind = '?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?'
 
+# In batch mode the users of all the hives go to one Sam table keyed by the hive they came from
+batch_table_columns = 'Source_Hive text, ' + table_columns
+batch_sql_ins_columns = 'Source_Hive, ' + sql_ins_columns
+batch_sql_bind = '?, ' + sql_bind
+
 def uprint(*objects, sep=' ', end='\n', file=sys.stdout):
     enc = file.encoding
     if enc == 'UTF-8':
@@ -29,103 +37,83 @@ def uprint(*objects, sep=' ', end='\n', file=sys.stdout):
         print(*map(f, objects), sep=sep, end=end, file=file)
 
 		
-def parse_registry_file(file_to_parse):
+def parse_registry_file(file_to_parse, cache_directory, source_hive=None):
 
    
-   file_object = open(file_to_parse, "rb")
-   reg_file = pyregf.file()
-   reg_file.open_file_object(file_object)
+   # The hive is recovered and indexed once, a hive another exporter already opened comes from the hive cache
+   reg_file = Open_Hive(file_to_parse, cache_directory)
+   try:
+      user_rows = read_user_rows(reg_file, source_hive)
+   finally:
+      reg_file.close()
+
+   # The users are only written once the whole hive is parsed, so a hive that fails part way through
+   # does not leave some of its users in the Sam table
+   for sql_val_columns in user_rows:
+      if source_hive is None:
+         SQLitedb.InsertBindValues(table_name, sql_ins_columns, sql_bind, sql_val_columns)
+      else:
+         SQLitedb.InsertBindValues(table_name, batch_sql_ins_columns, batch_sql_bind, sql_val_columns)
+
+def read_user_rows(reg_file, source_hive):
+   # Returns the Sam table rows of the users in the hive
+
+   user_rows = []
    #SQLitedb.CreateTempTable(table_name + '_temp', table_columns)
 #   key_path = reg_file.get_key_by_path("SOFTWARE\Microsoft\Windows\CurrentVersion\Run")
 #   key_path = reg_file.get_key_by_path("SAM\\Domains\\Account\\Users\\Names")
-   key_path = reg_file.get_key_by_path("SAM\\Domains\\Account\\Users")
+   key_path = reg_file.find_key("SAM\\Domains\\Account\\Users")
    
-   print ("Number of Sub_Keys ==> ", key_path.get_number_of_sub_keys())
-   print ("Number of values ==> ", key_path.get_number_of_values())
+   print ("Number of Sub_Keys ==> ", key_path.subkeys_count())
+   print ("Number of values ==> ", key_path.values_count())
    
-   for i in range (0, key_path.get_number_of_sub_keys() - 1):
-      sub_key = key_path.get_sub_key(i)
-      user_key = sub_key.get_value_by_name("V")
-      if (user_key.get_type() == 3):
-          bin_data = user_key.get_data()
-          acct_type_number = int(str(struct.unpack_from('<l', bin_data[4:])[0]))
+   sub_keys = key_path.subkeys()
+   for i in range (0, key_path.subkeys_count() - 1):
+      sub_key = sub_keys[i]
+      user_key = sub_key.find_value("V")
+      if (user_key.type_raw() == 3):
+          (acct_type_number, user_name, full_name, comment) = Decode_V_Record(user_key.data_raw())
           #print (acct_type_number)
           if acct_type_number in acct_type_dict:
              account_type = acct_type_dict[acct_type_number]
           else:
              account_type = 'Unknown Acct Type'
-          pos_1 = int(str(struct.unpack_from('<l', bin_data[4:])[0]))
-          pos_3 = int(str(struct.unpack_from('<l', bin_data[12:])[0])) + 204 
-          pos_4 = int(str(struct.unpack_from('<l', bin_data[16:])[0]))
-          pos_6 = int(str(struct.unpack_from('<l', bin_data[24:])[0])) + 204
-          pos_7 = int(str(struct.unpack_from('<l', bin_data[28:])[0]))
-          pos_9 = int(str(struct.unpack_from('<l', bin_data[36:])[0])) + 204
-          pos_10 = int(str(struct.unpack_from('<l', bin_data[40:])[0]))
-          fmt_string_name = ">" + str(pos_4) + "s"		  
-          fmt_string_fullname = ">" + str(pos_7) + "s"
-          fmt_string_comment = ">" + str(pos_10) + "s"
-          user_name = struct.unpack_from(fmt_string_name, bin_data[pos_3:])[0]
-          full_name = struct.unpack_from(fmt_string_fullname, bin_data[pos_6:])[0]
-          comment = struct.unpack_from(fmt_string_comment, bin_data[pos_9:])[0]
-      elif (user_key.get_type() == 1):
-          print ("Data of Key ==> ", user_key.get_data_as_string())
-
-      key_path_name = reg_file.get_key_by_path("SAM\\Domains\\Account\\Users\\Names\\" + str(user_name.decode("utf-16")))
-      user_name_create_dttm = key_path_name.get_last_written_time()
+      elif (user_key.type_raw() == 1):
+          print ("Data of Key ==> ", user_key.data())
+
+      key_path_name = reg_file.find_key("SAM\\Domains\\Account\\Users\\Names\\" + str(user_name.decode("utf-16")))
+      user_name_create_dttm = key_path_name.last_written_timestamp()
 	  
-      user_key = sub_key.get_value_by_name("F")
-      if (user_key.get_type() == 3):
-          bin_data = user_key.get_data()
-          last_login_date = int(str(struct.unpack_from('<q', bin_data[8:])[0])[0:11]) - 11644473600
-          pwd_reset_date = int(str(struct.unpack_from('<q', bin_data[24:])[0])[0:11]) - 11644473600
-          acct_exp_date = int(str(struct.unpack_from('<q', bin_data[32:])[0])[0:11]) - 11644473600
-          pwd_fail_date = int(str(struct.unpack_from('<q', bin_data[40:])[0])[0:11]) - 11644473600
-          if last_login_date < 0:
-             last_login_date = 0
-          if pwd_reset_date < 0:
-             pwd_reset_date = 0
-          if acct_exp_date < 0:
-             acct_exp_date = 0
-          if pwd_fail_date < 0:
-             pwd_fail_date = 0
-          user_rid = struct.unpack_from('<l', bin_data[48:])[0]
-          user_acb_flags = int(str(struct.unpack_from('<l', bin_data[56:])[0]))
-          user_failed_count = int(str(struct.unpack_from('<h', bin_data[64:])[0]))
-          user_login_count = int(str(struct.unpack_from('<h', bin_data[66:])[0]))
-      elif (user_key.get_type() == 1):
-          print ("Data of Key ==> ", user_key.get_data_as_string())
-
-      user_key = sub_key.get_value_by_name("GivenName")
+      user_key = sub_key.find_value("F")
+      if (user_key.type_raw() == 3):
+          (last_login_date, pwd_reset_date, acct_exp_date, pwd_fail_date, user_rid, user_acb_flags, user_failed_count, \
+           user_login_count) = Decode_F_Record(user_key.data_raw())
+      elif (user_key.type_raw() == 1):
+          print ("Data of Key ==> ", user_key.data())
+
+      user_key = sub_key.find_value("GivenName")
       if user_key == None:
           given_name = "None"
       else:
-          bin_data = user_key.get_data()
-          fmt_given_name = ">" + str(len(bin_data)) + "s"		  
-          given_name = struct.unpack_from(fmt_given_name, bin_data[0:])[0]
+          given_name = user_key.data_raw()
 
-      user_key = sub_key.get_value_by_name("SurName")
+      user_key = sub_key.find_value("SurName")
       if user_key == None:
          sur_name = "None"
       else:
-         bin_data = user_key.get_data()
-         fmt_sur_name = ">" + str(len(bin_data)) + "s"		  
-         sur_name = struct.unpack_from(fmt_sur_name, bin_data[0:])[0]
+         sur_name = user_key.data_raw()
 
-      user_key = sub_key.get_value_by_name("InternetUserName")
+      user_key = sub_key.find_value("InternetUserName")
       if user_key == None:
          internet_name = "None"
       else:
-         bin_data = user_key.get_data()
-         fmt_internet_name = ">" + str(len(bin_data)) + "s"		  
-         internet_name = struct.unpack_from(fmt_internet_name, bin_data[0:])[0]
+         internet_name = user_key.data_raw()
 
-      user_key = sub_key.get_value_by_name("UserPasswordHint")
+      user_key = sub_key.find_value("UserPasswordHint")
       if user_key == None:
          pw_hint = "None"
       else:
-         bin_data = user_key.get_data()
-         fmt_pw_hint = ">" + str(len(bin_data)) + "s"		  
-         pw_hint = struct.unpack_from(fmt_pw_hint, bin_data[0:])[0]
+         pw_hint = user_key.data_raw()
 
       try:
          # print ("==============================================================")
@@ -165,6 +153,8 @@ def parse_registry_file(file_to_parse):
                 # print ("  ----> ", acb_flags_dict[x])
          # print ("==============================================================")
          sql_val_columns = []
+         if source_hive is not None:
+            sql_val_columns.append(source_hive)
          sql_val_columns.append(str(user_name.decode("utf-16")))
          sql_val_columns.append(str(full_name.decode("utf-16")))
          sql_val_columns.append(str(comment.decode("utf-16")))
@@ -201,14 +191,42 @@ def parse_registry_file(file_to_parse):
             if ( x & user_acb_flags):
                 acb_desc = acb_desc + acb_flags_dict[x] + "\n"
          sql_val_columns.append(acb_desc)
-         SQLitedb.InsertBindValues(table_name, sql_ins_columns, sql_bind, sql_val_columns)
+         user_rows.append(sql_val_columns)
       except:
          print ("Bad Character")		  
+
+   return user_rows
 	  
 
-args = sys.argv[1:]
-Registry_To_Parse = args[0]
-SQLite_DB_Name = args[1]
+def parse_registry_files(manifest_file, cache_directory):
+   # Parses every SAM hive listed in the manifest in this process, a hive that cannot be parsed is reported
+   # and the batch goes on with the next one
+
+   source_hives = Read_Hive_Manifest(manifest_file)
+   number_of_errors = 0
+   start_time = time.time()
+   for source_hive in source_hives:
+      print ("Parsing hive ==> " + source_hive)
+      try:
+         parse_registry_file(source_hive, cache_directory, source_hive)
+      except Exception as err:
+         number_of_errors = number_of_errors + 1
+         print ("Error parsing hive ==> " + source_hive + " <==> " + str(err))
+   seconds = time.time() - start_time
+   print ("Parsed ==> %d hives  Errors ==> %d  Seconds ==> %9.2f  Hives per second ==> %9.1f" % \
+          (len(source_hives), number_of_errors, seconds, len(source_hives) / max(seconds, 0.000001)))
+
+parser = argparse.ArgumentParser(description='Parse the user accounts of a SAM hive to a SQLite database.')
+parser.add_argument('Registry', help='SAM hive to parse, or with --manifest a file that lists one SAM hive per line')
+parser.add_argument('DB', help='SQLite database to create')
+parser.add_argument('--manifest', dest='Manifest', action='store_true', \
+                    help='parse all the hives of the manifest into one Sam table keyed by Source_Hive')
+parser.add_argument('--cache-dir', dest='Cache_Directory', default=None, \
+                    help='directory of the hive cache shared by the registry exporters, Hive_Cache next to the output file when not given')
+args = parser.parse_args()
+Registry_To_Parse = args.Registry
+SQLite_DB_Name = args.DB
+Cache_Directory = Get_Cache_Directory(args.Cache_Directory, SQLite_DB_Name)
 print ('Registry is ', str(Registry_To_Parse))
 print ('DB file is ', SQLite_DB_Name)
 #Directory_To_Parse = input('List the directory you want to parse:')   
@@ -219,10 +237,14 @@ print ('DB file is ', SQLite_DB_Name)
 #registry_file = "sam"
 SQLitedb = SQLiteDb()
 SQLitedb.RemoveDB_File(SQLite_DB_Name)
-SQLitedb.Open(SQLite_DB_Name)
-SQLitedb.CreateTable(table_name, table_columns)
-
-parse_registry_file(Registry_To_Parse)
+if args.Manifest:
+   SQLitedb.Open(SQLite_DB_Name, bulk_load=True)
+   SQLitedb.CreateTable(table_name, batch_table_columns)
+   parse_registry_files(Registry_To_Parse, Cache_Directory)
+else:
+   SQLitedb.Open(SQLite_DB_Name)
+   SQLitedb.CreateTable(table_name, table_columns)
+   parse_registry_file(Registry_To_Parse, Cache_Directory)
 
 SQLitedb.Close()  
 
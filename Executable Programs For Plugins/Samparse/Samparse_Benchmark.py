@@ -0,0 +1,244 @@
+# Samparse_Benchmark.py = Python script to time Samparse on a synthetic corpus of SAM hives
+#
+# Copyright (C) 2016 Mark McKinnon (Mark.McKinnon@Davenport.edu)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You can view the GNU General Public License at <http://www.gnu.org/licenses/>
+#
+# Version History:
+#  Initial Version
+#
+# Writes a corpus of synthetic SAM hives and a manifest that lists them, then parses the corpus two ways,
+# starting Samparse once for every hive (how the ingest module ran it before the batch mode) and starting it
+# once with --manifest.  Each way starts with an empty hive cache.  The users of the two databases are compared
+# so the hives per second are for the same rows.  The Samparse executable can be given in place of the script
+# to include the PyInstaller start up in the timings.
+#
+# Usage Examples:
+# python3 Samparse_Benchmark.py
+# python3 Samparse_Benchmark.py 500 20 benchmark_dir
+# python3 Samparse_Benchmark.py 500 20 benchmark_dir samparse.exe
+
+import os
+import sys
+import time
+import shutil
+import random
+import struct
+import sqlite3
+import subprocess
+
+filetime_base = 131000000000000000
+reg_binary = 3
+
+cell_size = struct.Struct('<i')
+offset_value = struct.Struct('<I')
+key_node = struct.Struct('<2sHQIIIIIIIIIIIIIIIHH')
+key_value = struct.Struct('<2sHIIIHH')
+security_key = struct.Struct('<2sHIIII')
+bin_header = struct.Struct('<4sIIQ')
+base_block = struct.Struct('<4sIIQIIIIIII')
+v_record_entry = struct.Struct('<III')
+f_record_times = struct.Struct('<QQQQQ')
+f_record_rid = struct.Struct('<QI')
+f_record_flags = struct.Struct('<H')
+f_record_counts = struct.Struct('<hh')
+
+class RegfWriter(object):
+  #Class that writes a registry hive of one hive bin from a tree of (name, last written, values, subkeys).
+
+  def __init__(self):
+    """Initializes the regf writer object."""
+    super(RegfWriter, self).__init__()
+    self._cells = bytearray(32)
+
+  def _Add_Cell(self, cell_data):
+    # Cells are 8 byte aligned and a negative size marks them as allocated
+    cell_offset = len(self._cells)
+    size = (len(cell_data) + 4 + 7) & ~7
+    self._cells += cell_size.pack(-size) + cell_data + b'\0' * (size - 4 - len(cell_data))
+    return cell_offset
+
+  def _Add_Key(self, key, parent_offset, security_offset, is_root):
+    (key_name, last_written, values, subkeys) = key
+    name = key_name.encode('latin-1')
+    flags = 0x20 | (0x0c if is_root else 0)
+    key_offset = self._Add_Cell(key_node.pack(b'nk', flags, last_written, 0, parent_offset, len(subkeys), 0, 0xffffffff, \
+                                              0xffffffff, len(values), 0xffffffff, security_offset, 0xffffffff, 0, 0, 0, 0, 0, \
+                                              len(name), 0) + name)
+    if len(values) > 0:
+      value_offsets = []
+      for (value_name, value_type, value_data) in values:
+        name = value_name.encode('latin-1')
+        if len(value_data) <= 4:
+          data_offset = offset_value.unpack(value_data + b'\0' * (4 - len(value_data)))[0]
+          data_size = len(value_data) | 0x80000000
+        else:
+          data_offset = self._Add_Cell(value_data)
+          data_size = len(value_data)
+        value_offsets.append(self._Add_Cell(key_value.pack(b'vk', len(name), data_size, data_offset, value_type, \
+                                                           1 if len(name) > 0 else 0, 0) + name))
+      value_list = self._Add_Cell(b''.join([offset_value.pack(value_offset) for value_offset in value_offsets]))
+      offset_value.pack_into(self._cells, key_offset + 44, value_list)
+    if len(subkeys) > 0:
+      subkey_entries = []
+      for subkey in sorted(subkeys, key=lambda subkey: subkey[0].upper()):
+        subkey_offset = self._Add_Key(subkey, key_offset, security_offset, False)
+        subkey_entries.append(offset_value.pack(subkey_offset) + (subkey[0].encode('latin-1') + b'\0\0\0\0')[:4])
+      subkey_list = self._Add_Cell(b'lf' + struct.pack('<H', len(subkey_entries)) + b''.join(subkey_entries))
+      offset_value.pack_into(self._cells, key_offset + 32, subkey_list)
+    return key_offset
+
+  def Write(self, hive_file, root_key):
+    last_written = root_key[1]
+    security_descriptor = struct.pack('<BBHIIII', 1, 0, 0x8004, 0, 0, 0, 0)
+    security_offset = self._Add_Cell(security_key.pack(b'sk', 0, 0, 0, 1, len(security_descriptor)) + security_descriptor)
+    struct.pack_into('<II', self._cells, security_offset + 8, security_offset, security_offset)
+    root_offset = self._Add_Key(root_key, 0xffffffff, security_offset, True)
+    bin_size = (len(self._cells) + 4 + 4095) // 4096 * 4096
+    free_size = bin_size - len(self._cells)
+    self._cells += cell_size.pack(free_size) + b'\0' * (free_size - 4)
+    bin_header.pack_into(self._cells, 0, b'hbin', 0, bin_size, 0)
+    struct.pack_into('<Q', self._cells, 20, last_written)
+    base = bytearray(4096)
+    base_block.pack_into(base, 0, b'regf', 1, 1, last_written, 1, 5, 0, 1, root_offset, bin_size, 1)
+    checksum = 0
+    for dword_number in range(0, 127):
+      checksum ^= offset_value.unpack_from(base, dword_number * 4)[0]
+    offset_value.pack_into(base, 508, checksum)
+    with open(hive_file, 'wb') as hive:
+      hive.write(bytes(base) + bytes(self._cells))
+
+def Build_V_Record(user_name, full_name, comment, account_type):
+  # The V record is a table of (offset, length, unknown) entries followed by the data they point to
+  fields = [b'', user_name.encode('utf-16-le'), full_name.encode('utf-16-le'), comment.encode('utf-16-le')] + [b''] * 13
+  entry_table = bytearray(0xcc)
+  field_data = bytearray()
+  for (field_number, field) in enumerate(fields):
+    v_record_entry.pack_into(entry_table, field_number * 12, len(field_data), len(field) if field_number > 0 else account_type, 0)
+    field_data += field + b'\0' * ((-len(field)) % 4)
+  return bytes(entry_table + field_data)
+
+def Build_F_Record(generator, rid):
+  filetimes = [generator.choice([0, 0x7fffffffffffffff, filetime_base + generator.randint(0, 10 ** 16)]) for filetime in range(0, 4)]
+  f_record = bytearray(0x50)
+  f_record_times.pack_into(f_record, 0, 0, filetimes[0], 0, filetimes[1], filetimes[2])
+  f_record_rid.pack_into(f_record, 40, filetimes[3], rid)
+  f_record_flags.pack_into(f_record, 56, generator.choice([0x10, 0x11, 0x210, 0x214]))
+  f_record_counts.pack_into(f_record, 64, generator.randint(0, 9), generator.randint(0, 500))
+  return bytes(f_record)
+
+def Build_Sam_Hive(hive_file, Number_Of_Users, seed):
+  # The same seed always gives the same hive
+  generator = random.Random(seed)
+  last_written = lambda: filetime_base + generator.randint(0, 10 ** 15) * 10
+  user_keys = []
+  name_keys = []
+  for user_number in range(0, Number_Of_Users):
+    rid = 500 + user_number if user_number < 4 else 1000 + user_number
+    user_name = 'user%d' % user_number
+    user_values = [('F', reg_binary, Build_F_Record(generator, rid)), \
+                   ('V', reg_binary, Build_V_Record(user_name, 'Full Name %d' % user_number, 'Comment %d' % user_number, \
+                                                    generator.choice([188, 212, 176, 268, 5])))]
+    if user_number % 2 == 1:
+      user_values.append(('GivenName', reg_binary, ('Given %d' % user_number).encode('utf-16-le')))
+      user_values.append(('SurName', reg_binary, ('Surname %d' % user_number).encode('utf-16-le')))
+    if user_number % 3 == 0:
+      user_values.append(('InternetUserName', reg_binary, ('user%d@example.com' % user_number).encode('utf-16-le')))
+    if user_number % 4 == 0:
+      user_values.append(('UserPasswordHint', reg_binary, ('hint %d' % user_number).encode('utf-16-le')))
+    user_keys.append(('%08X' % rid, last_written(), user_values, []))
+    name_keys.append((user_name, last_written(), [('', rid, b'')], []))
+  user_keys.append(('Names', last_written(), [], name_keys))
+  account_key = ('Account', last_written(), [('F', reg_binary, b'\0' * 0x50)], [('Users', last_written(), [], user_keys)])
+  domains_key = ('Domains', last_written(), [], [account_key, ('Builtin', last_written(), [], [])])
+  root_key = ('ROOT', last_written(), [], [('SAM', last_written(), [('C', reg_binary, b'\0' * 16)], [domains_key])])
+  RegfWriter().Write(hive_file, root_key)
+
+def Build_Synthetic_Corpus(Corpus_Dir, Number_Of_Hives, Number_Of_Users):
+  # Returns the manifest file, every hive is in its own directory like the copies the ingest module makes
+  manifest_file = os.path.join(Corpus_Dir, 'SAM_Manifest.txt')
+  os.makedirs(Corpus_Dir)
+  with open(manifest_file, 'w', encoding='utf-8') as manifest:
+    for hive_number in range(0, Number_Of_Hives):
+      hive_dir = os.path.join(Corpus_Dir, str(hive_number))
+      os.makedirs(hive_dir)
+      hive_file = os.path.join(hive_dir, 'SAM')
+      # Hives do not all have the same number of users
+      Build_Sam_Hive(hive_file, 1 + (Number_Of_Users + hive_number) % (2 * Number_Of_Users), hive_number)
+      manifest.write(hive_file + '\n')
+  return manifest_file
+
+def Samparse_Command(Samparse_Program):
+  if Samparse_Program.lower().endswith('.py'):
+    return [sys.executable, Samparse_Program]
+  return [Samparse_Program]
+
+def Read_Users(database_name, source_hive=None):
+  # Returns the sorted users of the Sam table as (source hive, user columns)
+  connection = sqlite3.connect(database_name)
+  cursor = connection.execute('select * from Sam')
+  column_names = [column[0] for column in cursor.description]
+  users = []
+  for user_row in cursor:
+    if source_hive is None:
+      users.append((user_row[column_names.index('Source_Hive')], \
+                    repr([user_row[column_number] for column_number in range(0, len(column_names)) \
+                          if column_names[column_number] != 'Source_Hive'])))
+    else:
+      users.append((source_hive, repr(list(user_row))))
+  connection.close()
+  return sorted(users)
+
+def Benchmark_Samparse(manifest_file, Benchmark_Dir, Samparse_Program):
+  # Returns the seconds of a Samparse run per hive, the seconds of one --manifest run and if the users are the same
+  samparse_command = Samparse_Command(Samparse_Program)
+  with open(manifest_file, 'r', encoding='utf-8') as manifest:
+    source_hives = [manifest_line.strip() for manifest_line in manifest if manifest_line.strip() != '']
+
+  run_dir = os.path.join(Benchmark_Dir, 'Per_Hive')
+  os.makedirs(run_dir)
+  per_hive_users = []
+  start_time = time.time()
+  for hive_number in range(0, len(source_hives)):
+    database_name = os.path.join(run_dir, 'SAM_' + str(hive_number) + '.db3')
+    subprocess.run(samparse_command + [source_hives[hive_number], database_name, '--cache-dir', os.path.join(run_dir, 'Hive_Cache')], \
+                   stdout=subprocess.DEVNULL, check=True)
+  per_hive_seconds = time.time() - start_time
+  for hive_number in range(0, len(source_hives)):
+    per_hive_users.extend(Read_Users(os.path.join(run_dir, 'SAM_' + str(hive_number) + '.db3'), source_hives[hive_number]))
+
+  run_dir = os.path.join(Benchmark_Dir, 'Manifest')
+  os.makedirs(run_dir)
+  database_name = os.path.join(run_dir, 'SAM.db3')
+  start_time = time.time()
+  subprocess.run(samparse_command + [manifest_file, database_name, '--manifest', '--cache-dir', os.path.join(run_dir, 'Hive_Cache')], \
+                 stdout=subprocess.DEVNULL, check=True)
+  manifest_seconds = time.time() - start_time
+  manifest_users = Read_Users(database_name)
+  return (per_hive_seconds, manifest_seconds, len(manifest_users), sorted(per_hive_users) == manifest_users)
+
+if __name__ == '__main__':
+  # python3 Samparse_Benchmark.py 500 20 benchmark_dir samparse.exe
+  args = sys.argv[1:]
+  Number_Of_Hives = int(args[0]) if len(args) > 0 else 200
+  Number_Of_Users = int(args[1]) if len(args) > 1 else 20
+  Benchmark_Dir = os.path.join(args[2] if len(args) > 2 else '.', 'Samparse_Benchmark')
+  Samparse_Program = args[3] if len(args) > 3 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Samparse.py')
+  shutil.rmtree(Benchmark_Dir, ignore_errors=True)
+  Manifest_File = Build_Synthetic_Corpus(os.path.join(Benchmark_Dir, 'Corpus'), Number_Of_Hives, Number_Of_Users)
+  (Per_Hive_Seconds, Manifest_Seconds, Number_Of_Rows, Same_Users) = Benchmark_Samparse(Manifest_File, Benchmark_Dir, Samparse_Program)
+  print ("Hives ==> %d  Users ==> %d" % (Number_Of_Hives, Number_Of_Rows))
+  print ("%-18s ==> %9.2fs  Hives per second ==> %9.1f" % ('Run per hive', Per_Hive_Seconds, Number_Of_Hives / max(Per_Hive_Seconds, 0.000001)))
+  print ("%-18s ==> %9.2fs  Hives per second ==> %9.1f" % ('One manifest run', Manifest_Seconds, Number_Of_Hives / max(Manifest_Seconds, 0.000001)))
+  print ("Users are the same ==> " + str(Same_Users))
+  shutil.rmtree(Benchmark_Dir, ignore_errors=True)
@@ -4,10 +4,10 @@ block_cipher = None
 
 
 a = Analysis(['samparse.py'],
-             pathex=['C:\\Users\\Forensic_User\\OneDrive\\Code\\Python_Scripts\\Registry'],
+             pathex=None,
              binaries=None,
              datas=None,
-             hiddenimports=[],
+             hiddenimports=['Database', 'Hive_Cache', 'Sam_Records', 'yarp', 'yarp.Registry', 'yarp.RegistryHelpers'],
              hookspath=[],
              runtime_hooks=[],
              excludes=[],
@@ -18,7 +18,7 @@ pyz = PYZ(a.pure, a.zipped_data,
              cipher=block_cipher)
 exe = EXE(pyz,
           a.scripts,
-          a.binaries + [('libregf.dll','libregf.dll', 'BINARY'), ('msvcr120.dll','c:\\windows\\system32\\msvcr120.dll','BINARY')],
+          a.binaries + [('msvcr120.dll','c:\\windows\\system32\\msvcr120.dll','BINARY')],
           a.zipfiles,
           a.datas,
           name='samparse',
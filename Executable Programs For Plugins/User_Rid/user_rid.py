@@ -1,102 +1,107 @@
-from yarp import RegistryHelpers, Registry
+from Hive_Cache import Open_Hive, Read_Hive_Manifest, Get_Cache_Directory
+from Sam_Records import Decode_V_Record
+from Database import SQLiteDb
+import argparse
 import os
 from datetime import datetime
 import struct 
 import sys
+import time
 
 # Create a Dict for the uid and name
 userId = {}
 
-def openRegistryFile(primaryPath):
+# In batch mode the users of all the hives go to one table keyed by the registry directory they came from
+tableName = 'User_Rid'
+tableColumns = 'Source_Hive text, RID text, User_Name text'
+sqlInsColumns = 'Source_Hive, RID, User_Name'
+sqlBind = '?, ?, ?'
 
-   # A primary file is specified here.
-   primary_path = primaryPath
-   # Discover transaction log files to be used to recover the primary file, if required.
-   transaction_logs = RegistryHelpers.DiscoverLogFiles(primary_path)
-   # Open the primary file and each transaction log file discovered.
-   primary_file = open(primary_path, 'rb')
-   if transaction_logs.log_path is not None:
-       log_file = open(transaction_logs.log_path, 'rb')
-   else:
-       log_file = None
-   if transaction_logs.log1_path is not None:
-       log1_file = open(transaction_logs.log1_path, 'rb')
-   else:
-       log1_file = None
-   if transaction_logs.log2_path is not None:
-       log2_file = open(transaction_logs.log2_path, 'rb')
-   else:
-       log2_file = None
-
-   # Open the hive and recover it, if required.
-   hive = Registry.RegistryHive(primary_file)
-   recovery_result = hive.recover_auto(log_file, log1_file, log2_file)
-   if recovery_result.recovered:
-       print('The hive has been recovered')
-   # Print basic information about the hive.
-   print('Last written timestamp: {}'.format(hive.last_written_timestamp()))
-   print('Last reorganized timestamp: {}'.format(hive.last_reorganized_timestamp()))
-   
-   return hive
-   
-
-
-def parseSam(pathToRegistry):
+def parseSam(pathToRegistry, cacheDirectory):
 
    # A primary file is specified here.
    primary_path = os.path.join(pathToRegistry,'SAM')
 
-   # Open the registry file and recover using the transaction logs
-   hive = openRegistryFile(primary_path)
+   # Open the registry file, it is recovered using the transaction logs the first time the hive cache sees it
+   hive = Open_Hive(primary_path, cacheDirectory)
+   try:
 
-   # Find an existing key.
-   key = hive.find_key("SAM\\Domains\\Account\\Users")
+      # Find an existing key.
+      key = hive.find_key("SAM\\Domains\\Account\\Users")
     
-   # Print information about its subkeys.
-   for sk in key.subkeys():
-       if sk.values_count() > 0:
-            registryKey = sk.name()
-            skValues = sk.values()
-            for skValue in skValues:
-               if skValue.name() == 'V':
-                   bin_data = skValue.data_raw()
-                   pos_1 = int(str(struct.unpack_from('<l', bin_data[4:])[0]))
-                   pos_3 = int(str(struct.unpack_from('<l', bin_data[12:])[0])) + 204 
-                   pos_4 = int(str(struct.unpack_from('<l', bin_data[16:])[0]))
-                   pos_6 = int(str(struct.unpack_from('<l', bin_data[24:])[0])) + 204
-                   pos_7 = int(str(struct.unpack_from('<l', bin_data[28:])[0]))
-                   pos_9 = int(str(struct.unpack_from('<l', bin_data[36:])[0])) + 204
-                   pos_10 = int(str(struct.unpack_from('<l', bin_data[40:])[0]))
-                   fmt_string_name = ">" + str(pos_4) + "s"		  
-                   fmt_string_fullname = ">" + str(pos_7) + "s"
-                   fmt_string_comment = ">" + str(pos_10) + "s"
-                   user_name = struct.unpack_from(fmt_string_name, bin_data[pos_3:])[0]
-                   full_name = struct.unpack_from(fmt_string_fullname, bin_data[pos_6:])[0]
-                   comment = struct.unpack_from(fmt_string_comment, bin_data[pos_9:])[0]
-                   userId[str(int(registryKey, 16))] = user_name.decode("utf-16")
-
-args = sys.argv[1:]
-pathToRegistry = args[0]
-csvOutputFile = args[1]
+      # Print information about its subkeys.
+      for sk in key.subkeys():
+          if sk.values_count() > 0:
+               registryKey = sk.name()
+               skValues = sk.values()
+               for skValue in skValues:
+                  if skValue.name() == 'V':
+                      (acct_type_number, user_name, full_name, comment) = Decode_V_Record(skValue.data_raw())
+                      userId[str(int(registryKey, 16))] = user_name.decode("utf-16")
+   finally:
+      hive.close()
+
+def parseRegistryDirectories(manifestFile, cacheDirectory, SQLitedb):
+
+   # Parse the SAM hive of every registry directory in the manifest in this process, a directory
+   # that cannot be parsed is reported and the batch goes on with the next one
+   registryDirectories = Read_Hive_Manifest(manifestFile)
+   numberOfErrors = 0
+   startTime = time.time()
+   for registryDirectory in registryDirectories:
+       print ("Parsing registry directory ==> " + registryDirectory)
+       userId.clear()
+       try:
+           parseSam(registryDirectory, cacheDirectory)
+       except Exception as err:
+           numberOfErrors = numberOfErrors + 1
+           print ("Error parsing registry directory ==> " + registryDirectory + " <==> " + str(err))
+           continue
+       for rid in userId.keys():
+           SQLitedb.InsertBindValues(tableName, sqlInsColumns, sqlBind, [registryDirectory, rid, userId[rid]])
+   seconds = time.time() - startTime
+   print ("Parsed ==> %d hives  Errors ==> %d  Seconds ==> %9.2f  Hives per second ==> %9.1f" % \
+          (len(registryDirectories), numberOfErrors, seconds, len(registryDirectories) / max(seconds, 0.000001)))
+
+parser = argparse.ArgumentParser(description='Write the user RIDs of a SAM hive to a csv file.')
+parser.add_argument('Registry_Directory', help='directory that holds the hives, or with --manifest a file that ' + \
+                    'lists one registry directory per line')
+parser.add_argument('Csv_File', help='csv file to create, or with --manifest the SQLite database to create')
+parser.add_argument('--manifest', dest='Manifest', action='store_true', \
+                    help='parse the SAM hive of every directory in the manifest into one User_Rid table keyed by Source_Hive')
+parser.add_argument('--cache-dir', dest='Cache_Directory', default=None, \
+                    help='directory of the hive cache shared by the registry exporters, Hive_Cache next to the output file when not given')
+args = parser.parse_args()
+pathToRegistry = args.Registry_Directory
+csvOutputFile = args.Csv_File
+cacheDirectory = Get_Cache_Directory(args.Cache_Directory, csvOutputFile)
     
 now = datetime.now()
 
 print ("Start Script Current date and time : " + str(now.strftime("%Y-%m-%d %H:%M:%S")))
 
-parseSam(pathToRegistry)
-
-with open(csvOutputFile, "w") as file: 
-    file.write("RID, USERNAME \n")
-    userRecord = []
-    userRid = userId.keys()
-    for rid in userRid:
-        userRec = []
-        userRec.append(rid)
-        userRec.append(userId[rid])
-        userRecord.append(userRec)
-    for userRec in userRecord:
-        csvOut = ",".join(userRec)
-        file.write(csvOut + "\n")
+if args.Manifest:
+    SQLitedb = SQLiteDb()
+    SQLitedb.RemoveDB_File(csvOutputFile)
+    SQLitedb.Open(csvOutputFile, bulk_load=True)
+    SQLitedb.CreateTable(tableName, tableColumns)
+    parseRegistryDirectories(pathToRegistry, cacheDirectory, SQLitedb)
+    SQLitedb.Close()
+else:
+    parseSam(pathToRegistry, cacheDirectory)
+
+    with open(csvOutputFile, "w") as file: 
+        file.write("RID, USERNAME \n")
+        userRecord = []
+        userRid = userId.keys()
+        for rid in userRid:
+            userRec = []
+            userRec.append(rid)
+            userRec.append(userId[rid])
+            userRecord.append(userRec)
+        for userRec in userRecord:
+            csvOut = ",".join(userRec)
+            file.write(csvOut + "\n")
         
 #print (userId)
 #print (bamRecord)
@@ -33,6 +33,13 @@ class SQLiteDb(object):
     self._cursor = None
     self.filename = None
     self.read_only = None
+    self.bulk_load = False
+    self.batch_size = 10000
+    self.reject_rows = False
+    self.rejected_rows = []
+    self._bulk_sql = None
+    self._bulk_rows = []
+    self._insert_sql_cache = {}
     self.reserved_word_list_dict = {'ABORT':0, 'ACTION':0, 'ADD':0, 'AFTER':0, 'ALL':0, 'ALTER':0, 'ANALYZE':0, 'AND':0, 'AS':0, 'ASC':0, \
                                     'ATTACH':0, 'AUTOINCREMENT':0, 'BEFORE':0, 'BEGIN':0, 'BETWEEN':0, 'BY':0, 'CASCADE':0, 'CASE':0, \
                                     'CAST':0, 'CHECK':0, 'COLLATE':0, 'COLUMN':0, 'COMMIT':0, 'CONFLICT':0, 'CONSTRAINT':0, 'CREATE':0, \
@@ -94,6 +101,7 @@ class SQLiteDb(object):
       raise RuntimeError(u'Cannot close database not opened.')
 
     # We need to run commit or not all data is stored in the database.
+    self.FlushBindValues()
     self._connection.commit()
     self._connection.close()
 
@@ -101,6 +109,10 @@ class SQLiteDb(object):
     self._cursor = None
     self.filename = None
     self.read_only = None
+    self.bulk_load = False
+    self.reject_rows = False
+    self._bulk_sql = None
+    self._insert_sql_cache = {}
 
   def CreateTable(self, table_name, column_definitions):
     #Creates a table.
@@ -124,6 +136,31 @@ class SQLiteDb(object):
  
     #print (sql_query)
  
+    self.FlushBindValues()
+    self._cursor.execute(sql_query)
+
+  def CreateIndex(self, index_name, table_name, column_definitions):
+    #Creates an index on a table.
+    #
+    #Args:
+    #  index_name: the index name.
+    #  table_name: the table name.
+    #  column_definitions: string containing the indexed columns or expressions.
+
+    #Raises:
+    #  RuntimeError: if the database is not opened or
+    #                if the database is in read-only mode.
+    
+    if not self._connection:
+      raise RuntimeError(u'Cannot create index database not opened.')
+
+    if self.read_only:
+      raise RuntimeError(u'Cannot create index database in read-only mode.')
+
+    sql_query = u'CREATE INDEX {0:s} ON {1:s} ( {2:s} )'.format(
+        index_name, table_name, column_definitions)
+
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
 
   def CreatePermanentTable(self, table_name):
@@ -146,6 +183,7 @@ class SQLiteDb(object):
 
     #print (sql_query)
 	
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
 
   def CreateTempTable(self, table_name, column_definitions):
@@ -168,6 +206,7 @@ class SQLiteDb(object):
     sql_query = u'CREATE Temp TABLE {0:s} ( {1:s} )'.format(
         table_name, column_definitions)
 
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
 
   def AppendTempToPermanentTable(self, table_name):
@@ -190,6 +229,7 @@ class SQLiteDb(object):
 
     #print (sql_query)
 	
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
 
   def AddColumn(self, table_name, column_definitions):
@@ -212,6 +252,7 @@ class SQLiteDb(object):
     sql_query = u'Alter TABLE {0:s} Add {1:s} '.format(
         table_name, column_definitions)
 
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
 
   def DropTable(self, table_name):
@@ -233,6 +274,7 @@ class SQLiteDb(object):
     sql_query = u'Drop TABLE {0:s} '.format(
         table_name)
 
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
 
   def InsertValues(self, table_name, column_definitions, column_bind_values):
@@ -256,6 +298,7 @@ class SQLiteDb(object):
     sql_query = u'insert into {0:s} ( {1:s} ) values ( {2:s} )'.format(
         table_name, column_definitions, column_bind_values)
 
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
 
   def InsertBindValues(self, table_name, column_definitions, column_bind_values, column_values):
@@ -276,12 +319,91 @@ class SQLiteDb(object):
     if self.read_only:
       raise RuntimeError(u'Cannot create table database in read-only mode.')
 
-    sql_query = u'insert into {0:s} ( {1:s} ) values ( {2:s} )'.format(
-        table_name, column_definitions, column_bind_values)
+    sql_key = (table_name, column_definitions, column_bind_values)
+    sql_query = self._insert_sql_cache.get(sql_key)
+    if sql_query is None:
+      sql_query = u'insert into {0:s} ( {1:s} ) values ( {2:s} )'.format(
+          table_name, column_definitions, column_bind_values)
+      self._insert_sql_cache[sql_key] = sql_query
 
     #print (sql_query)
-	
-    self._cursor.execute(sql_query, column_values)
+
+    if not self.bulk_load:
+      self._cursor.execute(sql_query, column_values)
+      return
+
+    # Rows for the same statement are buffered, a different statement flushes
+    # the buffer first so the insert order is kept.
+    if sql_query != self._bulk_sql:
+      self.FlushBindValues()
+      self._bulk_sql = sql_query
+    self._bulk_rows.append(tuple(column_values))
+    if len(self._bulk_rows) >= self.batch_size:
+      self.FlushBindValues()
+
+  def FlushBindValues(self):
+    #Writes the rows buffered by InsertBindValues in bulk load mode using
+    #executemany inside a savepoint, outside of a transaction releasing the
+    #savepoint commits the batch.  If the batch fails it is rolled back to the
+    #savepoint and the rows are retried one at a time.  A row that still fails
+    #raises its error, unless the database was opened with reject_rows, then
+    #the row is kept in rejected_rows and the caller has to report it.
+    #
+    #Raises:
+    #  RuntimeError: if the database is not opened.
+    #  sqlite3.Error: if a row cannot be inserted and reject_rows is not set.
+
+    if not self._bulk_rows:
+      return
+
+    if not self._connection:
+      raise RuntimeError(u'Cannot flush rows database not opened.')
+
+    sql_query = self._bulk_sql
+    bulk_rows = self._bulk_rows
+    self._bulk_rows = []
+
+    self._cursor.execute(u'SAVEPOINT bulk_rows')
+    try:
+      self._cursor.executemany(sql_query, bulk_rows)
+    except (sqlite3.Error, OverflowError):
+      self._cursor.execute(u'ROLLBACK TO bulk_rows')
+      for bulk_row in bulk_rows:
+        try:
+          self._cursor.execute(sql_query, bulk_row)
+        except (sqlite3.Error, OverflowError) as err:
+          if not self.reject_rows:
+            # The rows before the failing row are kept, the same as without bulk load
+            self._cursor.execute(u'RELEASE bulk_rows')
+            raise
+          self.rejected_rows.append((bulk_row, str(err)))
+    self._cursor.execute(u'RELEASE bulk_rows')
+
+  def BeginTransaction(self):
+    #Starts a transaction, the statements and bulk load batches that follow are
+    #only committed together by Commit or Close.
+    #
+    #Raises:
+    #  RuntimeError: if the database is not opened.
+
+    if not self._connection:
+      raise RuntimeError(u'Cannot begin transaction database not opened.')
+
+    self.FlushBindValues()
+    if not self._connection.in_transaction:
+      self._cursor.execute(u'BEGIN')
+
+  def Commit(self):
+    #Writes the buffered rows and commits the open transaction.
+    #
+    #Raises:
+    #  RuntimeError: if the database is not opened.
+
+    if not self._connection:
+      raise RuntimeError(u'Cannot commit database not opened.')
+
+    self.FlushBindValues()
+    self._connection.commit()
 
   def TableExists(self, table_name):
     # Checks if the table exists in the database
@@ -299,6 +421,7 @@ class SQLiteDb(object):
 
     sql_query = u'SELECT name FROM sqlite_master WHERE type = "table" AND name = "{0:s}"'.format(table_name)
 
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
     if self._cursor.fetchone():
       has_table = True
@@ -320,6 +443,7 @@ class SQLiteDb(object):
       raise RuntimeError(
           u'Cannot determine if table exists database not opened.')
 
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
     return self._cursor.fetchone()
 
@@ -337,10 +461,66 @@ class SQLiteDb(object):
       raise RuntimeError(
           u'Cannot determine if table exists database not opened.')
 
+    self.FlushBindValues()
     self._cursor.execute(sql_query)
     return self._cursor.fetchall()
 
-  def Open(self, filename, read_only=False):
+  def InsertSelect (self, sql_query):
+    # Insert into a table with a select statement
+
+    # Args:
+    #  sql_query: query you want to execute.
+
+    #Raises:
+    #  RuntimeError: if the database is not opened or
+    #                if the database is in read-only mode.
+
+    if not self._connection:
+      raise RuntimeError(
+          u'Cannot insert into table database not opened.')
+
+    if self.read_only:
+      raise RuntimeError(u'Cannot insert into table database in read-only mode.')
+
+    self.FlushBindValues()
+    self._cursor.execute(sql_query)
+
+  def AttachDatabase (self, file_name, schema_name):
+    # Attaches another database file so its tables can be read as schema_name.table
+
+    # Args:
+    #  file_name: the database file to attach.
+    #  schema_name: the name the attached database is known by.
+
+    #Raises:
+    #  RuntimeError: if the database is not opened.
+
+    if not self._connection:
+      raise RuntimeError(
+          u'Cannot attach database database not opened.')
+
+    self.FlushBindValues()
+    self._cursor.execute(u'ATTACH DATABASE ? AS {0:s}'.format(schema_name), (file_name,))
+
+  def DetachDatabase (self, schema_name):
+    # Detaches a database attached with AttachDatabase
+
+    # Args:
+    #  schema_name: the name the attached database is known by.
+
+    #Raises:
+    #  RuntimeError: if the database is not opened.
+
+    if not self._connection:
+      raise RuntimeError(
+          u'Cannot detach database database not opened.')
+
+    # A database read in the open transaction cannot be detached until it is committed
+    self.Commit()
+    self._cursor.execute(u'DETACH DATABASE {0:s}'.format(schema_name))
+
+  def Open(self, filename, read_only=False, bulk_load=False, batch_size=10000, journal_mode='MEMORY', \
+           synchronous='OFF', cache_size=-65536, page_size=65536, reject_rows=False):
     #Opens the database file.
 
     #Args:
@@ -349,6 +529,15 @@ class SQLiteDb(object):
     #             opened in read-only mode. The default is false. Since sqlite3
     #             does not support a real read-only mode we fake it by only
     #             permitting SELECT queries.
+    #  bulk_load: optional boolean value to buffer InsertBindValues rows and
+    #             write them with executemany in batches of batch_size rows.
+    #  batch_size: number of rows per bulk load batch.
+    #  journal_mode, synchronous, cache_size, page_size: PRAGMA values used
+    #             when the database is opened in bulk load mode.  page_size
+    #             only has an effect on a new database.
+    #  reject_rows: optional boolean value, when True the bulk load rows that
+    #             cannot be inserted are kept in rejected_rows instead of
+    #             raising the error.  The caller has to report them.
 
     #Returns:
     #  A boolean containing True if successful or False if not.
@@ -370,4 +559,13 @@ class SQLiteDb(object):
     if not self._cursor:
       return False
 
+    if bulk_load and not read_only:
+      self._cursor.execute(u'PRAGMA page_size = {0:d}'.format(page_size))
+      self._cursor.execute(u'PRAGMA journal_mode = {0:s}'.format(journal_mode))
+      self._cursor.execute(u'PRAGMA synchronous = {0:s}'.format(synchronous))
+      self._cursor.execute(u'PRAGMA cache_size = {0:d}'.format(cache_size))
+      self.bulk_load = True
+      self.batch_size = batch_size
+      self.reject_rows = reject_rows
+
     return True
@@ -0,0 +1,378 @@
+# Evtx_BinXml.py = Python class to decode the binary XML of EVTX records into EventData name/value pairs
+#
+# Copyright (C) 2016 Mark McKinnon (Mark.McKinnon@Davenport.edu)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You can view the GNU General Public License at <http://www.gnu.org/licenses/>
+#
+# Version History:
+#  Initial Version
+#
+# An EVTX record is a template instance, a reference to a template definition stored in the chunk plus the
+# substitution values of the record.  Almost every record of a log uses one of a handful of templates so a
+# template is only parsed the first time it is seen and the parsed element tree is cached by its GUID.  A
+# record then only costs reading its substitution value table.  Only the EventData and UserData elements
+# are rendered, the System element is what pyevtx already exports.
+#
+# Records are found by their identifier, the chunk headers give the range of identifiers in each chunk and
+# the records of a chunk are indexed the first time the chunk is read.
+
+import os
+import bisect
+import struct
+import uuid
+import datetime
+
+from Evtx_Chunks import evtx_header_size, evtx_chunk_size
+
+chunk_signature = b'ElfChnk\x00'
+chunk_header_size = 512
+record_signature = b'**\x00\x00'
+record_header_size = 24
+template_header_size = 24
+
+uint8 = struct.Struct('<B')
+uint16 = struct.Struct('<H')
+uint32 = struct.Struct('<I')
+uint64 = struct.Struct('<Q')
+chunk_header = struct.Struct('<8sQQQQIII')
+value_descriptor = struct.Struct('<HBx')
+system_time = struct.Struct('<8H')
+
+# Substitution value types that are a fixed size number and how they are shown
+number_value_types = {0x03: struct.Struct('<b'), 0x04: struct.Struct('<B'), 0x05: struct.Struct('<h'), \
+                      0x06: struct.Struct('<H'), 0x07: struct.Struct('<i'), 0x08: struct.Struct('<I'), \
+                      0x09: struct.Struct('<q'), 0x0a: struct.Struct('<Q'), 0x0b: struct.Struct('<f'), \
+                      0x0c: struct.Struct('<d')}
+hex_value_types = {0x14: struct.Struct('<I'), 0x15: struct.Struct('<Q')}
+
+entity_names = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'"}
+
+binxml_value_type = 0x21
+array_value_flag = 0x80
+
+def get_filetime_text(filetime):
+    if filetime == 0:
+       return ''
+    return (datetime.datetime(1601, 1, 1) + datetime.timedelta(microseconds=filetime // 10)).isoformat() + 'Z'
+
+def get_sid_text(sid_data):
+    number_of_sub_authorities = sid_data[1]
+    sid_text = 'S-' + str(sid_data[0]) + '-' + str(int.from_bytes(sid_data[2:8], 'big'))
+    for sub_authority in range(0, number_of_sub_authorities):
+       sid_text = sid_text + '-' + str(uint32.unpack_from(sid_data, 8 + (sub_authority * 4))[0])
+    return sid_text
+
+class EvtxEventDataReader(object):
+  #Class that reads the EventData of the records of an event log.
+
+  def __init__(self, file_object):
+    """Initializes the event data reader, file_object is the same kind of file object pyevtx was given."""
+    super(EvtxEventDataReader, self).__init__()
+    self._file_object = file_object
+    self._chunk_ranges = None
+    self._chunk_first_identifiers = None
+    self._chunk_offset = None
+    self._chunk = None
+    self._chunk_records = {}
+    self._chunk_names = {}
+    self._chunk_templates = {}
+    self._templates = {}
+    self.number_of_errors = 0
+
+  def get_event_data(self, record_identifier):
+    #Returns the EventData, or UserData, of the record with record_identifier as a list of (name, value)
+    #pairs.  A record that can not be decoded gives an empty list and is counted in number_of_errors.
+
+    try:
+      record_position = self._Find_Record(record_identifier)
+      record_size = uint32.unpack_from(self._chunk, record_position + 4)[0]
+      (nodes, position) = self._Parse_Nodes(record_position + record_header_size, record_position + record_size - 4)
+      event_data = []
+      for (element, values) in self._Get_Elements(nodes, None):
+        if element[1] == 'Event':
+          self._Get_Event_Data(element, values, event_data)
+      return event_data
+    except (struct.error, ValueError, IndexError, KeyError, UnicodeDecodeError, RecursionError):
+      self.number_of_errors = self.number_of_errors + 1
+      return []
+
+  def _Read_Chunk_Ranges(self):
+    # Reads the first and last record identifier of every chunk from the chunk headers, the ranges are
+    # sorted by first identifier so a record is found with a binary search.  A log that wrapped around
+    # does not have its chunks in identifier order.
+
+    self._chunk_ranges = []
+    file_size = self._file_object.seek(0, os.SEEK_END)
+    for chunk_offset in range(evtx_header_size, file_size - evtx_chunk_size + 1, evtx_chunk_size):
+      self._file_object.seek(chunk_offset)
+      header_data = self._file_object.read(chunk_header.size)
+      if len(header_data) < chunk_header.size:
+        break
+      header_values = chunk_header.unpack(header_data)
+      if header_values[0] == chunk_signature:
+        self._chunk_ranges.append((header_values[3], header_values[4], chunk_offset))
+    self._chunk_ranges.sort()
+    self._chunk_first_identifiers = [first_identifier for (first_identifier, last_identifier, chunk_offset) in self._chunk_ranges]
+
+  def _Find_Record(self, record_identifier):
+    # Keeps the chunk holding the record in memory, names and template offsets are relative to the chunk
+
+    record_position = self._chunk_records.get(record_identifier)
+    if record_position != None:
+      return record_position
+    if self._chunk_ranges == None:
+      self._Read_Chunk_Ranges()
+    # The last chunk that starts at or before the record holds it, earlier chunks are only read if the
+    # ranges overlap
+    range_index = bisect.bisect_right(self._chunk_first_identifiers, record_identifier) - 1
+    for range_index in range(range_index, -1, -1):
+      (first_identifier, last_identifier, chunk_offset) = self._chunk_ranges[range_index]
+      if record_identifier <= last_identifier and chunk_offset != self._chunk_offset:
+        self._Read_Chunk(chunk_offset)
+        record_position = self._chunk_records.get(record_identifier)
+        if record_position != None:
+          return record_position
+    raise KeyError(u'Record not found.')
+
+  def _Read_Chunk(self, chunk_offset):
+    # Reads a chunk and indexes its records by identifier
+
+    self._file_object.seek(chunk_offset)
+    self._chunk = self._file_object.read(evtx_chunk_size)
+    self._chunk_offset = chunk_offset
+    self._chunk_names = {}
+    self._chunk_templates = {}
+    self._chunk_records = {}
+    free_space_offset = min(chunk_header.unpack_from(self._chunk)[7], len(self._chunk))
+    record_position = chunk_header_size
+    while record_position + record_header_size <= free_space_offset:
+      if self._chunk[record_position:record_position + 4] != record_signature:
+        break
+      record_size = uint32.unpack_from(self._chunk, record_position + 4)[0]
+      if record_size < record_header_size:
+        break
+      self._chunk_records[uint64.unpack_from(self._chunk, record_position + 8)[0]] = record_position
+      record_position = record_position + record_size
+
+  def _Read_Name(self, name_offset, position):
+    # A name is stored in line the first time it is used in a chunk, after that it is referenced by offset
+
+    # The stored length is in UTF-16 code units, a character outside the basic plane takes two of them
+    number_of_characters = uint16.unpack_from(self._chunk, name_offset + 6)[0]
+    name = self._chunk_names.get(name_offset)
+    if name == None:
+      name = self._chunk[name_offset + 8:name_offset + 8 + (number_of_characters * 2)].decode('utf-16-le')
+      self._chunk_names[name_offset] = name
+    if name_offset == position:
+      position = position + 8 + (number_of_characters * 2) + 2
+    return (name, position)
+
+  def _Parse_Nodes(self, position, end_position):
+    # Parses tokens up to the end of file token, or the end element token that closes the parent element
+
+    nodes = []
+    while position < end_position:
+      token = self._chunk[position]
+      token_type = token & 0xbf
+      if token_type == 0x00:
+        return (nodes, position + 1)
+      elif token_type == 0x04:
+        return (nodes, position + 1)
+      elif token_type == 0x0f:
+        position = position + 4
+      elif token_type == 0x01:
+        (element, position) = self._Parse_Element(token, position, end_position)
+        nodes.append(element)
+      elif token_type == 0x0c:
+        (instance, position) = self._Parse_Template_Instance(position)
+        nodes.append(instance)
+      elif token_type in (0x0a, 0x0b):
+        if token_type == 0x0a:
+          (name, position) = self._Read_Name(uint32.unpack_from(self._chunk, position + 1)[0], position + 5)
+        else:
+          position = position + 3 + (uint16.unpack_from(self._chunk, position + 1)[0] * 2)
+      else:
+        (part, position) = self._Parse_Value_Part(token_type, position)
+        nodes.append(part)
+    return (nodes, position)
+
+  def _Parse_Value_Part(self, token_type, position):
+    # Parses a token that is part of a text or attribute value
+
+    if token_type == 0x05:
+      if self._chunk[position + 1] != 0x01:
+        raise ValueError(u'Unsupported value token type.')
+      number_of_characters = uint16.unpack_from(self._chunk, position + 2)[0]
+      text = self._chunk[position + 4:position + 4 + (number_of_characters * 2)].decode('utf-16-le')
+      return (('T', text), position + 4 + (number_of_characters * 2))
+    elif token_type == 0x07:
+      number_of_characters = uint16.unpack_from(self._chunk, position + 1)[0]
+      text = self._chunk[position + 3:position + 3 + (number_of_characters * 2)].decode('utf-16-le')
+      return (('T', text), position + 3 + (number_of_characters * 2))
+    elif token_type == 0x08:
+      return (('T', chr(uint16.unpack_from(self._chunk, position + 1)[0])), position + 3)
+    elif token_type == 0x09:
+      (name, position) = self._Read_Name(uint32.unpack_from(self._chunk, position + 1)[0], position + 5)
+      return (('T', entity_names.get(name, '&' + name + ';')), position)
+    elif token_type in (0x0d, 0x0e):
+      return (('S', uint16.unpack_from(self._chunk, position + 1)[0]), position + 4)
+    raise ValueError(u'Unsupported token 0x{0:02x}.'.format(token_type))
+
+  def _Parse_Element(self, token, position, end_position):
+    # Element nodes are ('E', name, [(attribute name, value parts)], child nodes)
+
+    name_offset = uint32.unpack_from(self._chunk, position + 7)[0]
+    (name, position) = self._Read_Name(name_offset, position + 11)
+    if token & 0x40:
+      position = position + 4
+    attributes = []
+    while (self._chunk[position] & 0xbf) == 0x06:
+      (attribute_name, position) = self._Read_Name(uint32.unpack_from(self._chunk, position + 1)[0], position + 5)
+      value_parts = []
+      while (self._chunk[position] & 0xbf) in (0x05, 0x07, 0x08, 0x09, 0x0d, 0x0e):
+        (part, position) = self._Parse_Value_Part(self._chunk[position] & 0xbf, position)
+        value_parts.append(part)
+      attributes.append((attribute_name, value_parts))
+    if self._chunk[position] == 0x02:
+      (children, position) = self._Parse_Nodes(position + 1, end_position)
+    elif self._chunk[position] == 0x03:
+      children = []
+      position = position + 1
+    else:
+      raise ValueError(u'Missing close start element token.')
+    return (('E', name, attributes, children), position)
+
+  def _Parse_Template_Instance(self, position):
+    # Instance nodes are ('I', template nodes, [(value type, value offset, value size)])
+
+    template_offset = uint32.unpack_from(self._chunk, position + 6)[0]
+    position = position + 10
+    template_size = uint32.unpack_from(self._chunk, template_offset + 20)[0]
+    if template_offset == position:
+      position = position + template_header_size + template_size
+
+    template = self._chunk_templates.get(template_offset)
+    if template == None:
+      template_guid = self._chunk[template_offset + 4:template_offset + 20]
+      template = self._templates.get(template_guid)
+      if template == None:
+        (template, template_end) = self._Parse_Nodes(template_offset + template_header_size, template_offset + template_header_size + template_size)
+        self._templates[template_guid] = template
+      self._chunk_templates[template_offset] = template
+
+    number_of_values = uint32.unpack_from(self._chunk, position)[0]
+    value_offset = position + 4 + (number_of_values * 4)
+    values = []
+    for value_index in range(0, number_of_values):
+      (value_size, value_type) = value_descriptor.unpack_from(self._chunk, position + 4 + (value_index * 4))
+      values.append((value_type, value_offset, value_size))
+      value_offset = value_offset + value_size
+    return (('I', template, values), value_offset)
+
+  def _Get_Elements(self, nodes, values):
+    # Yields the (element, substitution values) pairs of a node list with template instances and
+    # binary XML substitutions replaced by the elements they hold
+
+    for node in nodes:
+      if node[0] == 'E':
+        yield (node, values)
+      elif node[0] == 'I':
+        for element in self._Get_Elements(node[1], node[2]):
+          yield element
+      elif node[0] == 'S' and values != None and node[1] < len(values) and values[node[1]][0] == binxml_value_type:
+        (value_type, value_offset, value_size) = values[node[1]]
+        (binxml_nodes, position) = self._Parse_Nodes(value_offset, value_offset + value_size)
+        for element in self._Get_Elements(binxml_nodes, None):
+          yield element
+
+  def _Get_Text(self, parts, values):
+    text = ''
+    for part in parts:
+      if part[0] == 'T':
+        text = text + part[1]
+      elif part[0] == 'S' and values != None and part[1] < len(values):
+        text = text + self._Get_Value_Text(values[part[1]])
+    return text
+
+  def _Get_Attribute(self, element, values, attribute_name):
+    for (name, parts) in element[2]:
+      if name == attribute_name:
+        return self._Get_Text(parts, values)
+    return None
+
+  def _Get_Event_Data(self, event_element, values, event_data):
+    # EventData holds Data elements named by their Name attribute, UserData holds provider defined
+    # elements and each element that only has text becomes a pair
+
+    for (element, element_values) in self._Get_Elements(event_element[3], values):
+      if element[1] == 'EventData':
+        for (data_element, data_values) in self._Get_Elements(element[3], element_values):
+          data_name = self._Get_Attribute(data_element, data_values, 'Name')
+          if data_name == None:
+            data_name = data_element[1]
+          event_data.append((data_name, self._Get_Text(data_element[3], data_values)))
+      elif element[1] == 'UserData':
+        self._Get_User_Data(element, element_values, event_data)
+
+  def _Get_User_Data(self, parent_element, values, event_data):
+    child_elements = list(self._Get_Elements(parent_element[3], values))
+    if len(child_elements) == 0:
+      event_data.append((parent_element[1], self._Get_Text(parent_element[3], values)))
+      return
+    for (element, element_values) in child_elements:
+      self._Get_User_Data(element, element_values, event_data)
+
+  def _Get_Value_Text(self, value):
+    # Formats a substitution value the way the event viewer shows it
+
+    (value_type, value_offset, value_size) = value
+    value_data = self._chunk[value_offset:value_offset + value_size]
+    if value_type == 0x00 or value_size == 0:
+      return ''
+    elif value_type == 0x01:
+      return value_data.decode('utf-16-le').rstrip('\x00')
+    elif value_type == 0x02:
+      return value_data.decode('cp1252', 'replace').rstrip('\x00')
+    elif value_type in number_value_types:
+      return str(number_value_types[value_type].unpack_from(value_data)[0])
+    elif value_type in hex_value_types:
+      return '0x{0:0{1:d}x}'.format(hex_value_types[value_type].unpack_from(value_data)[0], value_size * 2)
+    elif value_type == 0x0d:
+      return str(uint32.unpack_from(value_data)[0] != 0).lower()
+    elif value_type == 0x0e:
+      return value_data.hex().upper()
+    elif value_type == 0x0f:
+      return '{' + str(uuid.UUID(bytes_le=value_data[0:16])).upper() + '}'
+    elif value_type == 0x10:
+      return '0x{0:x}'.format(int.from_bytes(value_data, 'little'))
+    elif value_type == 0x11:
+      return get_filetime_text(uint64.unpack_from(value_data)[0])
+    elif value_type == 0x12:
+      (year, month, day_of_week, day, hours, minutes, seconds, milliseconds) = system_time.unpack_from(value_data)
+      return '{0:04d}-{1:02d}-{2:02d}T{3:02d}:{4:02d}:{5:02d}.{6:03d}Z'.format(year, month, day, hours, minutes, \
+                                                                               seconds, milliseconds)
+    elif value_type == 0x13:
+      return get_sid_text(value_data)
+    elif value_type == (array_value_flag | 0x01):
+      return ', '.join(value_data.decode('utf-16-le').rstrip('\x00').split('\x00'))
+    elif value_type & array_value_flag:
+      item_type = value_type & ~array_value_flag
+      if item_type in number_value_types:
+        item_struct = number_value_types[item_type]
+      elif item_type in hex_value_types:
+        item_struct = hex_value_types[item_type]
+      else:
+        return value_data.hex().upper()
+      return ', '.join([self._Get_Value_Text((item_type, value_offset + item_offset, item_struct.size)) \
+                        for item_offset in range(0, value_size - item_struct.size + 1, item_struct.size)])
+    return value_data.hex().upper()
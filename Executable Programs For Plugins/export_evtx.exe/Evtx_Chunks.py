@@ -0,0 +1,104 @@
+# Evtx_Chunks.py = Python class to present a range of EVTX chunks as a stand alone event log
+#
+# Copyright (C) 2016 Mark McKinnon (Mark.McKinnon@Davenport.edu)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You can view the GNU General Public License at <http://www.gnu.org/licenses/>
+#
+# Version History:
+#  Initial Version
+#
+# An EVTX file is a 4096 byte file header followed by independent 64 KB chunks.  A chunk holds its
+# own string and template tables so a range of chunks with a patched file header in front of it is
+# a valid event log that pyevtx can open through open_file_object.
+
+import os
+import struct
+import zlib
+
+evtx_header_size = 4096
+evtx_chunk_size = 65536
+# The chunk count in the file header is 16 bits, a chunk view can not hold more chunks than this
+evtx_max_chunks_per_view = 0xffff
+
+def get_number_of_chunks(file_name):
+    # Returns the number of whole chunks in the event log, a partial chunk at the end is ignored
+
+    file_size = os.path.getsize(file_name)
+    if file_size <= evtx_header_size:
+       return 0
+    return (file_size - evtx_header_size) // evtx_chunk_size
+
+def get_chunk_ranges(number_of_chunks, chunks_per_range):
+    # Splits the chunks of an event log into consecutive (begin, end) ranges, no range is bigger than
+    # the chunk count of the file header of its chunk view can hold
+
+    chunks_per_range = min(chunks_per_range, evtx_max_chunks_per_view)
+    chunk_ranges = []
+    for begin_chunk in range(0, number_of_chunks, chunks_per_range):
+       chunk_ranges.append((begin_chunk, min(number_of_chunks, begin_chunk + chunks_per_range)))
+    return chunk_ranges
+
+class EvtxChunkView(object):
+  #Class that presents chunks begin_chunk up to end_chunk of an event log as a file object.
+
+  def __init__(self, file_name, begin_chunk, end_chunk):
+    """Initializes the chunk view file object."""
+    super(EvtxChunkView, self).__init__()
+    self.name = file_name
+    self._file_object = open(file_name, "rb")
+    self._chunk_offset = evtx_header_size + (begin_chunk * evtx_chunk_size)
+    self._size = evtx_header_size + ((end_chunk - begin_chunk) * evtx_chunk_size)
+    self._position = 0
+    self._header = self._Create_Header(end_chunk - begin_chunk)
+
+  def _Create_Header(self, number_of_chunks):
+    # Rewrites the chunk numbers and chunk count of the file header and recalculates its checksum
+
+    header = bytearray(self._file_object.read(evtx_header_size))
+    struct.pack_into('<QQ', header, 8, 0, number_of_chunks - 1)
+    struct.pack_into('<H', header, 42, number_of_chunks)
+    struct.pack_into('<L', header, 124, zlib.crc32(bytes(header[0:120])) & 0xffffffff)
+    return bytes(header)
+
+  def read(self, size=-1):
+    if size is None or size < 0 or self._position + size > self._size:
+       size = self._size - self._position
+    if size <= 0:
+       return b''
+    data = b''
+    if self._position < evtx_header_size:
+       data = self._header[self._position:self._position + size]
+    if len(data) < size:
+       self._file_object.seek(self._chunk_offset + self._position + len(data) - evtx_header_size)
+       data = data + self._file_object.read(size - len(data))
+    self._position = self._position + len(data)
+    return data
+
+  def seek(self, offset, whence=os.SEEK_SET):
+    if whence == os.SEEK_CUR:
+       offset = self._position + offset
+    elif whence == os.SEEK_END:
+       offset = self._size + offset
+    if offset < 0:
+       raise IOError(u'Cannot seek before the start of the chunk view.')
+    self._position = offset
+    return self._position
+
+  def tell(self):
+    return self._position
+
+  def get_size(self):
+    return self._size
+
+  def close(self):
+    self._file_object.close()
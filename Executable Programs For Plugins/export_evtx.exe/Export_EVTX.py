@@ -19,6 +19,14 @@
 # 
 # Usage Examples:
 # python3 export_EVTX.py /home/mark/eventlog_directory event_logs.db3
+# python3 export_EVTX.py /home/mark/eventlog_directory event_logs.db3 --workers 4
+# python3 export_EVTX.py /home/mark/eventlog_directory event_logs.db3 --log-names Security.evtx --event-ids 4624,4625
+# python3 export_EVTX.py /home/mark/eventlog_directory event_logs.db3 --compact
+# python3 export_EVTX.py /home/mark/eventlog_directory event_logs.db3 --event-data
+#
+# Logs that are completely exported are listed in the Event_Log_Manifest table, running the same
+# command again after a crash only exports the logs that are not listed there.  A compacted database is
+# expanded back to rows when there are logs to add and compacted again if --compact is given.
 
 import os
 import sys
@@ -27,14 +35,43 @@ import codecs
 from Database import SQLiteDb
 import ntpath
 import argparse
+import multiprocessing
+import hashlib
+import Evtx_Chunks
+import Evtx_BinXml
 
 table_name = 'Event_Logs'
 table_columns = 'file_name text, Recovered_Record text, Computer_name text, Event_Identifier number, Event_Identifier_Qualifiers text, ' + \
                 'Event_Level number, Event_Offset number, identifier number, Event_Source_Name text,' + \
-                'Event_User_Security_Identifier text, Event_Time text, Event_time_epoch number, Event_detail_text text'
+                'Event_User_Security_Identifier text, Event_Time text, Event_time_epoch number, Event_detail_text text, File_Path text'
 sql_ins_columns = 'file_name, recovered_record, Computer_name, Event_Identifier, Event_Identifier_Qualifiers, Event_Level, Event_Offset, ' + \
-                'identifier, Event_Source_Name, Event_User_Security_Identifier, Event_Time, Event_time_epoch, Event_detail_text' 
-sql_bind = '?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?'
+                'identifier, Event_Source_Name, Event_User_Security_Identifier, Event_Time, Event_time_epoch, Event_detail_text, File_Path' 
+sql_bind = '?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?'
+
+summary_table_name = 'Event_Log_Summary'
+
+# Structured EventData of each record, one row per name/value pair
+event_data_table_name = 'Event_Log_Data'
+event_data_columns = 'file_name text, identifier number, Event_Identifier number, Data_Name text, Data_Value text, File_Path text'
+event_data_ins_columns = 'file_name, identifier, Event_Identifier, Data_Name, Data_Value, File_Path'
+event_data_bind = '?, ?, ?, ?, ?, ?'
+
+# One row per event log that has been completely exported, a rerun skips the logs listed here.  Logs in
+# different folders can have the same file name so the export rows are tied to the manifest by File_Path.
+manifest_table_name = 'Event_Log_Manifest'
+manifest_columns = 'File_Path text, File_Name text, File_Size number, File_Hash text, Event_Ids text, Event_Data text'
+manifest_ins_columns = 'File_Path, File_Name, File_Size, File_Hash, Event_Ids, Event_Data'
+manifest_bind = '?, ?, ?, ?, ?, ?'
+
+# Compact layout, the repeated strings are stored once in a lookup table and Event_Logs becomes a view
+# over the compact table that gives back the original columns
+compact_table_name = 'Event_Logs_Compact'
+compact_lookup_tables = [('Event_Log_Files', 'File_Name'), ('Event_Log_Computers', 'Computer_Name'), \
+                         ('Event_Log_Sources', 'Event_Source_Name'), ('Event_Log_Users', 'Event_User_Security_Identifier'), \
+                         ('Event_Log_Paths', 'File_Path')]
+
+# A log is only split into chunk ranges if every range gets at least this many 64 KB chunks (16 MB)
+Min_Chunks_Per_Range = 256
 
 def uprint(*objects, sep=' ', end='\n', file=sys.stdout):
     enc = file.encoding
@@ -44,7 +81,7 @@ def uprint(*objects, sep=' ', end='\n', file=sys.stdout):
         f = lambda obj: str(obj).encode(enc, errors='backslashreplace').decode(enc)
         print(*map(f, objects), sep=sep, end=end, file=file)
 
-def get_filepaths(directory):
+def get_filepaths(directory, log_names=None):
 
     file_paths = []  # List which will store all of the full filepaths.
     dir_paths = []
@@ -55,27 +92,63 @@ def get_filepaths(directory):
             # Join the two strings in order to form the full filepath.
             filepath = os.path.join(root, filename.upper())
             if '.EVTX' in filepath:
+               # Only keep the logs that were asked for
+               if log_names != None and filename.upper() not in log_names:
+                  continue
                file_paths.append(filepath)  # Add it to the list.
 
     return file_paths # Self-explanatory.
 
 
-def parse_event_log(file_to_parse):
+def get_comma_list(comma_text):
+    # Splits a comma delimited command line option, empty entries are dropped
+    return [item.strip() for item in comma_text.split(',') if item.strip() != '']
+
+def get_event_id_set(comma_text):
+    event_ids = set()
+    for event_id in get_comma_list(comma_text):
+       try:
+          event_ids.add(int(event_id))
+       except ValueError:
+          raise argparse.ArgumentTypeError('invalid event id ' + event_id)
+    return frozenset(event_ids)
+
+def get_log_name_set(comma_text):
+    return frozenset([log_name.upper() for log_name in get_comma_list(comma_text)])
+
+def parse_event_log(file_to_parse, SQLitedb, chunk_range=None, event_ids=None, event_data=False):
 
    
-   file_object = open(file_to_parse, "rb")
+   if chunk_range == None:
+      file_object = open(file_to_parse, "rb")
+      record_offset_adjust = 0
+   else:
+      # Record offsets in a chunk view are relative to the view, move them back to the real file
+      file_object = Evtx_Chunks.EvtxChunkView(file_to_parse, chunk_range[0], chunk_range[1])
+      record_offset_adjust = chunk_range[0] * Evtx_Chunks.evtx_chunk_size
    evtx_file = pyevtx.file()
    evtx_file.open_file_object(file_object)
    SQLitedb.CreateTempTable(table_name + '_temp', table_columns)   
+   if event_data:
+      # The decoder reads the chunks through its own file object so it does not move the one pyevtx reads
+      if chunk_range == None:
+         event_data_file_object = open(file_to_parse, "rb")
+      else:
+         event_data_file_object = Evtx_Chunks.EvtxChunkView(file_to_parse, chunk_range[0], chunk_range[1])
+      event_data_reader = Evtx_BinXml.EvtxEventDataReader(event_data_file_object)
+      SQLitedb.CreateTempTable(event_data_table_name + '_temp', event_data_columns)
 
    print (' Number of Records in Event Log ==> ', evtx_file.get_number_of_records())
    print (' Number of recovered Records in Event Log ==> ', evtx_file.get_number_of_recovered_records())
 
    for i in range (0, evtx_file.get_number_of_records()):
+      evtx_record = evtx_file.get_record(i)
+      # Records that were not asked for are skipped before anything is formatted
+      if event_ids != None and evtx_record.get_event_identifier() not in event_ids:
+         continue
       event_record = []
       event_record.append(ntpath.basename(file_to_parse))
       event_string = ""
-      evtx_record = evtx_file.get_record(i)
       event_record.append('N')
       if (evtx_record.get_computer_name() == None):
          event_record.append('NULL')
@@ -84,8 +157,8 @@ def parse_event_log(file_to_parse):
       event_record.append(evtx_record.get_event_identifier())   
       event_record.append(evtx_record.get_event_identifier_qualifiers())   
       event_record.append(evtx_record.get_event_level())   
+      event_record.append(evtx_record.get_offset() + record_offset_adjust)   
       event_record.append(evtx_record.get_identifier())   
-      event_record.append(evtx_record.get_offset())   
       if (evtx_record.get_source_name() == None):
          event_record.append('NULL')
       else:
@@ -102,30 +175,326 @@ def parse_event_log(file_to_parse):
          else:
             event_string = event_string + evtx_record.get_string(x) + " \n"
       event_record.append(event_string)	  
+      event_record.append(file_to_parse)
   
       SQLitedb.InsertBindValues(table_name + '_temp', sql_ins_columns, sql_bind, event_record) 
+      if event_data:
+         for (data_name, data_value) in event_data_reader.get_event_data(evtx_record.get_identifier()):
+            SQLitedb.InsertBindValues(event_data_table_name + '_temp', event_data_ins_columns, event_data_bind, \
+                                      [event_record[0], event_record[7], event_record[3], data_name, data_value, file_to_parse])
+
+   evtx_file.close()
+   file_object.close()
 
+   if event_data:
+      event_data_file_object.close()
+      if event_data_reader.number_of_errors > 0:
+         print (' Number of records with EventData that could not be decoded ==> ', event_data_reader.number_of_errors)
 
    if (SQLitedb.TableExists(table_name)):  
       SQLitedb.AppendTempToPermanentTable(table_name)
    else:
       SQLitedb.CreatePermanentTable(table_name)
    SQLitedb.DropTable(table_name + '_temp')
+   if event_data:
+      if (SQLitedb.TableExists(event_data_table_name)):
+         SQLitedb.AppendTempToPermanentTable(event_data_table_name)
+      else:
+         SQLitedb.CreatePermanentTable(event_data_table_name)
+      SQLitedb.DropTable(event_data_table_name + '_temp')
 
+def index_exists(SQLitedb, index_name):
+   return SQLitedb.SelectOneRow("select name from sqlite_master where type = 'index' and name = '" + index_name + "'") != None
 
-   
-args = sys.argv[1:]
-Directory_To_Parse = args[0]
-SQLite_DB_Name = args[1]
-print ('Dir is ', str(Directory_To_Parse))
-print ('DB file is ', SQLite_DB_Name)
-SQLitedb = SQLiteDb()
-SQLitedb.Open(SQLite_DB_Name)
+def create_indexes_and_summary(SQLitedb, compact=False):
+   # Built once after loading so the ingest modules can read one file, or its long tail counts,
+   # without scanning the whole Event_Logs table.  The ingest queries use upper(File_Name).
+   if not (SQLitedb.TableExists(table_name)):
+      return
+   if not compact and not index_exists(SQLitedb, table_name + '_File_Event_Idx'):
+      SQLitedb.CreateIndex(table_name + '_File_Event_Idx', table_name, 'upper(File_Name), Event_Identifier')
+   if (SQLitedb.TableExists(event_data_table_name)) and not index_exists(SQLitedb, event_data_table_name + '_File_Idx'):
+      SQLitedb.CreateIndex(event_data_table_name + '_File_Idx', event_data_table_name, 'upper(File_Name), Identifier')
+   SQLitedb.InsertSelect('create table ' + summary_table_name + ' as select File_Name, Event_Identifier, ' + \
+                         'count(*) Number_Of_Events from ' + table_name + ' group by upper(File_Name), Event_Identifier;')
+   SQLitedb.CreateIndex(summary_table_name + '_File_Idx', summary_table_name, 'upper(File_Name)')
+
+def get_file_hash(file_name):
+   file_hash = hashlib.sha1()
+   with open(file_name, 'rb') as file_object:
+      for file_block in iter(lambda: file_object.read(1048576), b''):
+         file_hash.update(file_block)
+   return file_hash.hexdigest()
+
+def get_event_data_text(event_data):
+   if event_data:
+      return 'Y'
+   return 'N'
 
-# Run the above function and store its results in a variable.   
-Full_File_Paths = get_filepaths(Directory_To_Parse)
+def get_event_ids_text(event_ids):
+   # How the event id filter is recorded in the manifest, a log exported with another filter is exported again
+   if event_ids == None:
+      return 'ALL'
+   return ','.join([str(event_id) for event_id in sorted(event_ids)])
 
-for files in Full_File_Paths:
-   parse_event_log(files)
-SQLitedb.Close()  
+def quote_text(text):
+   return "'" + text.replace("'", "''") + "'"
+
+def get_files_to_export(SQLitedb, Full_File_Paths, event_ids, event_data):
+   # Drops the logs the manifest lists with the same size, hash and export options, a log that changed or
+   # was exported with other options is exported again
+   if not (SQLitedb.TableExists(manifest_table_name)):
+      SQLitedb.CreateTable(manifest_table_name, manifest_columns)
+   completed_files = {}
+   for (file_path, file_size, file_hash, event_ids_text, event_data_text) in \
+       SQLitedb.SelectAllRows('select File_Path, File_Size, File_Hash, Event_Ids, Event_Data from ' + manifest_table_name + ';'):
+      completed_files[file_path] = (file_size, file_hash, event_ids_text, event_data_text)
+   files_to_export = []
+   for file_to_parse in Full_File_Paths:
+      if file_to_parse in completed_files:
+         (file_size, file_hash, event_ids_text, event_data_text) = completed_files[file_to_parse]
+         if file_size == os.path.getsize(file_to_parse) and event_ids_text == get_event_ids_text(event_ids) and \
+            event_data_text == get_event_data_text(event_data) and file_hash == get_file_hash(file_to_parse):
+            print (' Already exported, skipping ==> ', file_to_parse)
+            continue
+      files_to_export.append(file_to_parse)
+   return files_to_export
+
+def prepare_resume(SQLitedb, files_to_export):
+   # Called before anything is exported.  The manifest rows of the logs that are exported again are removed,
+   # then every record of a log that is not in the manifest, left by a changed log or by a run that stopped
+   # before the log was finished, is removed.  The summary table is rebuilt at the end of every run.
+   for file_to_parse in files_to_export:
+      SQLitedb.InsertSelect('delete from ' + manifest_table_name + ' where File_Path = ' + quote_text(file_to_parse) + ';')
+   for export_table_name in (table_name, event_data_table_name):
+      if (SQLitedb.TableExists(export_table_name)):
+         SQLitedb.InsertSelect('delete from ' + export_table_name + ' where File_Path not in (select File_Path from ' + \
+                               manifest_table_name + ');')
+   if (SQLitedb.TableExists(summary_table_name)):
+      SQLitedb.DropTable(summary_table_name)
+
+def record_completed_file(SQLitedb, file_to_parse, file_hash, event_ids, event_data):
+   # The records of the log are already committed, committing the manifest row marks the log as done.  A log
+   # with records that could not be inserted is left out of the manifest so the next run exports it again.
+   SQLitedb.FlushBindValues()
+   rejected_rows = [rejected_row for (rejected_row, error) in SQLitedb.rejected_rows if file_to_parse in rejected_row]
+   if len(rejected_rows) > 0:
+      print (' Records that could not be inserted, not marked as exported ==> ', file_to_parse, ' ', len(rejected_rows))
+      return
+   SQLitedb.InsertBindValues(manifest_table_name, manifest_ins_columns, manifest_bind, \
+                             [file_to_parse, ntpath.basename(file_to_parse), os.path.getsize(file_to_parse), \
+                              file_hash, get_event_ids_text(event_ids), get_event_data_text(event_data)])
+   SQLitedb.Commit()
+
+def get_compact_select():
+   # The select behind the Event_Logs view, it gives back the original columns of the compact table
+   view_columns = []
+   view_joins = []
+   for (lookup_table, lookup_column) in compact_lookup_tables:
+      # Every record has a file name, an inner join lets the view be read through the file name index
+      if lookup_column == 'File_Name':
+         view_joins.append(' join ')
+      else:
+         view_joins.append(' left join ')
+      view_joins.append(lookup_table + ' on ' + lookup_table + '.' + lookup_column + '_Id = ' + \
+                        compact_table_name + '.' + lookup_column + '_Id')
 
+   lookup_columns = [lookup_column.upper() for (lookup_table, lookup_column) in compact_lookup_tables]
+   for column_definition in table_columns.split(','):
+      column_name = column_definition.split()[0]
+      if column_name.upper() in lookup_columns:
+         lookup_table = compact_lookup_tables[lookup_columns.index(column_name.upper())][0]
+         view_columns.append(lookup_table + '.' + column_name + ' ' + column_name)
+      else:
+         view_columns.append(compact_table_name + '.' + column_name + ' ' + column_name)
+   return 'select ' + ', '.join(view_columns) + ' from ' + compact_table_name + ''.join(view_joins)
+
+def compact_event_logs(SQLitedb):
+   # Rewrites the loaded Event_Logs table into the compact layout.  Each lookup table holds the distinct
+   # values of one column keyed by <column>_Id, the compact table keeps those ids in place of the strings
+   # and Event_Logs is recreated as a view with the original columns so current readers do not change.
+   if not (SQLitedb.TableExists(table_name)):
+      return
+   select_columns = []
+   lookup_joins = []
+   for (lookup_table, lookup_column) in compact_lookup_tables:
+      SQLitedb.InsertSelect('create table ' + lookup_table + ' (' + lookup_column + '_Id integer primary key, ' + \
+                            lookup_column + ' text unique);')
+      SQLitedb.InsertSelect('insert into ' + lookup_table + ' (' + lookup_column + ') select distinct ' + \
+                            lookup_column + ' from ' + table_name + ' where ' + lookup_column + ' is not null;')
+      select_columns.append(lookup_table + '.' + lookup_column + '_Id')
+      lookup_joins.append(' left join ' + lookup_table + ' on ' + lookup_table + '.' + lookup_column + ' = ' + \
+                          table_name + '.' + lookup_column)
+
+   lookup_columns = [lookup_column.upper() for (lookup_table, lookup_column) in compact_lookup_tables]
+   for column_definition in table_columns.split(','):
+      column_name = column_definition.split()[0]
+      if column_name.upper() not in lookup_columns:
+         select_columns.append(table_name + '.' + column_name)
+
+   SQLitedb.InsertSelect('create table ' + compact_table_name + ' as select ' + ', '.join(select_columns) + \
+                         ' from ' + table_name + ''.join(lookup_joins) + ' order by ' + table_name + '.rowid;')
+   SQLitedb.DropTable(table_name)
+   SQLitedb.InsertSelect('create view ' + table_name + ' as ' + get_compact_select() + ';')
+
+   SQLitedb.CreateIndex(compact_table_name + '_File_Event_Idx', compact_table_name, 'File_Name_Id, Event_Identifier')
+   SQLitedb.CreateIndex('Event_Log_Files_File_Idx', 'Event_Log_Files', 'upper(File_Name)')
+   # Give the pages of the dropped table back so the file shrinks, vacuum cannot run inside a transaction
+   SQLitedb.Commit()
+   SQLitedb.InsertSelect('vacuum;')
+
+def expand_event_logs(SQLitedb):
+   # Turns a compacted database back into the Event_Logs table so more logs can be added to it, the
+   # table is compacted again at the end of the run when --compact is given
+   SQLitedb.InsertSelect('drop view ' + table_name + ';')
+   SQLitedb.CreateTable(table_name, table_columns)
+   SQLitedb.InsertSelect('insert into ' + table_name + ' (' + sql_ins_columns + ') ' + get_compact_select() + \
+                         ' order by ' + compact_table_name + '.rowid;')
+   SQLitedb.DropTable(compact_table_name)
+   for (lookup_table, lookup_column) in compact_lookup_tables:
+      SQLitedb.DropTable(lookup_table)
+
+def export_shard(shard_info):
+   # Worker process entry point, parses one event log or one chunk range of it into its own shard database.
+   # The shard that starts at the first chunk also hashes the log for the manifest so the main process
+   # never reads the log itself.  The rows the shard could not insert are handed back so the main process
+   # can keep the log out of the manifest.
+   (file_to_parse, chunk_range, event_ids, event_data, shard_db_name) = shard_info
+   shard_db = SQLiteDb()
+   shard_db.RemoveDB_File(shard_db_name)
+   shard_db.Open(shard_db_name, bulk_load=True, reject_rows=True)
+   try:
+      parse_event_log(file_to_parse, shard_db, chunk_range, event_ids, event_data)
+   except Exception as err:
+      print (' Error parsing event log ==> ', file_to_parse, ' ', str(err))
+      shard_db.Close()
+      shard_db.RemoveDB_File(shard_db_name)
+      return (None, None, [])
+   shard_db.Close()
+   if chunk_range == None or chunk_range[0] == 0:
+      return (shard_db_name, get_file_hash(file_to_parse), shard_db.rejected_rows)
+   return (shard_db_name, None, shard_db.rejected_rows)
+
+def merge_shards(SQLitedb, shard_db_names):
+   # Copy the Event_Logs, and Event_Log_Data, table of every shard into the output database and remove the shard
+   for shard_db_name in shard_db_names:
+      if shard_db_name == None:
+         continue
+      SQLitedb.AttachDatabase(shard_db_name, 'shard')
+      for export_table_name in (table_name, event_data_table_name):
+         if SQLitedb.SelectOneRow("select name from shard.sqlite_master where type = 'table' and name = '" + \
+                                  export_table_name + "'") == None:
+            continue
+         if (SQLitedb.TableExists(export_table_name)):
+            SQLitedb.InsertSelect('insert into ' + export_table_name + ' select * from shard.' + export_table_name + ';')
+         else:
+            SQLitedb.InsertSelect('create table ' + export_table_name + ' as select * from shard.' + export_table_name + ';')
+      SQLitedb.DetachDatabase('shard')
+      SQLitedb.RemoveDB_File(shard_db_name)
+
+def get_shard_list(Full_File_Paths, SQLite_DB_Name, Number_Of_Workers, event_ids, event_data):
+   # One shard per log, a log big enough to keep several workers busy is split at its chunk
+   # boundaries into up to two ranges per worker so it is decoded in parallel
+   shard_list = []
+   for file_to_parse in Full_File_Paths:
+      number_of_chunks = Evtx_Chunks.get_number_of_chunks(file_to_parse)
+      chunks_per_range = max(Min_Chunks_Per_Range, -(-number_of_chunks // (Number_Of_Workers * 2)))
+      if Number_Of_Workers > 1 and number_of_chunks > chunks_per_range:
+         chunk_ranges = Evtx_Chunks.get_chunk_ranges(number_of_chunks, chunks_per_range)
+      else:
+         chunk_ranges = [None]
+      for chunk_range in chunk_ranges:
+         shard_list.append((file_to_parse, chunk_range, event_ids, event_data, SQLite_DB_Name + '.shard' + str(len(shard_list))))
+   return shard_list
+
+def get_shard_size(shard_info):
+   if shard_info[1] == None:
+      return os.path.getsize(shard_info[0])
+   return (shard_info[1][1] - shard_info[1][0]) * Evtx_Chunks.evtx_chunk_size
+
+def parse_event_logs_parallel(SQLitedb, shard_list, Number_Of_Workers, event_ids, event_data):
+   # Each shard is parsed in a worker process into its own database, the biggest shards are handed out
+   # first so one large log does not end up last.  The logs are merged in the order of the shard list,
+   # a log is merged as soon as all of its shards and every log before it are done, so Event_Logs has
+   # the same row order on every run.  The shards of a log are merged in chunk order.
+   work_list = sorted(shard_list, key=get_shard_size, reverse=True)
+   file_order = []
+   file_shards = {}
+   for shard_info in shard_list:
+      if shard_info[0] not in file_shards:
+         file_order.append(shard_info[0])
+      file_shards.setdefault(shard_info[0], []).append(shard_info)
+   shard_results = {}
+   next_file_number = 0
+
+   pool = multiprocessing.Pool(processes=Number_Of_Workers)
+   try:
+      for (shard_info, shard_result) in zip(work_list, pool.imap(export_shard, work_list, chunksize=1)):
+         shard_results[shard_info] = shard_result
+         while next_file_number < len(file_order) and \
+               all([file_shard in shard_results for file_shard in file_shards[file_order[next_file_number]]]):
+            file_to_parse = file_order[next_file_number]
+            next_file_number = next_file_number + 1
+            shard_db_names = [shard_results[file_shard][0] for file_shard in file_shards[file_to_parse]]
+            merge_shards(SQLitedb, shard_db_names)
+            for file_shard in file_shards[file_to_parse]:
+               SQLitedb.rejected_rows.extend(shard_results[file_shard][2])
+            if None not in shard_db_names:
+               record_completed_file(SQLitedb, file_to_parse, shard_results[file_shards[file_to_parse][0]][1], \
+                                     event_ids, event_data)
+   finally:
+      pool.close()
+      pool.join()
+
+
+if __name__ == '__main__':
+   multiprocessing.freeze_support()
+
+   parser = argparse.ArgumentParser(description='Export EVTX event logs to a SQLite database')
+   parser.add_argument('Directory_To_Parse', help='directory containing the event logs')
+   parser.add_argument('SQLite_DB_Name', help='SQLite database to write')
+   parser.add_argument('-w', '--workers', type=int, default=(os.cpu_count() or 1), \
+                       help='number of worker processes, 1 parses the logs one after another')
+   parser.add_argument('--event-ids', type=get_event_id_set, default=None, \
+                       help='comma delimited event ids, only these events are exported')
+   parser.add_argument('--log-names', type=get_log_name_set, default=None, \
+                       help='comma delimited event log file names, only these logs are exported')
+   parser.add_argument('--compact', action='store_true', \
+                       help='store repeated strings in lookup tables, Event_Logs becomes a view')
+   parser.add_argument('--event-data', action='store_true', \
+                       help='decode the EventData of every record into the Event_Log_Data table')
+   args = parser.parse_args()
+   Directory_To_Parse = args.Directory_To_Parse
+   SQLite_DB_Name = args.SQLite_DB_Name
+   print ('Dir is ', str(Directory_To_Parse))
+   print ('DB file is ', SQLite_DB_Name)
+   SQLitedb = SQLiteDb()
+   # WAL keeps the committed logs of an export that is killed part way through
+   # A row that cannot be inserted is rejected rather than stopping the export, its log is left out of the manifest
+   SQLitedb.Open(SQLite_DB_Name, bulk_load=True, journal_mode='WAL', reject_rows=True)
+
+   # Run the above function and store its results in a variable.   
+   Full_File_Paths = get_files_to_export(SQLitedb, get_filepaths(Directory_To_Parse, args.log_names), args.event_ids, \
+                                         args.event_data)
+
+   if (SQLitedb.TableExists(compact_table_name)):
+      if len(Full_File_Paths) == 0:
+         print (' All event logs are already exported ==> ', SQLite_DB_Name)
+         SQLitedb.Close()
+         sys.exit(0)
+      expand_event_logs(SQLitedb)
+   prepare_resume(SQLitedb, Full_File_Paths)
+
+   shard_list = get_shard_list(Full_File_Paths, SQLite_DB_Name, args.workers, args.event_ids, args.event_data)
+
+   if args.workers > 1 and len(shard_list) > 1:
+      parse_event_logs_parallel(SQLitedb, shard_list, min(args.workers, len(shard_list)), args.event_ids, \
+                                args.event_data)
+   else:
+      for files in Full_File_Paths:
+         parse_event_log(files, SQLitedb, None, args.event_ids, args.event_data)
+         record_completed_file(SQLitedb, files, get_file_hash(files), args.event_ids, args.event_data)
+   create_indexes_and_summary(SQLitedb, args.compact)
+   if args.compact:
+      compact_event_logs(SQLitedb)
+   SQLitedb.Close()  
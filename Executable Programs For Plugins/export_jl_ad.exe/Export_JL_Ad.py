@@ -1,12 +1,15 @@
 import os
 import sys
+import io
 import pyolecf
 import pylnk
 import codecs
 from Database import SQLiteDb
 import ntpath
 import argparse
+import multiprocessing
 from JL_App_Ids import JL_App_Ids
+from JL_DestList import Parse_DestList
 
 table_name = 'Automatic_Destinations_JL'
 table_columns = 'File_Name Text, File_Description Text, Item_Name text, command_line_arguments  Text, drive_type Number, drive_serial_number number, ' + \
@@ -22,6 +25,21 @@ sql_ins_columns = 'File_Name, File_Description, Item_Name, command_line_argument
 
 sql_bind = '?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?'
 
+destlist_table_name = 'Automatic_Destinations_DestList'
+destlist_table_columns = 'File_Name Text, File_Description Text, Item_Name Text, Entry_Number Number, Hostname Text, ' + \
+                         'Last_Modification_Time Text, Pin_Status Number, Access_Count Number, Path Text, ' + \
+                         'Droid_Volume_Identifier Text, Droid_File_Identifier Text, Birth_Droid_Volume_Identifier Text, ' + \
+                         'Birth_Droid_File_Identifier Text'
+
+destlist_sql_ins_columns = 'File_Name, File_Description, Item_Name, Entry_Number, Hostname, Last_Modification_Time, ' + \
+                           'Pin_Status, Access_Count, Path, Droid_Volume_Identifier, Droid_File_Identifier, ' + \
+                           'Birth_Droid_Volume_Identifier, Birth_Droid_File_Identifier'
+
+destlist_sql_bind = '?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?'
+
+# Number of jump lists handed to a worker process at a time, jump lists are small
+Files_Per_Worker_Task = 16
+
 #def uprint(*objects, sep=' ', end='\n', file=sys.stdout):
 #    enc = file.encoding
 #    if enc == 'UTF-8':
@@ -115,74 +133,128 @@ def Create_Bind_Values(SQL_Bind_Values, new_link_item):
     return SQL_Bind_Values
 
 
+def Set_Worker_App_Ids(App_Ids):
+    # Worker process initializer, the AppIDs loaded by the main process are used for the lookups
+    global App_Id
+    App_Id = App_Ids
+
 def parse_Compound_File(file_to_parse):
+    # Reads a jump list once and parses its LNK streams and its DestList stream in the same pass.
+    # Returns (is compound file, link records, DestList records, error), error is None when the
+    # whole file was parsed.
 
+    jl_records = []
+    destlist_records = []
+    try:
+        with open(file_to_parse, "rb") as jl_file:
+            file_object = io.BytesIO(jl_file.read())
+        if not pyolecf.check_file_signature_file_object(file_object):
+            return (False, jl_records, destlist_records, None)
+        olecf_file = pyolecf.file()
+        olecf_file.open_file_object(file_object)
 
-    file_object = open(file_to_parse, "rb")
-    olecf_file = pyolecf.file()
-    olecf_file.open_file_object(file_object)
-    SQLitedb.CreateTempTable(table_name + '_temp', table_columns)
+        root_item = olecf_file.get_root_item()
 
-    root_item = olecf_file.get_root_item()
+        #print ("Root Item Name ==> " + root_item.get_name())
+        #print ("Number of Sub_Items ==> " + str(root_item.get_number_of_sub_items()))
+        Base_Name = ntpath.basename(file_to_parse)
+        (File_Name, Extension) = ntpath.splitext(Base_Name)
 
-    #print ("Root Item Name ==> " + root_item.get_name())
-    #print ("Number of Sub_Items ==> " + str(root_item.get_number_of_sub_items()))
-    Base_Name = ntpath.basename(file_to_parse)
-    (File_Name, Extension) = ntpath.splitext(Base_Name)
+        App_Id_Desc = App_Id.LookupAppId(File_Name)
+        if (App_Id_Desc == None):
+            App_Id_Desc = File_Name
+            #print ("File Name => " + File_Name)
 
-    if (App_Id.CheckAppId(File_Name)):
-        App_Id_Desc = App_Id.SelectAppId(File_Name)[0]
-        #print ("App id => " + App_Id.SelectAppId(File_Name)[0])
-    else:
-        App_Id_Desc = File_Name
-        #print ("File Name => " + File_Name)
-
-    for i in range (0, root_item.get_number_of_sub_items()):
-        jl_record = []
-        jl_record.append(File_Name)
-        jl_record.append(App_Id_Desc)
-        new_item = root_item.get_sub_item(i)
-        jl_record.append(new_item.get_name())
-        #print ("   Sub Item Name ==> " + new_item.get_name())
-        #print ("   Sub Item Sub Items ==> " + str(new_item.get_number_of_sub_items()))
-        if new_item.get_name() == u'DestList':
-            continue
-        new_link_item = pylnk.file()
-        new_link_item.open_file_object(new_item)
-        jl_record = Create_Bind_Values(jl_record, new_link_item)
+        for i in range (0, root_item.get_number_of_sub_items()):
+            jl_record = []
+            jl_record.append(File_Name)
+            jl_record.append(App_Id_Desc)
+            new_item = root_item.get_sub_item(i)
+            jl_record.append(new_item.get_name())
+            #print ("   Sub Item Name ==> " + new_item.get_name())
+            #print ("   Sub Item Sub Items ==> " + str(new_item.get_number_of_sub_items()))
+            if new_item.get_name() == u'DestList':
+                for destlist_entry in Parse_DestList(new_item.read_buffer(new_item.get_size())):
+                    destlist_records.append([File_Name, App_Id_Desc] + list(destlist_entry))
+                continue
+            new_link_item = pylnk.file()
+            new_link_item.open_file_object(new_item)
+            jl_records.append(Create_Bind_Values(jl_record, new_link_item))
+        olecf_file.close()
+    except Exception as err:
+        return (True, jl_records, destlist_records, str(err))
+    return (True, jl_records, destlist_records, None)
+
+def Insert_Jump_List(file_to_parse, parse_results):
+    (Is_Compound_File, jl_records, destlist_records, parse_error) = parse_results
+    print("File to Process is ==> " + file_to_parse)
+    if Is_Compound_File:
+        print ("Processing File......")
+    for jl_record in jl_records:
+        SQLitedb.InsertBindValues(table_name + '_temp', sql_ins_columns, sql_bind, jl_record)
+    for destlist_record in destlist_records:
+        SQLitedb.InsertBindValues(destlist_table_name + '_temp', destlist_sql_ins_columns, destlist_sql_bind, destlist_record)
+    if parse_error != None:
+        print ("Not a valid compound file ==> " + file_to_parse + " " + parse_error)
+
+def Export_Jump_Lists(Full_File_Paths, Number_Of_Workers):
+    # The jump lists are parsed by a pool of worker processes, the records are inserted by this process
+    # in the order of the files
+    if Number_Of_Workers > 1 and len(Full_File_Paths) > 1:
+        pool = multiprocessing.Pool(processes=Number_Of_Workers, initializer=Set_Worker_App_Ids, initargs=(App_Id,))
         try:
-            SQLitedb.InsertBindValues(table_name + '_temp', sql_ins_columns, sql_bind, jl_record)
-        except:
-            print ("Error in Link Item ==> " + str(jl_record[1]) + " <==> " + str(jl_record[2]))
+            for (files, parse_results) in zip(Full_File_Paths, pool.imap(parse_Compound_File, Full_File_Paths, \
+                                                                         chunksize=Files_Per_Worker_Task)):
+                Insert_Jump_List(files, parse_results)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for files in Full_File_Paths:
+            Insert_Jump_List(files, parse_Compound_File(files))
+
+def Create_Permanent_Table(table_name):
     if (SQLitedb.TableExists(table_name)):
         SQLitedb.AppendTempToPermanentTable(table_name)
     else:
         SQLitedb.CreatePermanentTable(table_name)
     SQLitedb.DropTable(table_name + '_temp')
 
-args = sys.argv[1:]
-Directory_To_Parse = args[0]
-SQLite_DB_Name = args[1]
-App_id_db = args[2]
-print ('Dir is ', str(Directory_To_Parse))
-print ('DB file is ', SQLite_DB_Name)
-App_Id = JL_App_Ids()
-App_Id.Open(App_id_db)
-#Directory_To_Parse = input('List the directory you want to parse:')   
-#File_To_Parse = input("What File do you want to parse: ")
-#SQLite_DB_Name = input("What is the Name of the SQLite DB to create: ")
-SQLitedb = SQLiteDb()
-SQLitedb.Open(SQLite_DB_Name)
-# Run the above function and store its results in a variable.   
-Full_File_Paths = get_filepaths(Directory_To_Parse)
-#Full_File_Paths = get_filepaths(str(sys.argv[0]))
-#print (Full_File_Paths)
-for files in Full_File_Paths:
-    print("File to Process is ==> " + files)
-    try:
-        if pyolecf.check_file_signature(files):
-            print ("Processing File......")
-            parse_Compound_File(files)
-    except:
-        print ("Not a valid compound file ==> " + files)
-SQLitedb.Close()  
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description='Export automatic destinations jump lists to a SQLite database')
+    parser.add_argument('Directory_To_Parse', help='directory containing the jump lists')
+    parser.add_argument('SQLite_DB_Name', help='SQLite database to write')
+    parser.add_argument('App_id_db', help='Jump_List_App_Ids.db3 database of AppIDs')
+    parser.add_argument('-w', '--workers', type=int, default=(os.cpu_count() or 1), \
+                        help='number of worker processes, 1 parses the jump lists one after another')
+    args = parser.parse_args()
+    Directory_To_Parse = args.Directory_To_Parse
+    SQLite_DB_Name = args.SQLite_DB_Name
+    App_id_db = args.App_id_db
+    print ('Dir is ', str(Directory_To_Parse))
+    print ('DB file is ', SQLite_DB_Name)
+    App_Id = JL_App_Ids()
+    App_Id.Open(App_id_db)
+    # The AppIDs are looked up in memory, the catalog is read once
+    App_Id.LoadAppIds()
+    App_Id.Close()
+    #Directory_To_Parse = input('List the directory you want to parse:')   
+    #File_To_Parse = input("What File do you want to parse: ")
+    #SQLite_DB_Name = input("What is the Name of the SQLite DB to create: ")
+    SQLitedb = SQLiteDb()
+    SQLitedb.Open(SQLite_DB_Name, bulk_load=True, reject_rows=True)
+    SQLitedb.CreateTempTable(table_name + '_temp', table_columns)
+    SQLitedb.CreateTempTable(destlist_table_name + '_temp', destlist_table_columns)
+    # Run the above function and store its results in a variable.   
+    Full_File_Paths = get_filepaths(Directory_To_Parse)
+    #Full_File_Paths = get_filepaths(str(sys.argv[0]))
+    #print (Full_File_Paths)
+    Export_Jump_Lists(Full_File_Paths, args.workers)
+    SQLitedb.FlushBindValues()
+    for (jl_record, insert_error) in SQLitedb.rejected_rows:
+        print ("Error in Link Item ==> " + str(jl_record[1]) + " <==> " + str(jl_record[2]))
+    Create_Permanent_Table(table_name)
+    Create_Permanent_Table(destlist_table_name)
+    SQLitedb.Close()  
@@ -1,6 +1,8 @@
 import sqlite3
 import os
 import sys
+import random
+import timeit
 
 class JL_App_Ids(object):
   #Class that defines a sqlite3 database file.
@@ -12,6 +14,7 @@ class JL_App_Ids(object):
     self._cursor = None
     self.filename = 'Jump_List_App_Ids.db3'
     self.read_only = None
+    self._app_ids = None
 	
   def Close(self):
     #Closes the database file.
@@ -77,6 +80,33 @@ class JL_App_Ids(object):
     self._cursor.execute(sql_query)
     return self._cursor.fetchone()
 
+  def LoadAppIds (self):
+    # Loads the application ids into a dictionary keyed by the upper case AppID so
+    # LookupAppId does not have to query the database.  When an AppID is in the
+    # table more than once the first description is kept, the same one SelectAppId
+    # returns.
+
+    #Raises:
+    #  RuntimeError: if the database is not opened.
+
+    self._app_ids = {}
+    for (App_Id, App_Desc, Date_Added, Source) in self.SelectAllAppIds():
+      if App_Id != None:
+        self._app_ids.setdefault(App_Id.upper(), App_Desc)
+    return len(self._app_ids)
+
+  def LookupAppId (self, App_Id):
+    # Returns the description of an AppID or None if the AppID is not known
+
+    #Raises:
+    #  RuntimeError: if the application ids have not been loaded.
+
+    if self._app_ids is None:
+      raise RuntimeError(
+          u'Cannot lookup application id application ids not loaded.')
+
+    return self._app_ids.get(App_Id.upper())
+
   def SelectAllAppIds (self):
     # Checks if the table exists in the database
 
@@ -126,4 +156,44 @@ class JL_App_Ids(object):
     if not self._cursor:
       return False
 
-    return True
\ No newline at end of file
+    return True
+
+
+def Benchmark_AppId_Lookups(App_Id_Db, Number_Of_Files=5000, Number_Of_Users=20):
+  # Times resolving the AppIDs of a profile set with Number_Of_Files jump lists, most
+  # of them known AppIDs repeated across users, with the queries and with the dictionary
+  App_Ids = JL_App_Ids()
+  App_Ids.Open(App_Id_Db)
+  App_Ids.LoadAppIds()
+  Random_Values = random.Random(1)
+  Known_App_Ids = [App_Id_Row[0] for App_Id_Row in App_Ids.SelectAllAppIds()]
+  File_Names = []
+  for File_Number in range(0, Number_Of_Files):
+    if File_Number % 4 == 0:
+      File_Names.append('%016x' % Random_Values.getrandbits(64))
+    else:
+      File_Names.append(Random_Values.choice(Known_App_Ids[:max(1, len(Known_App_Ids) // Number_Of_Users)]))
+
+  def Query_Lookups():
+    for File_Name in File_Names:
+      if (App_Ids.CheckAppId(File_Name)):
+        App_Ids.SelectAppId(File_Name)[0]
+
+  def Dictionary_Lookups():
+    for File_Name in File_Names:
+      App_Ids.LookupAppId(File_Name)
+
+  Query_Time = timeit.timeit(Query_Lookups, number=1)
+  Dictionary_Time = timeit.timeit(Dictionary_Lookups, number=1)
+  Load_Time = timeit.timeit(lambda: App_Ids.LoadAppIds(), number=1)
+  App_Ids.Close()
+  return (Query_Time, Load_Time, Dictionary_Time)
+
+if __name__ == '__main__':
+  # python3 JL_App_Ids.py Jump_List_App_Ids.db3 5000
+  args = sys.argv[1:]
+  App_Id_Db = args[0] if len(args) > 0 else 'Jump_List_App_Ids.db3'
+  Number_Of_Files = int(args[1]) if len(args) > 1 else 5000
+  (Query_Time, Load_Time, Dictionary_Time) = Benchmark_AppId_Lookups(App_Id_Db, Number_Of_Files)
+  print ("Jump list files ==> %d" % Number_Of_Files)
+  print ("Query lookups ==> %8.4fs  Load dictionary ==> %8.4fs  Dictionary lookups ==> %8.4fs" % (Query_Time, Load_Time, Dictionary_Time))
@@ -0,0 +1,69 @@
+#Functions to parse the DestList stream of an automatic destinations jump list.
+#
+# The DestList stream is a 32 byte header followed by one entry per LNK stream in the
+# jump list.  The LNK stream of an entry is named after the entry number in hex.  Windows 7
+# and 8 write version 1 entries, Windows 10 writes version 3 or 4 entries that have an access
+# count and 4 bytes after the path.
+
+import datetime
+import struct
+import uuid
+
+destlist_header = struct.Struct('<IIIfIIII')
+destlist_entry = struct.Struct('<Q16s16s16s16s16sIIQi')
+destlist_entry_v1_path = struct.Struct('<H')
+destlist_entry_v3_path = struct.Struct('<iI8sH')
+
+def filetime_to_text(filetime):
+    # Returns a FILETIME as text in the same form as the LNK times, empty when the time is not set
+    if filetime == 0:
+       return ''
+    try:
+       return str(datetime.datetime(1601, 1, 1) + datetime.timedelta(microseconds=filetime // 10))
+    except OverflowError:
+       return ''
+
+def droid_to_text(droid):
+    return str(uuid.UUID(bytes_le=droid))
+
+def Parse_DestList(destlist_data):
+    # Returns a list of (item name, entry number, hostname, last modification time, pin status,
+    # access count, path, droid volume, droid file, birth droid volume, birth droid file) for the
+    # entries of a DestList stream.  Parsing stops at the first entry that does not fit in the data.
+
+    destlist_entries = []
+    if len(destlist_data) < destlist_header.size:
+       return destlist_entries
+    (version, number_of_entries, number_of_pinned, unknown_1, last_entry_number, unknown_2, \
+     last_revision_number, unknown_3) = destlist_header.unpack_from(destlist_data, 0)
+    offset = destlist_header.size
+    for entry_index in range(0, number_of_entries):
+        if offset + destlist_entry.size > len(destlist_data):
+           break
+        (checksum, droid_volume, droid_file, birth_droid_volume, birth_droid_file, hostname, entry_number, \
+         unknown_4, last_modification_time, pin_status) = destlist_entry.unpack_from(destlist_data, offset)
+        offset = offset + destlist_entry.size
+        if version == 1:
+           if offset + destlist_entry_v1_path.size > len(destlist_data):
+              break
+           access_count = None
+           (path_size,) = destlist_entry_v1_path.unpack_from(destlist_data, offset)
+           offset = offset + destlist_entry_v1_path.size
+           path_end = offset + (path_size * 2)
+        else:
+           if offset + destlist_entry_v3_path.size > len(destlist_data):
+              break
+           (unknown_5, access_count, unknown_6, path_size) = destlist_entry_v3_path.unpack_from(destlist_data, offset)
+           offset = offset + destlist_entry_v3_path.size
+           path_end = offset + (path_size * 2)
+        if path_end > len(destlist_data):
+           break
+        path = destlist_data[offset:path_end].decode('utf-16-le', 'ignore')
+        offset = path_end
+        if version != 1:
+           offset = offset + 4
+        destlist_entries.append(('%x' % entry_number, entry_number, hostname.split(b'\0', 1)[0].decode('ascii', 'ignore'), \
+                                 filetime_to_text(last_modification_time), pin_status, access_count, path, \
+                                 droid_to_text(droid_volume), droid_to_text(droid_file), \
+                                 droid_to_text(birth_droid_volume), droid_to_text(birth_droid_file)))
+    return destlist_entries
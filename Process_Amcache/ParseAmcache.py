@@ -36,6 +36,7 @@
 #   Version 1.1 - Added custom artifacts and attributes - Aug 31, 2016
 #   version 1.2 - Added Linux Support
 #   Version 1.3 - fix options panel - March 2018
+#   Version 1.4 - Keep the parsed hive in the case hive cache shared by the registry parsers
 # 
 
 import jarray
@@ -220,7 +221,8 @@ class ParseAmcacheIngestModule(DataSourceIngestModule):
         # Example has only a Windows EXE, so bail if we aren't on Windows
         # Run the EXE, saving output to a sqlite database
         self.log(Level.INFO, "Running program on data source parm 1 ==> " + Temp_Dir + "\Amcache\Amcache.hve  Parm 2 ==> " + Temp_Dir + "\Amcache.db3")
-        subprocess.Popen([self.path_to_exe, os.path.join(temp_dir, "Amcache.hve"), os.path.join(temp_dir, "Amcache.db3")]).communicate()[0]   
+        subprocess.Popen([self.path_to_exe, os.path.join(temp_dir, "Amcache.hve"), os.path.join(temp_dir, "Amcache.db3"), \
+                          "--cache-dir", os.path.join(Temp_Dir, "Hive_Cache")]).communicate()[0]   
                
         for file in files:	
            # Open the DB using JDBC
@@ -40,11 +40,20 @@
 #   Version 1.5 - FIx option Panel
 #   Version 1.6 - Added split by comma delimeter for "Other" EventLogs
 #   Version 1.7 - Fix hanging Autopsy and NPE, cleanup code and use newer Autopsy methods
+#   Version 1.8 - Read long tail counts from the Event_Log_Summary table built by Export_EVTX
+#   Version 1.9 - Pass the selected event logs to Export_EVTX so only those logs are exported
+#   Version 2.0 - Stream the event log rows and post the artifacts in batches to keep memory flat
+#   Version 2.1 - Add pipeline option to overlap copying, parsing and posting of each event log
+#   Version 2.2 - Stop passing --log-names to Export_EVTX, only the selected logs are copied to the temp directory
+#   Version 2.3 - Pipeline option copies, exports and posts the event logs in batches instead of one log at a time
+#   Version 2.4 - Pipeline option reports the event logs that could not be copied and ends with an error
 
 import jarray
 import inspect
 import os
 import subprocess
+import threading
+import Queue
 
 from javax.swing import JCheckBox
 from javax.swing import JList
@@ -133,9 +142,152 @@ class ParseEvtxDbIngestModule(DataSourceIngestModule):
 
     _logger = Logger.getLogger(ParseEvtxDbIngestModuleFactory.moduleName)
 
+    # Rows read from the database per round trip and artifacts posted to the blackboard per call,
+    # only this many artifacts are held in memory no matter how big the event log is
+    fetch_size = 1000
+    artifact_batch_size = 1000
+
+    # Event logs copied and exported together by the pipeline option, one exporter run per batch
+    pipeline_batch_size = 8
+
     def log(self, level, msg):
         self._logger.logp(level, self.__class__.__name__, inspect.stack()[1][3], msg)
 
+    def postArtifactBatch(self, blkBrd, art_list):
+        # Post the artifacts to blackboard
+        if len(art_list) < 1:
+            return
+        try:
+            blkBrd.postArtifacts(art_list, ParseEvtxDbIngestModuleFactory.moduleName)
+        except Blackboard.BlackboardException as e:
+            self.log(Level.SEVERE, "Error indexing artifacts (" + e.getMessage() + ")")
+
+    def exportEventLogs(self, log_dir, db_path):
+        # Run the EXE, saving output to a sqlite database
+        # Only the selected event logs are copied to log_dir so everything in it is exported,
+        # the "Other" names are LIKE patterns and cannot be passed on as --log-names
+        pgm_args = [self.path_to_exe, log_dir, db_path]
+        subprocess.Popen(pgm_args).communicate()[0]
+
+    def processPipeline(self, files, temp_dir, postEventLog, progressBar):
+        # The event logs are exported in batches, each batch gets its own directory and database and
+        # one exporter run so its worker pool sees every log of the batch.  A copy thread writes batch
+        # N+1 to the temp directory while batch N is exported here and a post thread creates the
+        # artifacts of batch N-1.  The queues only hold one batch each so a fast stage waits for the
+        # slower ones.
+        copied_queue = Queue.Queue(1)
+        exported_queue = Queue.Queue(1)
+        post_errors = []
+        copy_errors = []
+
+        def copyEventLogs():
+            batch_files = []
+            handled_files = []
+            try:
+                batch_number = 0
+                log_dir = None
+                for file in files:
+                    if self.context.isJobCancelled():
+                        break
+                    # Logs from different folders can share a name, they go in separate batches
+                    # so the copies do not overwrite each other
+                    batch_names = [batch_file.getName().upper() for batch_file in batch_files]
+                    if len(batch_files) >= self.pipeline_batch_size or file.getName().upper() in batch_names:
+                        copied_queue.put((batch_files, log_dir))
+                        batch_files = []
+                        batch_number += 1
+                    if len(batch_files) == 0:
+                        log_dir = os.path.join(temp_dir, str(batch_number))
+                        try:
+                            os.mkdir(log_dir)
+                        except:
+                            self.log(Level.INFO, "Event Log Directory already exists " + log_dir)
+                    handled_files.append(file)
+                    try:
+                        ContentUtils.writeToFile(file, File(os.path.join(log_dir, file.getName())))
+                    except Exception as e:
+                        self.log(Level.SEVERE, "Error copying event log " + file.getName() + " (" + str(e) + ")")
+                        copy_errors.append(file.getName())
+                        continue
+                    batch_files.append(file)
+                if len(batch_files) > 0:
+                    copied_queue.put((batch_files, log_dir))
+            except Exception as e:
+                self.log(Level.SEVERE, "Error copying event logs (" + str(e) + ")")
+                # The logs already copied are still exported, the ones after the error are never copied
+                if len(batch_files) > 0:
+                    copied_queue.put((batch_files, log_dir))
+                for file in files:
+                    if file not in handled_files:
+                        copy_errors.append(file.getName())
+            finally:
+                copied_queue.put(None)
+
+        def postEventLogs():
+            while True:
+                exported_batch = exported_queue.get()
+                if exported_batch == None:
+                    break
+                (batch_files, db_path) = exported_batch
+                if self.context.isJobCancelled():
+                    continue
+                try:
+                    dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % db_path)
+                except SQLException as e:
+                    self.log(Level.INFO, "Could not open database file (not SQLite) " + db_path + " (" + e.getMessage() + ")")
+                    for file in batch_files:
+                        post_errors.append(file.getName())
+                    continue
+                for file in batch_files:
+                    if self.context.isJobCancelled():
+                        break
+                    try:
+                        if not postEventLog(dbConn, file):
+                            post_errors.append(file.getName())
+                    except Exception as e:
+                        self.log(Level.SEVERE, "Error posting event log " + file.getName() + " (" + str(e) + ")")
+                        post_errors.append(file.getName())
+                dbConn.close()
+
+        copy_thread = threading.Thread(target=copyEventLogs, name="ParseEvtx-Copy")
+        post_thread = threading.Thread(target=postEventLogs, name="ParseEvtx-Post")
+        copy_thread.setDaemon(True)
+        post_thread.setDaemon(True)
+        copy_thread.start()
+        post_thread.start()
+
+        fileCount = 0
+        while True:
+            copied_batch = copied_queue.get()
+            if copied_batch == None:
+                break
+            (batch_files, log_dir) = copied_batch
+            if self.context.isJobCancelled():
+                continue
+            db_path = log_dir + ".db3"
+            self.exportEventLogs(log_dir, db_path)
+            exported_queue.put((batch_files, db_path))
+            fileCount += len(batch_files)
+            progressBar.progress(fileCount)
+
+        exported_queue.put(None)
+        copy_thread.join()
+        post_thread.join()
+
+        if len(copy_errors) > 0:
+            self.log(Level.SEVERE, "Event logs that could not be copied ==> " + str(copy_errors))
+        if len(post_errors) > 0:
+            self.log(Level.SEVERE, "Event logs that could not be posted ==> " + str(post_errors))
+        if len(copy_errors) > 0 or len(post_errors) > 0:
+            return IngestModule.ProcessResult.ERROR
+
+        # After all databases, post a message to the ingest messages in box.
+        message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
+            "ParseEvtx", " Event Logs have been parsed " )
+        IngestServices.getInstance().postMessage(message)
+
+        return IngestModule.ProcessResult.OK
+
     def __init__(self, settings):
         self.context = None
         self.local_settings = settings
@@ -224,74 +376,9 @@ class ParseEvtxDbIngestModule(DataSourceIngestModule):
                 artID_evtx_Long_evt = skCase.getArtifactType("TSK_EVTX_LOGS_LONG")
             except Exception as err:		
                 self.log(Level.INFO, "Artifact/Attributes Creation `Error ==> " + str(type(err).__name__))             
-            # we don't know how much work there is yet
-            progressBar.switchToIndeterminate()
-            
-            # Find the Windows Event Log Files
-            files = []		
-            fileManager = Case.getCurrentCase().getServices().getFileManager()
-            if self.List_Of_Events[0] == 'ALL':
-               files = fileManager.findFiles(dataSource, "%.evtx")
-            else:
-               for eventlog in self.List_Of_Events:
-                   file_name = fileManager.findFiles(dataSource, eventlog)
-                   files.extend(file_name)
-   
-            numFiles = len(files)
-            
-            # If no files to process then we can exit the program.
-            if numFiles < 1:
-                return IngestModule.ProcessResult.OK
-
-            #self.log(Level.INFO, "found " + str(numFiles) + " files")
-            progressBar.switchToDeterminate(numFiles)
-            fileCount = 0;
-            
-            # Create Event Log directory in temp directory, if it exists then continue on processing		
-            Temp_Dir = Case.getCurrentCase().getTempDirectory()
-            self.log(Level.INFO, "create Directory " + Temp_Dir)
-            temp_dir = os.path.join(Temp_Dir, "EventLogs")
-            try:
-                os.mkdir(temp_dir)
-            except:
-                self.log(Level.INFO, "Event Log Directory already exists " + temp_dir)
-                
-            # Write out each Event Log file to the temp directory
-            for file in files:
-                
-                # Check if the user pressed cancel while we were busy
-                if self.context.isJobCancelled():
-                    return IngestModule.ProcessResult.OK
-
-                #self.log(Level.INFO, "Processing file: " + file.getName())
-                fileCount += 1
-
-                # Save the DB locally in the temp folder. 
-                lclDbPath = os.path.join(temp_dir, file.getName())
-                ContentUtils.writeToFile(file, File(lclDbPath))
-                            
-            # Run the EXE, saving output to a sqlite database
-            #self.log(Level.INFO, "Running program on data source " + self.path_to_exe + " parm 1 ==> " + temp_dir + "  Parm 2 ==> " + os.path.join(temp_dir, "EventLogs.db3"))
-            subprocess.Popen([self.path_to_exe, temp_dir, os.path.join(Temp_Dir, "EventLogs.db3")]).communicate()[0]   
-                
-            # Set the database to read to the one created by the Event_EVTX program
-            lclDbPath = os.path.join(Case.getCurrentCase().getTempDirectory(), "EventLogs.db3")
-            #self.log(Level.INFO, "Path to the Eventlogs database file created ==> " + lclDbPath)
-                            
-            # Open the DB using JDBC
-            try: 
-                Class.forName("org.sqlite.JDBC").newInstance()
-                dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
-            except SQLException as e:
-                self.log(Level.INFO, "Could not open database file (not SQLite) " + file.getName() + " (" + e.getMessage() + ")")
-                
-                return IngestModule.ProcessResult.Error
-                
-                   #self.log(Level.INFO, "found " + str(file_name) + " files")
-            #self.log(Level.INFO, "found " + str(files) + " files")
-                
-            
-            for file in files:
+            # Query the rows exported for one event log and post its artifacts, returns False if the
+            # database could not be queried
+            def postEventLog(dbConn, file):
                 file_name = file.getName()
                 #self.log(Level.INFO, "File To process in SQL " + file_name + "  <<=====")
                 # Query the contacts table in the database and get all columns. 
@@ -302,10 +389,11 @@ class ParseEvtxDbIngestModule(DataSourceIngestModule):
                                     " Event_source_Name, Event_User_Security_Identifier, Event_Time, " + \
                                     " Event_Time_Epoch, Event_Detail_Text FROM Event_Logs where upper(File_Name) = upper('" + file_name + "')"
                     #self.log(Level.INFO, "SQL Statement " + SQL_Statement + "  <<=====")
+                    stmt.setFetchSize(self.fetch_size)
                     resultSet = stmt.executeQuery(SQL_Statement)
                 except SQLException as e:
                     self.log(Level.SEVERE, "Error querying database for EventLogs table (" + e.getMessage() + ")")
-                    return IngestModule.ProcessResult.Error
+                    return False
 
                 # Cycle through each row and create artifacts
                 art_list = []
@@ -341,24 +429,26 @@ class ParseEvtxDbIngestModule(DataSourceIngestModule):
                                           ParseEvtxDbIngestModuleFactory.moduleName, Event_Detail_Text))
                     art.addAttributes(attribute_List)
                     art_list.append(art)
+
+                    if len(art_list) >= self.artifact_batch_size:
+                        self.postArtifactBatch(blkBrd, art_list)
+                        art_list = []
                     
-                # Post the artifacts to blackboard                
-                try:
-                    blkBrd.postArtifacts(art_list, ParseEvtxDbIngestModuleFactory.moduleName)
-                except Blackboard.BlackboardException as e:
-                    self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
+                self.postArtifactBatch(blkBrd, art_list)
+                resultSet.close()
+                stmt.close()
 
                 art_list = []
                 try:
                     stmt_1 = dbConn.createStatement()
-                    SQL_Statement_1 = "select event_identifier, file_name, count(*) 'Number_Of_Events'  " + \
-                                    " FROM Event_Logs where upper(File_Name) = upper('" + file_name + "')" + \
-                                    " group by event_identifier, file_name order by 3;"
+                    SQL_Statement_1 = "select event_identifier, file_name, Number_Of_Events " + \
+                                    " FROM Event_Log_Summary where upper(File_Name) = upper('" + file_name + "')" + \
+                                    " order by 3;"
                     #self.log(Level.INFO, "SQL Statement " + SQL_Statement_1 + "  <<=====")
                     resultSet_1 = stmt_1.executeQuery(SQL_Statement_1)
                 except SQLException as e:
                     self.log(Level.SEVERE, "Error querying database for EventLogs table (" + e.getMessage() + ")")
-                    return IngestModule.ProcessResult.ERROR
+                    return False
 
                 # Cycle through each row and create artifacts
                 while resultSet_1.next():
@@ -379,12 +469,94 @@ class ParseEvtxDbIngestModule(DataSourceIngestModule):
                     
                     art_1.addAttributes(attribute_List)
                     
-                    art_list.append(art)
+                    art_list.append(art_1)
+
+                    if len(art_list) >= self.artifact_batch_size:
+                        self.postArtifactBatch(blkBrd, art_list)
+                        art_list = []
                     
-                try:
-                    blkBrd.postArtifacts(art_list, ParseEvtxDbIngestModuleFactory.moduleName)
-                except Blackboard.BlackboardException as e:
-                    self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
+                self.postArtifactBatch(blkBrd, art_list)
+                resultSet_1.close()
+                stmt_1.close()
+
+                return True
+
+            # we don't know how much work there is yet
+            progressBar.switchToIndeterminate()
+            
+            # Find the Windows Event Log Files
+            files = []		
+            fileManager = Case.getCurrentCase().getServices().getFileManager()
+            if self.List_Of_Events[0] == 'ALL':
+               files = fileManager.findFiles(dataSource, "%.evtx")
+            else:
+               for eventlog in self.List_Of_Events:
+                   file_name = fileManager.findFiles(dataSource, eventlog)
+                   files.extend(file_name)
+   
+            numFiles = len(files)
+            
+            # If no files to process then we can exit the program.
+            if numFiles < 1:
+                return IngestModule.ProcessResult.OK
+
+            #self.log(Level.INFO, "found " + str(numFiles) + " files")
+            progressBar.switchToDeterminate(numFiles)
+            fileCount = 0;
+            
+            # Create Event Log directory in temp directory, if it exists then continue on processing		
+            Temp_Dir = Case.getCurrentCase().getTempDirectory()
+            self.log(Level.INFO, "create Directory " + Temp_Dir)
+            temp_dir = os.path.join(Temp_Dir, "EventLogs")
+            try:
+                os.mkdir(temp_dir)
+            except:
+                self.log(Level.INFO, "Event Log Directory already exists " + temp_dir)
+
+            # Copy, parse and post one event log at a time with the stages overlapped
+            if self.local_settings.getSetting('Pipeline') == 'true':
+                Class.forName("org.sqlite.JDBC").newInstance()
+                return self.processPipeline(files, temp_dir, postEventLog, progressBar)
+                
+            # Write out each Event Log file to the temp directory
+            for file in files:
+                
+                # Check if the user pressed cancel while we were busy
+                if self.context.isJobCancelled():
+                    return IngestModule.ProcessResult.OK
+
+                #self.log(Level.INFO, "Processing file: " + file.getName())
+                fileCount += 1
+
+                # Save the DB locally in the temp folder. 
+                lclDbPath = os.path.join(temp_dir, file.getName())
+                ContentUtils.writeToFile(file, File(lclDbPath))
+                            
+            # Run the EXE, saving output to a sqlite database
+            #self.log(Level.INFO, "Running program on data source " + self.path_to_exe + " parm 1 ==> " + temp_dir + "  Parm 2 ==> " + os.path.join(temp_dir, "EventLogs.db3"))
+            self.exportEventLogs(temp_dir, os.path.join(Temp_Dir, "EventLogs.db3"))
+                
+            # Set the database to read to the one created by the Event_EVTX program
+            lclDbPath = os.path.join(Case.getCurrentCase().getTempDirectory(), "EventLogs.db3")
+            #self.log(Level.INFO, "Path to the Eventlogs database file created ==> " + lclDbPath)
+                            
+            # Open the DB using JDBC
+            try: 
+                Class.forName("org.sqlite.JDBC").newInstance()
+                dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
+            except SQLException as e:
+                self.log(Level.INFO, "Could not open database file (not SQLite) " + file.getName() + " (" + e.getMessage() + ")")
+                
+                return IngestModule.ProcessResult.Error
+                
+                   #self.log(Level.INFO, "found " + str(file_name) + " files")
+            #self.log(Level.INFO, "found " + str(files) + " files")
+                
+            
+            for file in files:
+                if not postEventLog(dbConn, file):
+                    return IngestModule.ProcessResult.ERROR
+            dbConn.close()
 
             # After all databases, post a message to the ingest messages in box.
             message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
@@ -425,6 +597,10 @@ class Process_EVTX1WithUISettingsPanel(IngestModuleIngestJobSettingsPanel):
             self.local_settings.setSetting('EventLogs', self.area.getText())
         else:
             self.local_settings.setSetting('Other', 'false')
+        if self.checkbox5.isSelected():
+            self.local_settings.setSetting('Pipeline', 'true')
+        else:
+            self.local_settings.setSetting('Pipeline', 'false')
 
     def keyPressed(self, event):
         self.local_settings.setSetting('EventLogs', self.area.getText())
@@ -442,6 +618,7 @@ class Process_EVTX1WithUISettingsPanel(IngestModuleIngestJobSettingsPanel):
         self.checkbox3 = JCheckBox("System.EVTX", actionPerformed=self.checkBoxEvent)
         self.checkbox4 = JCheckBox("Other - Input in text area below then check this box", actionPerformed=self.checkBoxEvent)
         self.text1 = JLabel("*** Format is a comma delimited text")
+        self.checkbox5 = JCheckBox("Pipeline - copy, parse and post each log while the next one is copied", actionPerformed=self.checkBoxEvent)
         self.panel1.add(self.checkbox)
         self.panel1.add(self.checkbox1)
         self.panel1.add(self.checkbox2)
@@ -458,6 +635,7 @@ class Process_EVTX1WithUISettingsPanel(IngestModuleIngestJobSettingsPanel):
         #self.pane.addKeyListener(self)
         #self.add(self.area)
         self.add(self.pane)
+        self.add(self.checkbox5)
 		
     def customizeComponents(self):
         self.checkbox.setSelected(self.local_settings.getSetting('All') == 'true')
@@ -466,6 +644,7 @@ class Process_EVTX1WithUISettingsPanel(IngestModuleIngestJobSettingsPanel):
         self.checkbox3.setSelected(self.local_settings.getSetting('System') == 'true')
         self.checkbox4.setSelected(self.local_settings.getSetting('Other') == 'true')
         self.area.setText(self.local_settings.getSetting('EventLogs'))
+        self.checkbox5.setSelected(self.local_settings.getSetting('Pipeline') == 'true')
 
     # Return the settings used
     def getSettings(self):
@@ -38,6 +38,9 @@
 #   Version 1.0 - Initial version - July 2017
 #   Version 1.1 - Add Linux support
 #   Version 1.2 - Fix option panels
+#   Version 1.3 - Read long tail counts from the Event_Log_Summary table built by Export_EVTX
+#   Version 1.4 - Pass the selected event ids to Export_EVTX so only those events are exported
+#   Version 1.5 - Only pass the event ids that are numbers to Export_EVTX
 
 import jarray
 import inspect
@@ -334,7 +337,18 @@ class ParseEvtxByEventIDIngestModule(DataSourceIngestModule):
                             
             # Run the EXE, saving output to a sqlite database
             self.log(Level.INFO, "Running program on data source " + self.path_to_exe + " parm 1 ==> " + temp_dir + "  Parm 2 ==> " + os.path.join(Temp_Dir,"\EventLogs.db3"))
-            subprocess.Popen([self.path_to_exe, temp_dir, os.path.join(Temp_Dir, "EventLogs.db3")]).communicate()[0]   
+            pgm_args = [self.path_to_exe, temp_dir, os.path.join(Temp_Dir, "EventLogs.db3")]
+            if self.List_Of_Events[0] != 'ALL':
+               # Export_EVTX exits on an event id that is not a number, so those are dropped here
+               Event_Ids = []
+               for Event_Id in self.local_settings.getSetting('Eventids').replace(',', ' ').split():
+                  if Event_Id.isdigit():
+                     Event_Ids.append(Event_Id)
+                  else:
+                     self.log(Level.WARNING, "Event id is not a number, it is not passed to the exporter ==> " + Event_Id)
+               if len(Event_Ids) > 0:
+                  pgm_args.extend(["--event-ids", ",".join(Event_Ids)])
+            subprocess.Popen(pgm_args).communicate()[0]   
                 
             # Set the database to be read to the one created by the Event_EVTX program
             lclDbPath = os.path.join(Case.getCurrentCase().getTempDirectory(), "EventLogs.db3")
@@ -415,9 +429,9 @@ class ParseEvtxByEventIDIngestModule(DataSourceIngestModule):
                 else:
                     try:
                         stmt_1 = dbConn.createStatement()
-                        SQL_Statement_1 = "select event_identifier, file_name, count(*) 'Number_Of_Events'  " + \
-                                        " FROM Event_Logs where upper(File_Name) = upper('" + file_name + "')" + \
-                                        " group by event_identifier, file_name order by 3;"
+                        SQL_Statement_1 = "select event_identifier, file_name, Number_Of_Events " + \
+                                        " FROM Event_Log_Summary where upper(File_Name) = upper('" + file_name + "')" + \
+                                        " order by 3;"
                         self.log(Level.INFO, "SQL Statement " + SQL_Statement_1 + "  <<=====")
                         resultSet_1 = stmt_1.executeQuery(SQL_Statement_1)
                     except SQLException as e:
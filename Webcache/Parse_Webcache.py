@@ -35,6 +35,7 @@
 #   Version 1.0 - Initial version - June 2016
 #   Version 1.1 - Added custom artifacts/attributes - September 1, 2016
 #   Version 1.2 - Added Linux Support - November 2018
+#   Version 1.3 - Pass the selected containers to Export_Webcache so only those containers are exported
 # 
 
 import jarray
@@ -43,6 +44,15 @@ import os
 from subprocess import Popen, PIPE
 import sys
 
+from javax.swing import JCheckBox
+from javax.swing import JTextArea
+from javax.swing import BoxLayout
+from javax.swing import BorderFactory
+from javax.swing import JPanel
+from javax.swing import JScrollPane
+from javax.swing import JComponent
+from javax.swing import JLabel
+
 from java.lang import Class
 from java.lang import System
 from java.sql  import DriverManager, SQLException
@@ -57,6 +67,8 @@ from org.sleuthkit.autopsy.ingest import IngestModule
 from org.sleuthkit.autopsy.ingest.IngestModule import IngestModuleException
 from org.sleuthkit.autopsy.ingest import DataSourceIngestModule
 from org.sleuthkit.autopsy.ingest import IngestModuleFactoryAdapter
+from org.sleuthkit.autopsy.ingest import GenericIngestModuleJobSettings
+from org.sleuthkit.autopsy.ingest import IngestModuleIngestJobSettingsPanel
 from org.sleuthkit.autopsy.ingest import IngestMessage
 from org.sleuthkit.autopsy.ingest import IngestServices
 from org.sleuthkit.autopsy.ingest import ModuleDataEvent
@@ -72,6 +84,9 @@ from org.sleuthkit.autopsy.datamodel import ContentUtils
 # to create instances of the modules that will do the analysis.
 class ParseWebcacheIngestModuleFactory(IngestModuleFactoryAdapter):
 
+    def __init__(self):
+        self.settings = None
+
     moduleName = "Parse WebCache"
     
     def getModuleDisplayName(self):
@@ -83,11 +98,23 @@ class ParseWebcacheIngestModuleFactory(IngestModuleFactoryAdapter):
     def getModuleVersionNumber(self):
         return "1.0"
     
+    def getDefaultIngestJobSettings(self):
+        return GenericIngestModuleJobSettings()
+
+    def hasIngestJobSettingsPanel(self):
+        return True
+
+    def getIngestJobSettingsPanel(self, settings):
+        if not isinstance(settings, GenericIngestModuleJobSettings):
+            raise IllegalArgumentException("Expected settings argument to be instanceof GenericIngestModuleJobSettings")
+        self.settings = settings
+        return ParseWebcacheWithUISettingsPanel(self.settings)
+
     def isDataSourceIngestModuleFactory(self):
         return True
 
     def createDataSourceIngestModule(self, ingestOptions):
-        return ParseWebcacheIngestModule()
+        return ParseWebcacheIngestModule(self.settings)
 
 
 # Data Source-level ingest module.  One gets created per data source.
@@ -98,8 +125,10 @@ class ParseWebcacheIngestModule(DataSourceIngestModule):
     def log(self, level, msg):
         self._logger.logp(level, self.__class__.__name__, inspect.stack()[1][3], msg)
 
-    def __init__(self):
+    def __init__(self, settings):
         self.context = None
+        self.local_settings = settings
+        self.List_Of_Containers = []
 
     # Where any setup and configuration is done
     # 'context' is an instance of org.sleuthkit.autopsy.ingest.IngestJobContext.
@@ -119,6 +148,17 @@ class ParseWebcacheIngestModule(DataSourceIngestModule):
             if not os.path.exists(self.path_to_exe):
                 raise IngestModuleException("Linux Executable was not found in module folder")
 
+        # No containers selected exports all of them like before there was a settings panel
+        if self.local_settings != None and self.local_settings.getSetting('All') != 'true':
+            for container_type in ['History', 'Content', 'Cookies', 'DOMStore']:
+                if self.local_settings.getSetting(container_type) == 'true':
+                    self.List_Of_Containers.append(container_type)
+            if self.local_settings.getSetting('Other') == 'true' and self.local_settings.getSetting('Containers') != None:
+                for container_type in self.local_settings.getSetting('Containers').split(','):
+                    if container_type.strip() != '':
+                        self.List_Of_Containers.append(container_type.strip())
+        self.log(Level.INFO, "List Of Containers ==> " + str(self.List_Of_Containers))
+
      
     # Where the analysis is done.
     # The 'dataSource' object being passed in is of type org.sleuthkit.datamodel.Content.
@@ -168,7 +208,10 @@ class ParseWebcacheIngestModule(DataSourceIngestModule):
             # Run the EXE, saving output to a sqlite database
             self.log(Level.INFO, "Running program on data source parm 1 ==> " + temp_dir + "  Parm 2 ==> " + DbPath)
             #subprocess.Popen([self.path_to_exe, lclDbPath, DbPath]).communicate()[0]   
-            pipe = Popen([self.path_to_exe, lclDbPath, DbPath], stdout=PIPE, stderr=PIPE, cwd=os.path.dirname(os.path.abspath(__file__)))
+            pgm_args = [self.path_to_exe, lclDbPath, DbPath]
+            if len(self.List_Of_Containers) > 0:
+                pgm_args.extend(["--include-containers", ",".join(self.List_Of_Containers)])
+            pipe = Popen(pgm_args, stdout=PIPE, stderr=PIPE, cwd=os.path.dirname(os.path.abspath(__file__)))
             out_text = pipe.communicate()[0]
             self.log(Level.INFO, "Output from run is ==> " + out_text)               
 
@@ -305,3 +348,82 @@ class ParseWebcacheIngestModule(DataSourceIngestModule):
         IngestServices.getInstance().postMessage(message)
 
         return IngestModule.ProcessResult.OK                
+
+# UI that is shown to user for each ingest job so they can configure the job.
+class ParseWebcacheWithUISettingsPanel(IngestModuleIngestJobSettingsPanel):
+    
+    # We get passed in a previous version of the settings so that we can
+    # prepopulate the UI
+    def __init__(self, settings):
+        self.local_settings = settings
+        self.initComponents()
+        self.customizeComponents()
+    
+    def checkBoxEvent(self, event):
+        if self.checkbox.isSelected():
+            self.local_settings.setSetting('All', 'true')
+        else:
+            self.local_settings.setSetting('All', 'false')
+        if self.checkbox1.isSelected():
+            self.local_settings.setSetting('History', 'true')
+        else:
+            self.local_settings.setSetting('History', 'false')
+        if self.checkbox2.isSelected():
+            self.local_settings.setSetting('Content', 'true')
+        else:
+            self.local_settings.setSetting('Content', 'false')
+        if self.checkbox3.isSelected():
+            self.local_settings.setSetting('Cookies', 'true')
+        else:
+            self.local_settings.setSetting('Cookies', 'false')
+        if self.checkbox4.isSelected():
+            self.local_settings.setSetting('DOMStore', 'true')
+        else:
+            self.local_settings.setSetting('DOMStore', 'false')
+        if self.checkbox5.isSelected():
+            self.local_settings.setSetting('Other', 'true')
+            self.local_settings.setSetting('Containers', self.area.getText())
+        else:
+            self.local_settings.setSetting('Other', 'false')
+
+    def initComponents(self):
+        self.setLayout(BoxLayout(self, BoxLayout.Y_AXIS))
+        self.setAlignmentX(JComponent.LEFT_ALIGNMENT)
+        self.panel1 = JPanel()
+        self.panel1.setLayout(BoxLayout(self.panel1, BoxLayout.Y_AXIS))
+        self.panel1.setAlignmentY(JComponent.LEFT_ALIGNMENT)
+        self.checkbox = JCheckBox("All Containers", actionPerformed=self.checkBoxEvent)
+        self.checkbox1 = JCheckBox("History", actionPerformed=self.checkBoxEvent)
+        self.checkbox2 = JCheckBox("Content", actionPerformed=self.checkBoxEvent)
+        self.checkbox3 = JCheckBox("Cookies", actionPerformed=self.checkBoxEvent)
+        self.checkbox4 = JCheckBox("DOMStore", actionPerformed=self.checkBoxEvent)
+        self.checkbox5 = JCheckBox("Other - Input in text area below then check this box", actionPerformed=self.checkBoxEvent)
+        self.text1 = JLabel("*** Format is a comma delimited text, container types or tables (Container_1)")
+        self.panel1.add(self.checkbox)
+        self.panel1.add(self.checkbox1)
+        self.panel1.add(self.checkbox2)
+        self.panel1.add(self.checkbox3)
+        self.panel1.add(self.checkbox4)
+        self.panel1.add(self.checkbox5)
+        self.panel1.add(self.text1)
+        self.add(self.panel1)
+		
+        self.area = JTextArea(5,25)
+        self.area.setBorder(BorderFactory.createEmptyBorder(0, 0, 0, 0))
+        self.pane = JScrollPane()
+        self.pane.getViewport().add(self.area)
+        self.add(self.pane)
+		
+    def customizeComponents(self):
+        self.checkbox.setSelected(self.local_settings.getSetting('All') == 'true')
+        self.checkbox1.setSelected(self.local_settings.getSetting('History') == 'true')
+        self.checkbox2.setSelected(self.local_settings.getSetting('Content') == 'true')
+        self.checkbox3.setSelected(self.local_settings.getSetting('Cookies') == 'true')
+        self.checkbox4.setSelected(self.local_settings.getSetting('DOMStore') == 'true')
+        self.checkbox5.setSelected(self.local_settings.getSetting('Other') == 'true')
+        self.area.setText(self.local_settings.getSetting('Containers'))
+
+    # Return the settings used
+    def getSettings(self):
+        self.local_settings.setSetting('Containers', self.area.getText())
+        return self.local_settings
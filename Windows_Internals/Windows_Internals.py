@@ -33,12 +33,22 @@
 # Comments 
 #   Version 1.0 - Initial version - March 2017
 #   Version 1.1 - Added code for File History module - April 2017
+#   Version 1.2 - Pass the selected Webcache containers to Export_Webcache
+#   Version 1.3 - Share one hive cache directory per case between the registry parsers
+#   Version 1.4 - Run the selected parsers at the same time, posting to the blackboard on one thread
+#   Version 1.5 - Split the processors between the worker pools of the exporters run at the same time
+#   Version 1.6 - Parse every SAM hive, backup and VSS copies included, with one run of the SAM parser
+#   Version 1.7 - Fail the module and name the parsers that failed when a parser raises an error
 # 
 
+import codecs
 import jarray
 import inspect
 import os
+import Queue
 import shutil
+import sys
+import threading
 from subprocess import Popen, PIPE
 
 from javax.swing import JCheckBox
@@ -48,9 +58,12 @@ from java.awt import GridBagConstraints
 from javax.swing import JPanel
 from javax.swing import JFileChooser
 from javax.swing import JScrollPane
+from javax.swing import JLabel
+from javax.swing import JTextField
 from javax.swing.filechooser import FileNameExtensionFilter
 
 from java.lang import Class
+from java.lang import Runtime
 from java.lang import System
 from java.sql  import DriverManager, SQLException
 from java.util.logging import Level
@@ -77,6 +90,61 @@ from org.sleuthkit.autopsy.casemodule.services import FileManager
 from org.sleuthkit.autopsy.datamodel import ContentUtils
 
 
+# The parsers are generators that yield the phase of the work that follows.  Copying the files and
+# running the programs is done on the worker threads, everything that reads or writes the blackboard
+# is done on the one blackboard poster thread so only one parser at a time posts to the blackboard.
+Parser_Phase = "Parser"
+Blackboard_Phase = "Blackboard"
+
+# Error of a parser that was not run because the job was cancelled, it does not make the module fail
+Job_Cancelled = "Job Cancelled"
+
+class Blackboard_Poster(object):
+
+    def __init__(self):
+        self.requests = Queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="Windows_Internals Blackboard Poster")
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            if request == None:
+                return
+            (post_function, reply) = request
+            try:
+                reply.put((True, post_function()))
+            except:
+                reply.put((False, sys.exc_info()))
+
+    # Runs post_function on the poster thread and returns its result, exceptions are raised again
+    # in the calling thread
+    def post(self, post_function):
+        reply = Queue.Queue(1)
+        self.requests.put((post_function, reply))
+        (post_ok, post_result) = reply.get()
+        if not post_ok:
+            raise post_result[0], post_result[1], post_result[2]
+        return post_result
+
+    def stop(self):
+        self.requests.put(None)
+        self.thread.join()
+
+# Progress bar given to the parsers, the module progress bar counts the parsers that have finished so
+# the progress of each parser is not shown
+class Sub_Parser_Progress(object):
+
+    def switchToIndeterminate(self):
+        pass
+
+    def switchToDeterminate(self, workUnits):
+        pass
+
+    def progress(self, *args):
+        pass
+
 # Factory that defines the name and details of the module and allows Autopsy
 # to create instances of the modules that will do the analysis.
 class Windows_InternalsIngestModuleFactory(IngestModuleFactoryAdapter):
@@ -127,6 +195,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         self.local_settings = settings
         self.List_Of_Windows_Internals = []
         self.List_Of_tables = []
+        self.Exe_Workers = 1
 
     # Where any setup and configuration is done
     # 'context' is an instance of org.sleuthkit.autopsy.ingest.IngestJobContext.
@@ -257,72 +326,68 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
 
         # we don't know how much work there is yet
         progressBar.switchToIndeterminate()
-        
-        if self.local_settings.getSetting('Recentlyused_Flag') == 'true':
-            progressBar.progress("Processing Recently Used Apps")	
-            self.process_Recentlyused(dataSource, progressBar)
-            message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
-                "Windows_Internals", " Recentlyused Has Been Analyzed " )
-            IngestServices.getInstance().postMessage(message)
-
-        if self.local_settings.getSetting('Filehistory_Flag') == 'true':
-            progressBar.progress("Processing File History")	
-            self.process_Filehistory(dataSource, progressBar)
-            message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
-                "Windows_Internals", " File History Has Been Analyzed " )
-            IngestServices.getInstance().postMessage(message)
-
-        if self.local_settings.getSetting('Jumplist_Flag') == 'true':
-            progressBar.progress("Processing Jumplists")	
-            self.log(Level.INFO, "Starting to process Jumplist")
-            self.process_Jumplist(dataSource, progressBar)
-            message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
-                "Windows_Internals", " Jumplist Has Been Analyzed " )
-            IngestServices.getInstance().postMessage(message)
 
-        if self.local_settings.getSetting('Prefetch_Flag') == 'true':
-            progressBar.progress("Processing Prefetch")	
-            self.process_Prefetch(dataSource, progressBar)
-            message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
-                "Windows_Internals", " Prefetch Has Been Analyzed " )
-            IngestServices.getInstance().postMessage(message)
-
-        if self.local_settings.getSetting('SAM_Flag') == 'true':
-            progressBar.progress("Processing SAM")	
-            self.process_SAM(dataSource, progressBar)
-            message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
-                "Windows_Internals", " SAM Has Been Analyzed " )
-            IngestServices.getInstance().postMessage(message)
-
-        if self.local_settings.getSetting('Shellbags_Flag') == 'true':
-            progressBar.progress("Processing Shellbags")	
-            self.process_Shellbags(dataSource, progressBar)
-            message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
-                "Windows_Internals", " Shellbags Have Been Analyzed " )
-            IngestServices.getInstance().postMessage(message)
-
-        if self.local_settings.getSetting('Shimcache_Flag') == 'true':
-            progressBar.progress("Processing Shimcache")	
-            self.process_Shimcache(dataSource, progressBar)
-            message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
-                "Windows_Internals", " Shimcache Has Been Analyzed " )
-            IngestServices.getInstance().postMessage(message)
-
-        if self.local_settings.getSetting('Usnj_Flag') == 'true':
-            progressBar.progress("Processing UsnJ")	
-            self.process_Usnj(dataSource, progressBar)        
-            message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
-                "Windows_Internals", " Usnj Has Been Analyzed " )
-            IngestServices.getInstance().postMessage(message)
-
-        if self.local_settings.getSetting('Webcache_Flag') == 'true':
-            progressBar.progress("Processing Webcache")	
-            self.process_Webcache(dataSource, progressBar)
-            message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
-                "Windows_Internals", " Webcache Has Been Analyzed " )
+        # Setting flag, name, parser and message posted when it has been analyzed for each parser
+        Windows_Internals_Parsers = [('Recentlyused_Flag', "Recently Used Apps", self.process_Recentlyused, " Recentlyused Has Been Analyzed "), \
+                                     ('Filehistory_Flag', "File History", self.process_Filehistory, " File History Has Been Analyzed "), \
+                                     ('Jumplist_Flag', "Jumplists", self.process_Jumplist, " Jumplist Has Been Analyzed "), \
+                                     ('Prefetch_Flag', "Prefetch", self.process_Prefetch, " Prefetch Has Been Analyzed "), \
+                                     ('SAM_Flag', "SAM", self.process_SAM, " SAM Has Been Analyzed "), \
+                                     ('Shellbags_Flag', "Shellbags", self.process_Shellbags, " Shellbags Have Been Analyzed "), \
+                                     ('Shimcache_Flag', "Shimcache", self.process_Shimcache, " Shimcache Has Been Analyzed "), \
+                                     ('Usnj_Flag', "UsnJ", self.process_Usnj, " Usnj Has Been Analyzed "), \
+                                     ('Webcache_Flag', "Webcache", self.process_Webcache, " Webcache Has Been Analyzed ")]
+
+        parser_queue = Queue.Queue()
+        number_of_parsers = 0
+        for windows_internals_parser in Windows_Internals_Parsers:
+            if self.local_settings.getSetting(windows_internals_parser[0]) == 'true':
+                parser_queue.put(windows_internals_parser)
+                number_of_parsers = number_of_parsers + 1
+
+        # Run the parsers on the worker threads, each worker takes the next parser off the queue until
+        # the queue is empty
+        number_of_workers = min(self.get_Number_Of_Workers(), number_of_parsers)
+        # The exporters that have a worker pool get their share of the processors, so the parsers that
+        # run at the same time do not each start a pool the size of all the processors
+        self.Exe_Workers = max(1, Runtime.getRuntime().availableProcessors() // max(number_of_workers, 1))
+        self.log(Level.INFO, "Running " + str(number_of_parsers) + " parsers with " + str(number_of_workers) + " workers, " + \
+                 str(self.Exe_Workers) + " worker processes per exporter")
+        progressBar.switchToDeterminate(max(number_of_parsers, 1))
+        finished_queue = Queue.Queue()
+        self.blackboard_poster = Blackboard_Poster()
+        workers = []
+        for worker_number in range(0, number_of_workers):
+            worker = threading.Thread(target=self.run_Parsers, args=(dataSource, parser_queue, finished_queue), \
+                                      name="Windows_Internals Worker " + str(worker_number + 1))
+            worker.setDaemon(True)
+            worker.start()
+            workers.append(worker)
+
+        failed_parsers = []
+        for parser_count in range(1, number_of_parsers + 1):
+            (parser_name, analyzed_message, parser_error) = finished_queue.get()
+            if parser_error == None:
+                message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
+                    "Windows_Internals", analyzed_message )
+                IngestServices.getInstance().postMessage(message)
+            else:
+                self.log(Level.SEVERE, parser_name + " was not analyzed ==> " + parser_error)
+                if parser_error != Job_Cancelled:
+                    failed_parsers.append(parser_name)
+            progressBar.progress("Processed " + parser_name, parser_count)
+
+        for worker in workers:
+            worker.join()
+        self.blackboard_poster.stop()
+
+        # A parser that failed fails the module, the message names the parsers so they can be run again
+        if len(failed_parsers) > 0:
+            message = IngestMessage.createMessage(IngestMessage.MessageType.ERROR,
+                "Windows_Internals", " Windows_Internals parsers that failed ==> " + ", ".join(failed_parsers) )
             IngestServices.getInstance().postMessage(message)
+            return IngestModule.ProcessResult.ERROR
 
-        
         # After all databases, post a message to the ingest messages in box.
         message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
             "Windows_Internals", " Windows_Internals Has Been Analyzed " )
@@ -330,6 +395,43 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
 
         return IngestModule.ProcessResult.OK                
 
+    # Number of parsers to run at the same time, the number of processors when it is not set
+    def get_Number_Of_Workers(self):
+        try:
+            return max(1, int(self.local_settings.getSetting('Number_Of_Workers').strip()))
+        except:
+            return Runtime.getRuntime().availableProcessors()
+
+    # Worker thread, runs parsers off the queue until it is empty and puts the name, message and error of
+    # each parser on the finished queue
+    def run_Parsers(self, dataSource, parser_queue, finished_queue):
+        while True:
+            try:
+                (parser_flag, parser_name, parser_function, analyzed_message) = parser_queue.get_nowait()
+            except Queue.Empty:
+                return
+            if self.context.isJobCancelled():
+                finished_queue.put((parser_name, analyzed_message, Job_Cancelled))
+                continue
+            self.log(Level.INFO, "Starting to process " + parser_name)
+            try:
+                self.run_Parser(parser_function(dataSource, Sub_Parser_Progress()))
+                finished_queue.put((parser_name, analyzed_message, None))
+            except:
+                finished_queue.put((parser_name, analyzed_message, str(sys.exc_info()[1])))
+
+    # Runs each part of a parser on the thread of its phase until the parser is done
+    def run_Parser(self, parser_steps):
+        parser_phase = Parser_Phase
+        try:
+            while True:
+                if parser_phase == Blackboard_Phase:
+                    parser_phase = self.blackboard_poster.post(parser_steps.next)
+                else:
+                    parser_phase = parser_steps.next()
+        except StopIteration:
+            pass
+
     def process_Recentlyused(self, dataSource, progressBar):
         # we don't know how much work there is yet
         progressBar.switchToIndeterminate()
@@ -359,7 +461,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
             
             # Check if the user pressed cancel while we were busy
             if self.context.isJobCancelled():
-                return IngestModule.ProcessResult.OK
+                return
 
             #self.log(Level.INFO, "Processing file: " + file.getName())
             fileCount += 1
@@ -378,6 +480,9 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         out_text = pipe.communicate()[0]
         self.log(Level.INFO, "Output from run is ==> " + out_text) 
 
+        # Post the results to the blackboard on the blackboard thread
+        yield Blackboard_Phase
+
         lclDbPath = os.path.join(Temp_Dir, "recentlyUsedApps.db3")        
         if ("Exiting" in out_text):
             message = IngestMessage.createMessage(IngestMessage.MessageType.DATA,
@@ -476,7 +581,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                        dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
                     except SQLException as e:
                        self.log(Level.INFO, "Could not open database file (not SQLite) recentlyUsedApps.db3 (" + e.getMessage() + ")")
-                       return IngestModule.ProcessResult.OK
+                       return
                     
                     # Query the history_visits table in the database and get all columns. 
                     try:
@@ -498,7 +603,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                        self.log(Level.INFO, "query recently_used table")
                     except SQLException as e:
                        self.log(Level.INFO, "Error querying database for recently_used table (" + e.getMessage() + ")")
-                       return IngestModule.ProcessResult.OK
+                       return
 
                     artID_hst = skCase.getArtifactTypeID("TSK_CCM_RECENTLY_USED_APPS")
                     artID_hst_evt = skCase.getArtifactType("TSK_CCM_RECENTLY_USED_APPS")
@@ -600,6 +705,8 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         # Use blackboard class to index blackboard artifacts for keyword search
         blackboard = Case.getCurrentCase().getServices().getBlackboard()
 
+        # Create the artifacts and attributes on the blackboard thread
+        yield Blackboard_Phase
         try:
              self.log(Level.INFO, "Begin Create New Artifacts")
              artID_cat1 = skCase.addArtifactType( "TSK_FH_CATALOG_1", "File History Catalog 1")
@@ -709,9 +816,11 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         # Write out each catalog esedb database to the temp directory
         for file in files:
             
+            # Copy the file and run the program on a worker thread
+            yield Parser_Phase
             # Check if the user pressed cancel while we were busy
             if self.context.isJobCancelled():
-                return IngestModule.ProcessResult.OK
+                return
 
             #self.log(Level.INFO, "Processing file: " + file.getName())
             fileCount += 1
@@ -728,6 +837,9 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
             
             out_text = pipe.communicate()[0]
             self.log(Level.INFO, "Output from run is ==> " + out_text)                
+
+            # Post the results to the blackboard on the blackboard thread
+            yield Blackboard_Phase
 		
             if db_name == "Catalog1":
                 artID_fh = skCase.getArtifactTypeID("TSK_FH_CATALOG_1")
@@ -746,7 +858,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                 dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclSQLPath)
             except SQLException as e:
                 self.log(Level.INFO, "Could not open database file (not SQLite) " + lclSQLPath + " (" + e.getMessage() + ")")
-                return IngestModule.ProcessResult.OK
+                return
                 
             # Query the contacts table in the database and get all columns. 
             try:
@@ -762,7 +874,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                 resultSet = stmt.executeQuery(SQL_Statement)
             except SQLException as e:
                 self.log(Level.INFO, "Error querying database for File_History table (" + e.getMessage() + ")")
-                return IngestModule.ProcessResult.OK
+                return
 
             # Cycle through each row and create artifacts
             while resultSet.next():
@@ -832,6 +944,8 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         # Use blackboard class to index blackboard artifacts for keyword search
         blackboard = Case.getCurrentCase().getServices().getBlackboard()
 
+        # Create the artifacts and attributes on the blackboard thread
+        yield Blackboard_Phase
         try:
              self.log(Level.INFO, "Begin Create New Artifacts")
              artID_jl_ad = skCase.addArtifactType( "TSK_JL_AD", "Jump List Auto Dest")
@@ -949,6 +1063,8 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         attID_jl_vl = skCase.getAttributeType("TSK_JLAD_VOLUME_LABEL")
         attID_jl_wd = skCase.getAttributeType("TSK_JLAD_WORKING_DIRECTORY")
         
+        # Copy the files and run the program on a worker thread
+        yield Parser_Phase
         # we don't know how much work there is yet
         progressBar.switchToIndeterminate()
         
@@ -976,7 +1092,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
             
             # Check if the user pressed cancel while we were busy
             if self.context.isJobCancelled():
-                return IngestModule.ProcessResult.OK
+                return
 
             #self.log(Level.INFO, "Processing file: " + file.getName())
             fileCount += 1
@@ -987,10 +1103,14 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                         
         # Run the EXE, saving output to a sqlite database
         self.log(Level.INFO, "Running program on data source parm 1 ==> " + Temp_Dir + "  Parm 2 ==> " + os.path.join(Temp_Dir, "JL_AD.db3"))
-        pipe = Popen([self.path_to_Jumplist_file, Temp_Dir, os.path.join(Temp_Dir, "JL_AD.db3"), self.path_to_app_id_db], stdout=PIPE, stderr=PIPE)
+        pipe = Popen([self.path_to_Jumplist_file, Temp_Dir, os.path.join(Temp_Dir, "JL_AD.db3"), self.path_to_app_id_db, \
+                      "-w", str(self.Exe_Workers)], stdout=PIPE, stderr=PIPE)
         
         out_text = pipe.communicate()[0]
         self.log(Level.INFO, "Output from run is ==> " + out_text)                
+
+        # Post the results to the blackboard on the blackboard thread
+        yield Blackboard_Phase
         
         # Set the database to be read to the one created by the Event_EVTX program
         lclDbPath = os.path.join(Temp_Dir, "JL_AD.db3")
@@ -1002,7 +1122,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
             dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
         except SQLException as e:
             self.log(Level.INFO, "Could not open database file (not SQLite) " + file.getName() + " (" + e.getMessage() + ")")
-            return IngestModule.ProcessResult.OK
+            return
             
 #        fileManager = Case.getCurrentCase().getServices().getFileManager()
 #        files = fileManager.findFiles(dataSource, "%.automaticDestinations-ms")
@@ -1021,7 +1141,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
             	resultSet = stmt.executeQuery(SQL_Statement)
             except SQLException as e:
                 self.log(Level.INFO, "Error querying database for table (" + e.getMessage() + ")")
-                return IngestModule.ProcessResult.OK
+                return
 
             # Cycle through each row and create artifacts
             while resultSet.next():
@@ -1113,6 +1233,8 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         # Use blackboard class to index blackboard artifacts for keyword search
         blackboard = Case.getCurrentCase().getServices().getBlackboard()
 
+        # Create the artifacts and attributes on the blackboard thread
+        yield Blackboard_Phase
         try:
              self.log(Level.INFO, "Begin Create New Artifacts")
              artID_pf = skCase.addArtifactType( "TSK_PREFETCH", "Windows Prefetch")
@@ -1192,6 +1314,8 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         attID_ex7 = skCase.getAttributeType("TSK_PF_EXEC_DTTM_7")
         attID_ex8 = skCase.getAttributeType("TSK_PF_EXEC_DTTM_8")
 
+        # Copy the files and run the program on a worker thread
+        yield Parser_Phase
         # Used to crossref ADS prefetch files
         prefetchFileName = {}
 
@@ -1221,7 +1345,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
             
             # Check if the user pressed cancel while we were busy
             if self.context.isJobCancelled():
-                return IngestModule.ProcessResult.OK
+                return
 
             #self.log(Level.INFO, "Processing file: " + file.getName())
             fileCount += 1
@@ -1242,6 +1366,9 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         
         out_text = pipe.communicate()[0]
         self.log(Level.INFO, "Output from run is ==> " + out_text)                
+
+        # Post the results to the blackboard on the blackboard thread
+        yield Blackboard_Phase
 			
         # Set the database to be read to the once created by the prefetch parser program
         lclDbPath = os.path.join(Temp_Dir, "Autopsy_PF_DB.db3")
@@ -1253,7 +1380,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
             dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
         except SQLException as e:
             self.log(Level.INFO, "Could not open database file (not SQLite) " + file.getName() + " (" + e.getMessage() + ")")
-            return IngestModule.ProcessResult.OK
+            return
             
         # Query the contacts table in the database and get all columns. 
         try:
@@ -1270,7 +1397,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                                           " from prefetch_file_info ")
         except SQLException as e:
             self.log(Level.INFO, "Error querying database for Prefetch table (" + e.getMessage() + ")")
-            return IngestModule.ProcessResult.OK
+            return
 
         # Cycle through each row and create artifacts
         while resultSet.next():
@@ -1338,8 +1465,13 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         # Use blackboard class to index blackboard artifacts for keyword search
         blackboard = Case.getCurrentCase().getServices().getBlackboard()
 
+        # Every SAM hive of the data source, the one in config as well as the RegBack, VSS and backup copies,
+        # is parsed by one run of the SAM parser
         fileManager = Case.getCurrentCase().getServices().getFileManager()
-        files = fileManager.findFiles(dataSource, "SAM", "config")
+        files = []
+        for file in fileManager.findFiles(dataSource, "SAM"):
+            if not file.isDir() and file.getSize() > 0:
+                files.append(file)
         numFiles = len(files)
         self.log(Level.INFO, "found " + str(numFiles) + " files")
         progressBar.switchToDeterminate(numFiles)
@@ -1353,106 +1485,145 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
         except:
 		    self.log(Level.INFO, "SAM Directory already exists " + Temp_Dir)
 			
-        # Write out each SAM file to the temp directory
+        # Write out each SAM file with its transaction logs to a directory named after its file id, and remember
+        # which file each copy came from so the users can be posted to the hive they were found in
+        Source_Hives = {}
+        Source_Hive_Paths = []
         for file in files:
             
             # Check if the user pressed cancel while we were busy
             if self.context.isJobCancelled():
-                return IngestModule.ProcessResult.OK
+                return
 
             #self.log(Level.INFO, "Processing file: " + file.getName())
             fileCount += 1
 
-            # Save the DB locally in the temp folder. use file id as name to reduce collisions
-            lclDbPath = os.path.join(Temp_Dir, file.getName())
+            Hive_Dir = os.path.join(Temp_Dir, str(file.getId()))
+            try:
+                os.mkdir(Hive_Dir)
+            except:
+                self.log(Level.INFO, "SAM Directory already exists " + Hive_Dir)
+
+            lclDbPath = os.path.join(Hive_Dir, file.getName())
             ContentUtils.writeToFile(file, File(lclDbPath))
-                        
-        # Run the EXE, saving output to a sqlite database
-        self.log(Level.INFO, "Running program on data source parm 1 ==> " + Temp_Dir + "  Parm 2 ==> " + Temp_Dir + "\\SAM.db3")
-        pipe = Popen([self.path_to_SAM_file, os.path.join(Temp_Dir, "SAM"), os.path.join(Temp_Dir, "SAM.db3")], stdout=PIPE, stderr=PIPE)
+            for log_file in fileManager.findFiles(dataSource, file.getName() + ".LOG%", file.getParentPath()):
+                if log_file.getParentPath() == file.getParentPath():
+                    ContentUtils.writeToFile(log_file, File(os.path.join(Hive_Dir, log_file.getName())))
+            self.log(Level.INFO, "Saved File ==> " + file.getUniquePath() + " ==> " + lclDbPath)
+            Source_Hives[lclDbPath] = file
+            Source_Hive_Paths.append(lclDbPath)
+
+        if len(Source_Hives) == 0:
+            return
+
+        # The manifest lists one SAM hive per line
+        Manifest_File = os.path.join(Temp_Dir, "SAM_Manifest.txt")
+        manifest = codecs.open(Manifest_File, "w", "utf-8")
+        for Source_Hive_Path in Source_Hive_Paths:
+            manifest.write(Source_Hive_Path + "\n")
+        manifest.close()
+
+        # Run the EXE once on all the hives of the manifest, saving output to a sqlite database.  The parsed hives are kept
+        # in the case hive cache so the other registry parsers do not have to parse the same hives again
+        Hive_Cache_Dir = os.path.join(Case.getCurrentCase().getTempDirectory(), "Hive_Cache")
+        self.log(Level.INFO, "Running program on data source parm 1 ==> " + Manifest_File + "  Parm 2 ==> " + Temp_Dir + "\\SAM.db3" + \
+                             "  Hive Cache ==> " + Hive_Cache_Dir)
+        pipe = Popen([self.path_to_SAM_file, Manifest_File, os.path.join(Temp_Dir, "SAM.db3"), "--manifest", "--cache-dir", Hive_Cache_Dir], \
+                     stdout=PIPE, stderr=PIPE)
         out_text = pipe.communicate()[0]
         self.log(Level.INFO, "Output from run is ==> " + out_text)               
+
+        # Post the results to the blackboard on the blackboard thread
+        yield Blackboard_Phase
                
-        for file in files:	
-           # Open the DB using JDBC
-           lclDbPath = os.path.join(Temp_Dir, "SAM.db3")
-           self.log(Level.INFO, "Path the SAM database file created ==> " + lclDbPath)
-           try: 
-               Class.forName("org.sqlite.JDBC").newInstance()
-               dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
-           except SQLException as e:
-               self.log(Level.INFO, "Could not open database file (not SQLite) " + file.getName() + " (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+        # Open the DB using JDBC
+        lclDbPath = os.path.join(Temp_Dir, "SAM.db3")
+        self.log(Level.INFO, "Path the SAM database file created ==> " + lclDbPath)
+        try: 
+            Class.forName("org.sqlite.JDBC").newInstance()
+            dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
+        except SQLException as e:
+            self.log(Level.INFO, "Could not open database file (not SQLite) " + lclDbPath + " (" + e.getMessage() + ")")
+            return
             
-           # Query the contacts table in the database and get all columns. 
-           try:
-               stmt = dbConn.createStatement()
-               resultSet = stmt.executeQuery("Select tbl_name from SQLITE_MASTER; ")
-               self.log(Level.INFO, "query SQLite Master table")
-           except SQLException as e:
-               self.log(Level.INFO, "Error querying database for SAM table (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+        # Query the contacts table in the database and get all columns. 
+        try:
+            stmt = dbConn.createStatement()
+            resultSet = stmt.executeQuery("Select tbl_name from SQLITE_MASTER; ")
+            self.log(Level.INFO, "query SQLite Master table")
+        except SQLException as e:
+            self.log(Level.INFO, "Error querying database for SAM table (" + e.getMessage() + ")")
+            return
 
-           try:
-                self.log(Level.INFO, "Begin Create New Artifacts")
-                artID_sam = skCase.addArtifactType( "TSK_SAM", "SAM File")
-           except:		
-                self.log(Level.INFO, "Artifacts Creation Error, some artifacts may not exist now. ==> ")
+        try:
+             self.log(Level.INFO, "Begin Create New Artifacts")
+             artID_sam = skCase.addArtifactType( "TSK_SAM", "SAM File")
+        except:		
+             self.log(Level.INFO, "Artifacts Creation Error, some artifacts may not exist now. ==> ")
 
-           artID_sam = skCase.getArtifactTypeID("TSK_SAM")
-           artID_sam_evt = skCase.getArtifactType("TSK_SAM")
+        artID_sam = skCase.getArtifactTypeID("TSK_SAM")
+        artID_sam_evt = skCase.getArtifactType("TSK_SAM")
              
-           # Cycle through each row and create artifacts
-           while resultSet.next():
-               try: 
-                   self.log(Level.INFO, "Result (" + resultSet.getString("tbl_name") + ")")
-                   table_name = resultSet.getString("tbl_name")
-                   SQL_String_1 = "Select * from " + table_name + ";"
-                   SQL_String_2 = "PRAGMA table_info('" + table_name + "')"
+        # Cycle through each row and create artifacts, the Source_Hive column says which SAM file the row goes to
+        while resultSet.next():
+            try: 
+                self.log(Level.INFO, "Result (" + resultSet.getString("tbl_name") + ")")
+                table_name = resultSet.getString("tbl_name")
+                SQL_String_1 = "Select * from " + table_name + ";"
+                SQL_String_2 = "PRAGMA table_info('" + table_name + "')"
 				   
-                   Column_Names = []
-                   Column_Types = []
-                   resultSet2  = stmt.executeQuery(SQL_String_2)
-                   while resultSet2.next(): 
-                      Column_Names.append(resultSet2.getString("name").upper())
-                      Column_Types.append(resultSet2.getString("type"))
-                      if resultSet2.getString("type") == "text":
-                          try:
-                              attID_ex1 = skCase.addArtifactAttributeType("TSK_" + resultSet2.getString("name").upper(), BlackboardAttribute.TSK_BLACKBOARD_ATTRIBUTE_VALUE_TYPE.STRING, resultSet2.getString("name"))
-                          except:		
-                              self.log(Level.INFO, "Attributes Creation Error, " + resultSet2.getString("name") + " ==> ")
-                      else:
-                          try:
-                              attID_ex1 = skCase.addArtifactAttributeType("TSK_" + resultSet2.getString("name").upper(), BlackboardAttribute.TSK_BLACKBOARD_ATTRIBUTE_VALUE_TYPE.DATETIME, resultSet2.getString("name"))
-                          except:		
-                              self.log(Level.INFO, "Attributes Creation Error, " + resultSet2.getString("name") + " ==> ")
+                Column_Names = []
+                Column_Types = []
+                resultSet2  = stmt.executeQuery(SQL_String_2)
+                while resultSet2.next(): 
+                   Column_Names.append(resultSet2.getString("name").upper())
+                   Column_Types.append(resultSet2.getString("type"))
+                   if resultSet2.getString("name").upper() == "SOURCE_HIVE":
+                       continue
+                   if resultSet2.getString("type") == "text":
+                       try:
+                           attID_ex1 = skCase.addArtifactAttributeType("TSK_" + resultSet2.getString("name").upper(), BlackboardAttribute.TSK_BLACKBOARD_ATTRIBUTE_VALUE_TYPE.STRING, resultSet2.getString("name"))
+                       except:		
+                           self.log(Level.INFO, "Attributes Creation Error, " + resultSet2.getString("name") + " ==> ")
+                   else:
+                       try:
+                           attID_ex1 = skCase.addArtifactAttributeType("TSK_" + resultSet2.getString("name").upper(), BlackboardAttribute.TSK_BLACKBOARD_ATTRIBUTE_VALUE_TYPE.DATETIME, resultSet2.getString("name"))
+                       except:		
+                           self.log(Level.INFO, "Attributes Creation Error, " + resultSet2.getString("name") + " ==> ")
 										 
-                   resultSet3 = stmt.executeQuery(SQL_String_1)
-                   while resultSet3.next():
-                      art = file.newArtifact(artID_sam)
-                      Column_Number = 1
-                      for col_name in Column_Names:
-                         c_name = "TSK_" + col_name
-                         attID_ex1 = skCase.getAttributeType(c_name)
-                         if Column_Types[Column_Number - 1] == "text":
-                             art.addAttribute(BlackboardAttribute(attID_ex1, Windows_InternalsIngestModuleFactory.moduleName, resultSet3.getString(Column_Number)))
-                         else:
-                             art.addAttribute(BlackboardAttribute(attID_ex1, Windows_InternalsIngestModuleFactory.moduleName, resultSet3.getInt(Column_Number)))
-                         Column_Number = Column_Number + 1
+                resultSet3 = stmt.executeQuery(SQL_String_1)
+                while resultSet3.next():
+                   file = Source_Hives.get(resultSet3.getString("Source_Hive"))
+                   if file is None:
+                       self.log(Level.INFO, "No SAM file for hive " + str(resultSet3.getString("Source_Hive")))
+                       continue
+                   art = file.newArtifact(artID_sam)
+                   Column_Number = 1
+                   for col_name in Column_Names:
+                      c_name = "TSK_" + col_name
+                      if col_name == "SOURCE_HIVE":
+                          pass
+                      elif Column_Types[Column_Number - 1] == "text":
+                          attID_ex1 = skCase.getAttributeType(c_name)
+                          art.addAttribute(BlackboardAttribute(attID_ex1, Windows_InternalsIngestModuleFactory.moduleName, resultSet3.getString(Column_Number)))
+                      else:
+                          attID_ex1 = skCase.getAttributeType(c_name)
+                          art.addAttribute(BlackboardAttribute(attID_ex1, Windows_InternalsIngestModuleFactory.moduleName, resultSet3.getInt(Column_Number)))
+                      Column_Number = Column_Number + 1
 
-                      # index the artifact for keyword search
-                      try:
-                          blackboard.indexArtifact(art)
-                      except:
-                          self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
+                   # index the artifact for keyword search
+                   try:
+                       blackboard.indexArtifact(art)
+                   except:
+                       self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
                          
-               except SQLException as e:
-                   self.log(Level.INFO, "Error getting values from contacts table (" + e.getMessage() + ")")
+            except SQLException as e:
+                self.log(Level.INFO, "Error getting values from contacts table (" + e.getMessage() + ")")
 
         # Clean up
-           stmt.close()
-           dbConn.close()
-           os.remove(lclDbPath)
+        stmt.close()
+        dbConn.close()
+        os.remove(lclDbPath)
 			
 		#Clean up EventLog directory and files
         try:
@@ -1486,9 +1657,11 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
 		    self.log(Level.INFO, "Shimcache Directory already exists " + Temp_Dir)
 			
         for file in files:	
+           # Copy the file and run the program on a worker thread
+           yield Parser_Phase
            # Check if the user pressed cancel while we were busy
            if self.context.isJobCancelled():
-               return IngestModule.ProcessResult.OK
+               return
 
            #self.log(Level.INFO, "Processing file: " + file.getName())
            fileCount += 1
@@ -1503,6 +1676,9 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
            pipe = Popen([self.path_to_Shimcache_file, os.path.join(Temp_Dir, file.getName()), os.path.join(Temp_Dir, "Shimcache_db.db3")], stdout=PIPE, stderr=PIPE)
            out_text = pipe.communicate()[0]
            self.log(Level.INFO, "Output from run is ==> " + out_text)               
+
+           # Post the results to the blackboard on the blackboard thread
+           yield Blackboard_Phase
                
            # Open the DB using JDBC
            lclDbPath = os.path.join(Temp_Dir, "Shimcache_db.db3")
@@ -1513,7 +1689,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
            except SQLException as e:
                self.log(Level.INFO, "Could not open database file (not SQLite) " + file.getName() + " (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+               return
             
            # Query the contacts table in the database and get all columns. 
            try:
@@ -1522,7 +1698,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                self.log(Level.INFO, "query SQLite Master table")
            except SQLException as e:
                self.log(Level.INFO, "Error querying database for system table (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+               return
 
            try:
                 self.log(Level.INFO, "Begin Create New Artifacts")
@@ -1617,9 +1793,11 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
 		    self.log(Level.INFO, "Usnj Directory already exists " + Temp_Dir)
 			
         for file in files:	
+           # Copy the file and run the program on a worker thread
+           yield Parser_Phase
            # Check if the user pressed cancel while we were busy
            if self.context.isJobCancelled():
-               return IngestModule.ProcessResult.OK
+               return
 
            #self.log(Level.INFO, "Processing file: " + file.getName())
            fileCount += 1
@@ -1634,6 +1812,9 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
            pipe = Popen([self.path_to_Usnj_file, os.path.join(Temp_Dir, "usnj.txt"), os.path.join(Temp_Dir, "usnj.db3")], stdout=PIPE, stderr=PIPE)
            out_text = pipe.communicate()[0]
            self.log(Level.INFO, "Output from run is ==> " + out_text)               
+
+           # Post the results to the blackboard on the blackboard thread
+           yield Blackboard_Phase
                
            # Open the DB using JDBC
            lclDbPath = os.path.join(Temp_Dir, "usnj.db3")
@@ -1644,7 +1825,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
            except SQLException as e:
                self.log(Level.INFO, "Could not open database file (not SQLite) usnj.db3 (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+               return
             
            # Query the contacts table in the database and get all columns. 
            try:
@@ -1653,7 +1834,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                self.log(Level.INFO, "query SQLite Master table")
            except SQLException as e:
                self.log(Level.INFO, "Error querying database for system table (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+               return
 
            try:
                 self.log(Level.INFO, "Begin Create New Artifacts")
@@ -1757,7 +1938,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
             
             # Check if the user pressed cancel while we were busy
             if self.context.isJobCancelled():
-                return IngestModule.ProcessResult.OK
+                return
 
             #self.log(Level.INFO, "Processing file: " + file.getName())
             fileCount += 1
@@ -1771,10 +1952,17 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
             # Run the EXE, saving output to a sqlite database
             self.log(Level.INFO, "Running program on data source parm 1 ==> " + lclDbPath + "  Parm 2 ==> " + DbPath)
             #subprocess.Popen([self.path_to_Webcache_file, lclDbPath, DbPath]).communicate()[0]   
-            pipe = Popen([self.path_to_Webcache_file, lclDbPath, DbPath], stdout=PIPE, stderr=PIPE)
+            pgm_args = [self.path_to_Webcache_file, lclDbPath, DbPath, "-w", str(self.Exe_Workers)]
+            Webcache_Containers = self.local_settings.getSetting('Webcache_Containers')
+            if Webcache_Containers != None and Webcache_Containers.strip() != '':
+                pgm_args.extend(["--include-containers", Webcache_Containers.strip()])
+            pipe = Popen(pgm_args, stdout=PIPE, stderr=PIPE)
             out_text = pipe.communicate()[0]
             self.log(Level.INFO, "Output from run is ==> " + out_text)               
 
+        # Post the results to the blackboard on the blackboard thread
+        yield Blackboard_Phase
+
         for file in files:	
            # Open the DB using JDBC
            lclDbPath = os.path.join(Temp_Dir, file.getName() + "-" + str(file.getId()) + ".db3")
@@ -1785,7 +1973,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
            except SQLException as e:
                self.log(Level.INFO, "Could not open database file (not SQLite) " + file.getName() + " (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+               return
             
            try:
                stmt = dbConn.createStatement()
@@ -1793,7 +1981,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                self.log(Level.INFO, "query SQLite Master table")
            except SQLException as e:
                self.log(Level.INFO, "Error querying database for Prefetch table (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+               return
      
            Container_List = []
            while resultSet.next():
@@ -1905,9 +2093,11 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
 		    self.log(Level.INFO, "Shellbag Directory already exists " + Temp_Dir)
 			
         for file in files:	
+           # Copy the file and run the program on a worker thread
+           yield Parser_Phase
            # Check if the user pressed cancel while we were busy
            if self.context.isJobCancelled():
-               return IngestModule.ProcessResult.OK
+               return
 
            #self.log(Level.INFO, "Processing file: " + file.getName())
            fileCount += 1
@@ -1923,6 +2113,9 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
            pipe = Popen([self.path_to_Shellbags_file, os.path.join(Temp_Dir, file.getName()), os.path.join(Temp_Dir, "Shellbag_db.db3", file.getUniquePath())], stdout=PIPE, stderr=PIPE)
            out_text = pipe.communicate()[0]
            self.log(Level.INFO, "Output from run is ==> " + out_text)               
+
+           # Post the results to the blackboard on the blackboard thread
+           yield Blackboard_Phase
                
            # Open the DB using JDBC
            lclDbPath = os.path.join(Temp_Dir, "shellbag_db.db3")
@@ -1933,7 +2126,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                dbConn = DriverManager.getConnection("jdbc:sqlite:%s"  % lclDbPath)
            except SQLException as e:
                self.log(Level.INFO, "Could not open database file (not SQLite) " + file.getName() + " (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+               return
             
            # Query the contacts table in the database and get all columns. 
            try:
@@ -1942,7 +2135,7 @@ class Windows_InternalsIngestModule(DataSourceIngestModule):
                self.log(Level.INFO, "query SQLite Master table")
            except SQLException as e:
                self.log(Level.INFO, "Error querying database for system table (" + e.getMessage() + ")")
-               return IngestModule.ProcessResult.OK
+               return
 
            try:
                 self.log(Level.INFO, "Begin Create New Artifacts")
@@ -2086,6 +2279,8 @@ class Windows_InternalsWithUISettingsPanel(IngestModuleIngestJobSettingsPanel):
             self.local_settings.setSetting('Webcache_Flag', 'true')
         else:
             self.local_settings.setSetting('Webcache_Flag', 'false')
+        self.local_settings.setSetting('Webcache_Containers', self.Webcache_Containers_TF.getText())
+        self.local_settings.setSetting('Number_Of_Workers', self.Number_Of_Workers_TF.getText())
 
     def initComponents(self):
         self.panel0 = JPanel()
@@ -2202,6 +2397,54 @@ class Windows_InternalsWithUISettingsPanel(IngestModuleIngestJobSettingsPanel):
         self.gbPanel0.setConstraints( self.Webcache_CB, self.gbcPanel0 ) 
         self.panel0.add( self.Webcache_CB ) 
 
+        self.Webcache_Containers_LB = JLabel( "Webcache containers to export (comma delimited, blank exports all)") 
+        self.gbcPanel0.gridx = 2 
+        self.gbcPanel0.gridy = 23
+        self.gbcPanel0.gridwidth = 1 
+        self.gbcPanel0.gridheight = 1 
+        self.gbcPanel0.fill = GridBagConstraints.BOTH 
+        self.gbcPanel0.weightx = 1 
+        self.gbcPanel0.weighty = 0 
+        self.gbcPanel0.anchor = GridBagConstraints.NORTH 
+        self.gbPanel0.setConstraints( self.Webcache_Containers_LB, self.gbcPanel0 ) 
+        self.panel0.add( self.Webcache_Containers_LB ) 
+
+        self.Webcache_Containers_TF = JTextField(20) 
+        self.gbcPanel0.gridx = 2 
+        self.gbcPanel0.gridy = 25
+        self.gbcPanel0.gridwidth = 1 
+        self.gbcPanel0.gridheight = 1 
+        self.gbcPanel0.fill = GridBagConstraints.BOTH 
+        self.gbcPanel0.weightx = 1 
+        self.gbcPanel0.weighty = 0 
+        self.gbcPanel0.anchor = GridBagConstraints.NORTH 
+        self.gbPanel0.setConstraints( self.Webcache_Containers_TF, self.gbcPanel0 ) 
+        self.panel0.add( self.Webcache_Containers_TF ) 
+
+        self.Number_Of_Workers_LB = JLabel( "Number of parsers to run at the same time (blank uses the number of processors)") 
+        self.gbcPanel0.gridx = 2 
+        self.gbcPanel0.gridy = 27
+        self.gbcPanel0.gridwidth = 1 
+        self.gbcPanel0.gridheight = 1 
+        self.gbcPanel0.fill = GridBagConstraints.BOTH 
+        self.gbcPanel0.weightx = 1 
+        self.gbcPanel0.weighty = 0 
+        self.gbcPanel0.anchor = GridBagConstraints.NORTH 
+        self.gbPanel0.setConstraints( self.Number_Of_Workers_LB, self.gbcPanel0 ) 
+        self.panel0.add( self.Number_Of_Workers_LB ) 
+
+        self.Number_Of_Workers_TF = JTextField(5) 
+        self.gbcPanel0.gridx = 2 
+        self.gbcPanel0.gridy = 29
+        self.gbcPanel0.gridwidth = 1 
+        self.gbcPanel0.gridheight = 1 
+        self.gbcPanel0.fill = GridBagConstraints.BOTH 
+        self.gbcPanel0.weightx = 1 
+        self.gbcPanel0.weighty = 0 
+        self.gbcPanel0.anchor = GridBagConstraints.NORTH 
+        self.gbPanel0.setConstraints( self.Number_Of_Workers_TF, self.gbcPanel0 ) 
+        self.panel0.add( self.Number_Of_Workers_TF ) 
+
         self.add(self.panel0)
 
     def customizeComponents(self):
@@ -2214,8 +2457,12 @@ class Windows_InternalsWithUISettingsPanel(IngestModuleIngestJobSettingsPanel):
         self.Usnj_CB.setSelected(self.local_settings.getSetting('Usnj_Flag') == 'true')
         self.Webcache_CB.setSelected(self.local_settings.getSetting('Webcache_Flag') == 'true')
         self.Recentlyused_CB.setSelected(self.local_settings.getSetting('Recentlyused_Flag') == 'true')
+        self.Webcache_Containers_TF.setText(self.local_settings.getSetting('Webcache_Containers'))
+        self.Number_Of_Workers_TF.setText(self.local_settings.getSetting('Number_Of_Workers'))
 
     # Return the settings used
     def getSettings(self):
+        self.local_settings.setSetting('Webcache_Containers', self.Webcache_Containers_TF.getText())
+        self.local_settings.setSetting('Number_Of_Workers', self.Number_Of_Workers_TF.getText())
         return self.local_settings
 